@@ -1,20 +1,34 @@
 #!flask/bin/python
+import atexit
+import os
+# Patched before anything imports threading or socket, so each idle
+# /stream subscriber is a greenlet instead of an OS thread.
+if os.getenv("TASK_SERVER") == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
+import threading
 import time
+import zlib
+from collections import OrderedDict
+from base64 import urlsafe_b64encode, urlsafe_b64decode
 from flask import Flask, jsonify, abort, request, make_response, url_for, render_template
 from prometheus_flask_exporter import PrometheusMetrics
+from prometheus_client import Gauge
 import logging
 from flask_compress import Compress
 from redis import Redis
 from os import getenv
 import requests
-from flask import Response
+from flask import Response, json, stream_with_context
 from requests import get
 from flask_zipkin import Zipkin
+from store import TaskStore, ColumnarTaskStore, ShardedTaskStore, SharedTaskStore, RedisTaskStore, VersionConflict, StoreLimitExceeded, SORT_ORDERS, sort_key
+from wal import WriteAheadLog
 
 
 app = Flask(__name__, static_url_path = "")
 metrics = PrometheusMetrics(app)
-Compress(app)
+compress = Compress(app)
 
 zipkin = Zipkin(app, sample_rate=100)
 
@@ -22,6 +36,21 @@ zipkin = Zipkin(app, sample_rate=100)
 REDIS_HOST = getenv("REDIS_HOST", default="localhost")
 REDIS_PORT = getenv("REDIS_PORT", default=6379)
 REDIS_DB = getenv("REDIS_DB", default=0)
+TASK_STORE = getenv("TASK_STORE", default="memory")
+# "gevent" serves requests on greenlets; the default is Flask's threaded server.
+TASK_SERVER = getenv("TASK_SERVER", default="threads")
+# Seconds between WAL fsyncs; 0 fsyncs every write, "never" leaves it to the OS.
+TASK_WAL = getenv("TASK_WAL")
+TASK_WAL_FSYNC = getenv("TASK_WAL_FSYNC", default="0")
+# Columnar store only: loaded on startup if present, rewritten every interval.
+TASK_SNAPSHOT = getenv("TASK_SNAPSHOT")
+TASK_SNAPSHOT_INTERVAL = float(getenv("TASK_SNAPSHOT_INTERVAL", default="300"))
+# Shared store only: every worker on the node maps this file.
+TASK_SHM_PATH = getenv("TASK_SHM_PATH", default="/dev/shm/python-test-api.tasks")
+TASK_SHM_CAPACITY = int(getenv("TASK_SHM_CAPACITY", default=1 << 20))
+TASK_SHARDS = int(getenv("TASK_SHARDS", default=8))
+# API families with a store of their own, e.g. "api2,api7" or "all".
+TASK_NAMESPACES = getenv("TASK_NAMESPACES", default="")
 r = Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
 SITE_NAME = 'http://webdis-svc.webdis:7379'
 
@@ -43,6 +72,10 @@ def not_found(error):
 def not_found(error):
     return make_response(jsonify( { 'error': 'Not found' } ), 404)
 
+@app.errorhandler(StoreLimitExceeded)
+def limit_exceeded(error):
+    return make_response(jsonify({'error': str(error)}), 400)
+
 context = [
     {
         'id': 1,
@@ -70,71 +103,599 @@ context = [
     }
 ]
 
+seed_context = context
+
+wal = None
+if TASK_WAL and TASK_STORE in ("memory", "columnar"):
+    wal = WriteAheadLog(TASK_WAL, None if TASK_WAL_FSYNC == "never" else float(TASK_WAL_FSYNC))
+    atexit.register(wal.close)
+
+if TASK_STORE == "redis":
+    context = RedisTaskStore(r, context)
+elif TASK_STORE == "shared":
+    context = SharedTaskStore(TASK_SHM_PATH, context, TASK_SHM_CAPACITY)
+elif TASK_STORE == "sharded":
+    context = ShardedTaskStore(context, TASK_SHARDS)
+elif TASK_STORE == "columnar" and TASK_SNAPSHOT and os.path.exists(TASK_SNAPSHOT):
+    context = ColumnarTaskStore.load(TASK_SNAPSHOT, wal=wal)
+elif TASK_STORE == "columnar":
+    context = ColumnarTaskStore(context, wal=wal)
+else:
+    context = TaskStore(context, wal=wal)
+
+def save_snapshots():
+    # Without a snapshot file the WAL is its own snapshot: it is rewritten
+    # down to the live tasks, so it does not grow with every write.
+    saved = None
+    while True:
+        time.sleep(TASK_SNAPSHOT_INTERVAL)
+        if context.version == saved:
+            continue
+        try:
+            if TASK_STORE == "columnar" and TASK_SNAPSHOT:
+                version = context.save(TASK_SNAPSHOT)
+                if wal is not None:
+                    wal.compact(version)
+            else:
+                version = context.checkpoint()
+            saved = version
+        except Exception:
+            logging.exception("snapshot failed, retrying in %s seconds", TASK_SNAPSHOT_INTERVAL)
+
+if TASK_STORE == "columnar" and TASK_SNAPSHOT or wal is not None:
+    threading.Thread(target=save_snapshots, daemon=True).start()
+
+FAMILIES = ['api'] + ['api%d' % n for n in range(2, 46)]
+
+def namespace_store(family, tasks):
+    # Same kind of store as context, without its WAL or snapshots.
+    if TASK_STORE == "redis":
+        return RedisTaskStore(r, tasks, prefix='context:' + family)
+    if TASK_STORE == "shared":
+        return SharedTaskStore('%s.%s' % (TASK_SHM_PATH, family), tasks, TASK_SHM_CAPACITY)
+    if TASK_STORE == "sharded":
+        return ShardedTaskStore(tasks, TASK_SHARDS)
+    if TASK_STORE == "columnar":
+        return ColumnarTaskStore(tasks)
+    return TaskStore(tasks)
+
+# Families without a namespace share context.
+namespaces = {}
+for family in FAMILIES if TASK_NAMESPACES == "all" else filter(None, TASK_NAMESPACES.split(",")):
+    namespaces[family] = namespace_store(family, seed_context)
+
+def family_store():
+    """The store behind the current request's API family."""
+    return namespaces.get(request.path.split('/', 2)[1], context)
+
+store_tasks = Gauge('task_store_tasks', 'Tasks in each store namespace', ['namespace'])
+store_version = Gauge('task_store_version', 'Version of each store namespace', ['namespace'])
+store_tasks.labels('context').set_function(lambda: len(context))
+store_version.labels('context').set_function(lambda: context.version)
+for family, store in namespaces.items():
+    store_tasks.labels(family).set_function(lambda store=store: len(store))
+    store_version.labels(family).set_function(lambda store=store: store.version)
+
+PUBLIC_FIELDS = ('uri', 'title', 'description', 'done')
+
+def is_text(value):
+    # JSON can carry lone surrogates, which no store can encode as UTF-8.
+    if type(value) is not str:
+        return False
+    try:
+        value.encode('utf-8')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+def requested_fields():
+    if 'fields' not in request.args:
+        return PUBLIC_FIELDS
+    fields = tuple(request.args['fields'].split(','))
+    if any(field not in PUBLIC_FIELDS for field in fields):
+        abort(400)
+    return fields
+
+def requested_done():
+    done = request.args.get('done')
+    if done is None:
+        return None
+    if done not in ('true', 'false'):
+        abort(400)
+    return done == 'true'
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def requested_sort():
+    sort = request.args.get('sort')
+    if sort is not None and sort not in SORT_ORDERS:
+        abort(400)
+    return sort
+
+def encode_cursor(position):
+    # A task id encodes to the same cursor as before sorted listings.
+    return urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+def decode_cursor(cursor, sort=None):
+    """The task id a cursor resumes after, or for a sort, the sort key."""
+    try:
+        position = json.loads(urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        abort(400)
+    if sort is None:
+        if type(position) is not int:
+            abort(400)
+        return position
+    first = bool if sort == 'done,id' else str
+    if type(position) is not list or len(position) != 2 or type(position[0]) is not first or type(position[1]) is not int:
+        abort(400)
+    return tuple(position)
+
+def requested_limit(default=DEFAULT_PAGE_SIZE):
+    limit = request.args.get('limit', str(default))
+    if not limit.isdigit() or not 0 < int(limit) <= MAX_PAGE_SIZE:
+        abort(400)
+    return int(limit)
+
+def make_etag(version):
+    # The store's epoch keeps a tag from matching after a restart that
+    # reuses the version for different contents.
+    return '%s-%d-%x' % (family_store().epoch, version, zlib.crc32(request.query_string))
+
+def not_modified(etag):
+    # flask-compress tags compressed bodies as "<etag>:<encoding>".
+    tags = request.if_none_match
+    if tags.contains(etag) or any(tags.contains('%s:%s' % (etag, encoding)) for encoding in ('br', 'gzip', 'deflate')):
+        response = make_response('', 304)
+        response.set_etag(etag)
+        return response
+    return None
+
+def list_context(endpoint, make_public):
+    # The version is read before the tasks, so a racing write can only
+    # leave the ETag older than the body, never newer.
+    store = family_store()
+    etag = make_etag(store.version)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    return cached_listing(endpoint, etag, lambda: render_listing(endpoint, make_public))
+
+LISTING_CACHE_BYTES = 64 << 20
+# Least recently used first. The budget counts body bytes, since one
+# listing of a large store can outweigh thousands of small ones.
+listing_cache = OrderedDict()
+listing_cache_lock = threading.Lock()
+listing_cache_bytes = 0
+
+def cache_listing(key, entry):
+    global listing_cache_bytes
+    size = len(entry[1])
+    if size > LISTING_CACHE_BYTES:
+        return
+    with listing_cache_lock:
+        # A superseded entry for the same request is replaced, not kept.
+        old = listing_cache.pop(key, None)
+        if old is not None:
+            listing_cache_bytes -= len(old[1])
+        listing_cache[key] = entry
+        listing_cache_bytes += size
+        while listing_cache_bytes > LISTING_CACHE_BYTES:
+            listing_cache_bytes -= len(listing_cache.popitem(last=False)[1][1])
+
+def clear_listing_cache():
+    global listing_cache_bytes
+    with listing_cache_lock:
+        listing_cache.clear()
+        listing_cache_bytes = 0
+
+def cached_listing(endpoint, etag, render):
+    # Listings are cached as final, already compressed bytes keyed by
+    # everything that shapes the body; the ETag carries the store version,
+    # so any mutation turns the entry into a miss.
+    encoding = compress._choose_compress_algorithm(request.headers.get('Accept-Encoding', ''))
+    key = (endpoint, request.url_root, request.query_string, encoding)
+    with listing_cache_lock:
+        entry = listing_cache.get(key)
+        if entry is not None:
+            listing_cache.move_to_end(key)
+    if entry is None or entry[0] != etag:
+        response = render()
+        if encoding is not None and response.content_length >= app.config['COMPRESS_MIN_SIZE']:
+            entry = (etag, compress.compress(app, response, encoding), encoding)
+        else:
+            entry = (etag, response.get_data(), None)
+        cache_listing(key, entry)
+    response = app.response_class(entry[1], mimetype='application/json')
+    if entry[2] is None:
+        response.set_etag(etag)
+    else:
+        # Same "<etag>:<encoding>" tag flask-compress would have set.
+        response.headers['Content-Encoding'] = entry[2]
+        response.set_etag('%s:%s' % (etag, entry[2]))
+    return response
+
+def render_listing(endpoint, make_public):
+    store = family_store()
+    fields = requested_fields()
+    done = requested_done()
+    sort = requested_sort()
+    if done is not None and sort is not None:
+        # Within one done state, done,id is plain id order; the title
+        # indexes cannot be filtered without walking them.
+        if sort != 'done,id':
+            abort(400)
+        sort = None
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        if sort is not None:
+            tasks = store.sorted_page(sort, None, len(store))
+        else:
+            tasks = store if done is None else store.where(done)
+        body = {'context': [make_public(task, fields) for task in tasks]}
+    else:
+        limit = requested_limit()
+        if sort is not None:
+            after = decode_cursor(request.args['cursor'], sort) if 'cursor' in request.args else None
+            tasks = store.sorted_page(sort, after, limit + 1)
+        else:
+            after = decode_cursor(request.args['cursor']) if 'cursor' in request.args else 0
+            tasks = store.page(after, limit + 1, done)
+        next_url = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            position = tasks[-1]['id'] if sort is None else sort_key(sort, tasks[-1])
+            args = dict(request.args.items(), limit=limit, cursor=encode_cursor(position))
+            next_url = url_for(endpoint, _external=True, **args)
+        body = {'context': [make_public(task, fields) for task in tasks], 'next': next_url}
+    return jsonify(body)
+
+def requested_versions():
+    """Versions named by If-Match, or None when any version will do."""
+    tags = request.if_match
+    if not tags or tags.star_tag:
+        return None
+    epoch = family_store().epoch
+    versions = set()
+    for tag in tags:
+        parts = tag.split('-')
+        if len(parts) == 3 and parts[0] == epoch and parts[1].isdigit():
+            versions.add(int(parts[1]))
+    return versions
+
+def update_if_match(task_id, changes):
+    store = family_store()
+    try:
+        task = store.update(task_id, changes, requested_versions())
+    except VersionConflict as conflict:
+        response = make_response(jsonify({'error': 'Precondition failed', 'version': conflict.task['version']}), 412)
+        response.set_etag(make_etag(conflict.task['version']))
+        abort(response)
+    if task is None:
+        abort(404)
+    return task
+
+def show_task(task_id, make_public):
+    store = family_store()
+    task = store.get(task_id)
+    if task is None:
+        abort(404)
+    etag = make_etag(task['version'])
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    response = jsonify({'task': make_public(task, requested_fields())})
+    response.set_etag(etag)
+    return response
+
+def search_tasks(make_public):
+    store = family_store()
+    fields = requested_fields()
+    tasks = store.search(request.args.get('q', ''), requested_limit())
+    return jsonify({'context': [make_public(task, fields) for task in tasks]})
+
+def changes_since(make_public):
+    store = family_store()
+    since = request.args.get('since', '')
+    if not since.isdigit():
+        abort(400)
+    since = int(since)
+    # A since from another epoch names some other run's version.
+    epoch = request.args.get('epoch', store.epoch)
+    entries = store.changes(since) if epoch == store.epoch else None
+    if entries is None:
+        return make_response(jsonify({'error': 'Resync required', 'version': store.version, 'epoch': store.epoch}), 410)
+    # Only the latest change per task matters to the client, except that
+    # a task created in this window stays a create.
+    latest = {}
+    for version, op, task_id in entries:
+        previous = latest.pop(task_id, None)
+        if previous is not None and previous[1] == 'create' and op == 'update':
+            op = 'create'
+        latest[task_id] = (version, op)
+    fields = requested_fields()
+    changes = []
+    for task_id, (version, op) in latest.items():
+        task = public_change(make_public, op, task_id, fields)
+        changes.append({'version': version, 'op': op, 'task': task})
+    return jsonify({'version': entries[-1][0] if entries else since, 'epoch': store.epoch, 'changes': changes})
+
+def public_change(make_public, op, task_id, fields):
+    store = family_store()
+    task = store.get(task_id) if op != 'delete' else None
+    if task is None:
+        return make_public({'id': task_id}, ('uri',))
+    return make_public(task, fields)
+
+HEARTBEAT_SECONDS = 15
+EVENT_CACHE_SIZE = 256
+# Rendered events keyed by (store, make_public, fields, url_root,
+# position), so every subscriber at the same position shares one
+# serialization. The uris depend on the host the client asked for.
+event_cache = {}
+
+def render_events(store, make_public, fields, position):
+    """(text, new position) for the changes after position, or None to resync."""
+    key = (store, make_public, fields, request.url_root, position)
+    rendered = event_cache.get(key)
+    if rendered is not None:
+        return rendered
+    # Every entry up to a published version is already in the log, so
+    # the stream can move past it even when it logged nothing new.
+    observed = store.version
+    entries = store.changes(position)
+    if entries is None:
+        return None
+    events = []
+    for i, (version, op, task_id) in enumerate(entries):
+        event = 'event: %s\ndata: %s\n' % (op, json.dumps(public_change(make_public, op, task_id, fields)))
+        # Only the last event of a version carries its id, so a
+        # resume never skips the rest of a batch.
+        if i + 1 == len(entries) or entries[i + 1][0] != version:
+            event += 'id: %s-%d\n' % (store.epoch, version)
+        events.append(event + '\n')
+    rendered = (''.join(events), max([position, observed] + [entry[0] for entry in entries[-1:]]))
+    if entries:
+        if len(event_cache) >= EVENT_CACHE_SIZE:
+            event_cache.clear()
+        event_cache[key] = rendered
+    return rendered
+
+def stream_events(make_public):
+    store = family_store()
+    # Browsers resume with Last-Event-ID, "<epoch>-<version>"; other
+    # clients may pass ?since= and ?epoch=. A stale epoch starts with a
+    # resync.
+    last_id = request.headers.get('Last-Event-ID')
+    if last_id is not None:
+        epoch, _, since = last_id.rpartition('-')
+    else:
+        epoch, since = request.args.get('epoch', store.epoch), request.args.get('since', '')
+    stale = epoch != store.epoch
+    since = int(since) if since.isdigit() and not stale else store.version
+    fields = requested_fields()
+
+    def generate(position):
+        if stale:
+            yield 'event: resync\ndata: %s\n\n' % json.dumps({'version': position, 'epoch': store.epoch})
+        while True:
+            rendered = render_events(store, make_public, fields, position)
+            if rendered is None:
+                position = store.version
+                yield 'event: resync\ndata: %s\n\n' % json.dumps({'version': position, 'epoch': store.epoch})
+                continue
+            text, position = rendered
+            if text:
+                yield text
+            if store.wait(position, HEARTBEAT_SECONDS) <= position:
+                yield ': heartbeat\n\n'
+
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return Response(stream_with_context(generate(since)), mimetype='text/event-stream', headers=headers)
+
+def show_stats():
+    store = family_store()
+    etag = make_etag(store.version)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    response = jsonify({'stats': store.stats()})
+    response.set_etag(etag)
+    return response
+
+DEFAULT_SUGGESTIONS = 10
+SUGGEST_FIELDS = ('uri', 'title')
+
+def suggest_tasks(make_public):
+    store = family_store()
+    tasks = store.suggest(request.args.get('prefix', ''), requested_limit(DEFAULT_SUGGESTIONS))
+    return jsonify({'suggestions': [make_public(task, SUGGEST_FIELDS) for task in tasks]})
+
+MAX_BATCH_SIZE = 10000
+
+def create_batch(endpoint):
+    store = family_store()
+    batch = request.json
+    if type(batch) is not list or not 0 < len(batch) <= MAX_BATCH_SIZE:
+        abort(400)
+    for fields in batch:
+        if type(fields) is not dict or not is_text(fields.get('title')):
+            abort(400)
+        if not is_text(fields.get('description', "")):
+            abort(400)
+    tasks = store.insert_many([{
+        'title': fields['title'],
+        'description': fields.get('description', ""),
+        'done': False
+    } for fields in batch])
+    # One url_for call for the whole batch; only the trailing id differs.
+    uri = url_for(endpoint, task_id=0, _external=True)[:-1]
+    return jsonify({'uris': [uri + str(task['id']) for task in tasks]}), 201
+
+def batch_selection():
+    body = request.json
+    if type(body) is not dict:
+        abort(400)
+    if 'ids' in body:
+        ids = body['ids']
+        if type(ids) is not list or not 0 < len(ids) <= MAX_BATCH_SIZE:
+            abort(400)
+        if any(type(task_id) is not int for task_id in ids):
+            abort(400)
+        return {'task_ids': list(dict.fromkeys(ids))}
+    if type(body.get('filter')) is dict and type(body['filter'].get('done')) is bool:
+        return {'done': body['filter']['done']}
+    abort(400)
+
+def batch_results(results):
+    return jsonify({'results': [{'id': task_id, 'result': ok} for task_id, ok in results.items()]})
+
+def update_batch():
+    store = family_store()
+    selection = batch_selection()
+    changes = request.json.get('task')
+    if type(changes) is not dict or not changes:
+        abort(400)
+    if 'title' in changes and not is_text(changes['title']):
+        abort(400)
+    if 'description' in changes and not is_text(changes['description']):
+        abort(400)
+    if 'done' in changes and type(changes['done']) is not bool:
+        abort(400)
+    return batch_results(store.update_many(changes, **selection))
+
+def delete_batch():
+    store = family_store()
+    return batch_results(store.remove_many(**batch_selection()))
+
+EXPORT_BATCH_SIZE = 1000
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        yield compressor.compress(chunk.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+def export_ndjson(make_public):
+    store = family_store()
+    fields = requested_fields()
+    done = requested_done()
+
+    def generate():
+        after = 0
+        while True:
+            tasks = store.page(after, EXPORT_BATCH_SIZE, done)
+            if not tasks:
+                return
+            yield ''.join(json.dumps(make_public(task, fields)) + '\n' for task in tasks)
+            after = tasks[-1]['id']
+    body = stream_with_context(generate())
+    headers = {'Vary': 'Accept-Encoding'}
+    # flask-compress buffers streamed bodies before compressing them, so
+    # the export compresses itself, one batch at a time.
+    if request.accept_encodings['gzip']:
+        body = gzip_stream(body)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(body, mimetype='application/x-ndjson', headers=headers)
+
 @app.route('/api/')
 def index():
     return render_template('index.html')
 
-def make_public_task(task):
+def make_public_task(task, fields = PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            # Intentional typo: "url_forr" instead of "url_for"
-            new_task['uri'] = url_forr('get_task', task_id = task['id'], _external = True)
-        else:
+            if 'uri' in fields:
+                # Intentional typo: "url_forr" instead of "url_for"
+                new_task['uri'] = url_forr('get_task', task_id = task['id'], _external = True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
     
 @app.route('/api/get/context', methods = ['GET'])
 def get_context():
-    return jsonify( { 'context': list(map(make_public_task, context)) } )
+    return list_context('get_context', make_public_task)
 
 
 @app.route('/api/get/context/<int:task_id>', methods = ['GET'])
 def get_task(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify( { 'task': make_public_task(task[0]) } )
+    return show_task(task_id, make_public_task)
 
 @app.route('/api/post/context', methods = ['POST'])
 def create_task():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify( { 'task': make_public_task(task) } ), 201
 
+@app.route('/api/post/context/batch', methods = ['POST'])
+def create_task_batch():
+    return create_batch('get_task')
+
 @app.route('/api/put/context/<int:task_id>', methods = ['PUT'])
 def update_task(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify( { 'task': make_public_task(task[0]) } )
+    task = update_if_match(task_id, request.json)
+    response = jsonify( { 'task': make_public_task(task) } )
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api/put/context/batch', methods = ['PUT'])
+def update_task_batch():
+    return update_batch()
     
 @app.route('/api/delete/context/<int:task_id>', methods = ['DELETE'])
 def delete_task(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify( { 'result': True } )
 
+@app.route('/api/delete/context/batch', methods = ['DELETE'])
+def delete_task_batch():
+    return delete_batch()
+
+@app.route('/api/export/context', methods = ['GET'])
+def export_context():
+    return export_ndjson(make_public_task)
+
+@app.route('/api/search/context', methods = ['GET'])
+def search_context():
+    return search_tasks(make_public_task)
+
+@app.route('/api/suggest/context', methods = ['GET'])
+def suggest_context():
+    return suggest_tasks(make_public_task)
+
+@app.route('/api/changes', methods = ['GET'])
+def get_changes():
+    return changes_since(make_public_task)
+
+@app.route('/api/stream/context', methods = ['GET'])
+def stream_context():
+    return stream_events(make_public_task)
+
+@app.route('/api/stats/context', methods = ['GET'])
+def stats_context():
+    return show_stats()
+
 @app.route('/api/fib/<int:x>')
 def fib(x):
     return str(calcfib(x))
@@ -172,72 +733,109 @@ def proxy():
     return get(f'{SITE_NAME}/ping', headers=headers).content
    
 if __name__ == "__main__":
-    app.run(debug=False, host="0.0.0.0")
+    if TASK_SERVER == "gevent":
+        from gevent.pywsgi import WSGIServer
+        WSGIServer(("0.0.0.0", 5000), app).serve_forever()
+    else:
+        app.run(debug=False, host="0.0.0.0")
 
 
 @app.route('/api2/')
 def index2():
     return render_template('index.html')
 
-def make_public_task2(task):
+def make_public_task2(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task2', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task2', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api2/get/context', methods=['GET'])
 def get_context2():
-    return jsonify({'context': list(map(make_public_task2, context))})
+    return list_context('get_context2', make_public_task2)
 
 @app.route('/api2/get/context/<int:task_id>', methods=['GET'])
 def get_task2(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task2(task[0])})
+    return show_task(task_id, make_public_task2)
 
 @app.route('/api2/post/context', methods=['POST'])
 def create_task2():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task2(task)}), 201
 
+@app.route('/api2/post/context/batch', methods=['POST'])
+def create_task_batch2():
+    return create_batch('get_task2')
+
 @app.route('/api2/put/context/<int:task_id>', methods=['PUT'])
 def update_task2(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task2(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task2(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api2/put/context/batch', methods=['PUT'])
+def update_task_batch2():
+    return update_batch()
 
 @app.route('/api2/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task2(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api2/delete/context/batch', methods=['DELETE'])
+def delete_task_batch2():
+    return delete_batch()
+
+@app.route('/api2/export/context', methods=['GET'])
+def export_context2():
+    return export_ndjson(make_public_task2)
+
+@app.route('/api2/search/context', methods=['GET'])
+def search_context2():
+    return search_tasks(make_public_task2)
+
+@app.route('/api2/suggest/context', methods=['GET'])
+def suggest_context2():
+    return suggest_tasks(make_public_task2)
+
+@app.route('/api2/changes', methods=['GET'])
+def get_changes2():
+    return changes_since(make_public_task2)
+
+@app.route('/api2/stream/context', methods=['GET'])
+def stream_context2():
+    return stream_events(make_public_task2)
+
+@app.route('/api2/stats/context', methods=['GET'])
+def stats_context2():
+    return show_stats()
+
 @app.route('/api2/fib/<int:x>')
 def fib2(x):
     return str(calcfib(x))
@@ -265,65 +863,98 @@ def proxy2():
 def index3():
     return render_template('index.html')
 
-def make_public_task3(task):
+def make_public_task3(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task3', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task3', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api3/get/context', methods=['GET'])
 def get_context3():
-    return jsonify({'context': list(map(make_public_task3, context))})
+    return list_context('get_context3', make_public_task3)
 
 @app.route('/api3/get/context/<int:task_id>', methods=['GET'])
 def get_task3(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task3(task[0])})
+    return show_task(task_id, make_public_task3)
 
 @app.route('/api3/post/context', methods=['POST'])
 def create_task3():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task3(task)}), 201
 
+@app.route('/api3/post/context/batch', methods=['POST'])
+def create_task_batch3():
+    return create_batch('get_task3')
+
 @app.route('/api3/put/context/<int:task_id>', methods=['PUT'])
 def update_task3(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task3(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task3(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api3/put/context/batch', methods=['PUT'])
+def update_task_batch3():
+    return update_batch()
 
 @app.route('/api3/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task3(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api3/delete/context/batch', methods=['DELETE'])
+def delete_task_batch3():
+    return delete_batch()
+
+@app.route('/api3/export/context', methods=['GET'])
+def export_context3():
+    return export_ndjson(make_public_task3)
+
+@app.route('/api3/search/context', methods=['GET'])
+def search_context3():
+    return search_tasks(make_public_task3)
+
+@app.route('/api3/suggest/context', methods=['GET'])
+def suggest_context3():
+    return suggest_tasks(make_public_task3)
+
+@app.route('/api3/changes', methods=['GET'])
+def get_changes3():
+    return changes_since(make_public_task3)
+
+@app.route('/api3/stream/context', methods=['GET'])
+def stream_context3():
+    return stream_events(make_public_task3)
+
+@app.route('/api3/stats/context', methods=['GET'])
+def stats_context3():
+    return show_stats()
+
 @app.route('/api3/fib/<int:x>')
 def fib3(x):
     return str(calcfib(x))
@@ -351,65 +982,98 @@ def proxy3():
 def index4():
     return render_template('index.html')
 
-def make_public_task4(task):
+def make_public_task4(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task4', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task4', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api4/get/context', methods=['GET'])
 def get_context4():
-    return jsonify({'context': list(map(make_public_task4, context))})
+    return list_context('get_context4', make_public_task4)
 
 @app.route('/api4/get/context/<int:task_id>', methods=['GET'])
 def get_task4(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task4(task[0])})
+    return show_task(task_id, make_public_task4)
 
 @app.route('/api4/post/context', methods=['POST'])
 def create_task4():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task4(task)}), 201
 
+@app.route('/api4/post/context/batch', methods=['POST'])
+def create_task_batch4():
+    return create_batch('get_task4')
+
 @app.route('/api4/put/context/<int:task_id>', methods=['PUT'])
 def update_task4(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task4(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task4(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api4/put/context/batch', methods=['PUT'])
+def update_task_batch4():
+    return update_batch()
 
 @app.route('/api4/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task4(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api4/delete/context/batch', methods=['DELETE'])
+def delete_task_batch4():
+    return delete_batch()
+
+@app.route('/api4/export/context', methods=['GET'])
+def export_context4():
+    return export_ndjson(make_public_task4)
+
+@app.route('/api4/search/context', methods=['GET'])
+def search_context4():
+    return search_tasks(make_public_task4)
+
+@app.route('/api4/suggest/context', methods=['GET'])
+def suggest_context4():
+    return suggest_tasks(make_public_task4)
+
+@app.route('/api4/changes', methods=['GET'])
+def get_changes4():
+    return changes_since(make_public_task4)
+
+@app.route('/api4/stream/context', methods=['GET'])
+def stream_context4():
+    return stream_events(make_public_task4)
+
+@app.route('/api4/stats/context', methods=['GET'])
+def stats_context4():
+    return show_stats()
+
 @app.route('/api4/fib/<int:x>')
 def fib4(x):
     return str(calcfib(x))
@@ -437,65 +1101,98 @@ def proxy4():
 def index5():
     return render_template('index.html')
 
-def make_public_task5(task):
+def make_public_task5(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task5', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task5', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api5/get/context', methods=['GET'])
 def get_context5():
-    return jsonify({'context': list(map(make_public_task5, context))})
+    return list_context('get_context5', make_public_task5)
 
 @app.route('/api5/get/context/<int:task_id>', methods=['GET'])
 def get_task5(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task5(task[0])})
+    return show_task(task_id, make_public_task5)
 
 @app.route('/api5/post/context', methods=['POST'])
 def create_task5():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task5(task)}), 201
 
+@app.route('/api5/post/context/batch', methods=['POST'])
+def create_task_batch5():
+    return create_batch('get_task5')
+
 @app.route('/api5/put/context/<int:task_id>', methods=['PUT'])
 def update_task5(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task5(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task5(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api5/put/context/batch', methods=['PUT'])
+def update_task_batch5():
+    return update_batch()
 
 @app.route('/api5/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task5(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api5/delete/context/batch', methods=['DELETE'])
+def delete_task_batch5():
+    return delete_batch()
+
+@app.route('/api5/export/context', methods=['GET'])
+def export_context5():
+    return export_ndjson(make_public_task5)
+
+@app.route('/api5/search/context', methods=['GET'])
+def search_context5():
+    return search_tasks(make_public_task5)
+
+@app.route('/api5/suggest/context', methods=['GET'])
+def suggest_context5():
+    return suggest_tasks(make_public_task5)
+
+@app.route('/api5/changes', methods=['GET'])
+def get_changes5():
+    return changes_since(make_public_task5)
+
+@app.route('/api5/stream/context', methods=['GET'])
+def stream_context5():
+    return stream_events(make_public_task5)
+
+@app.route('/api5/stats/context', methods=['GET'])
+def stats_context5():
+    return show_stats()
+
 @app.route('/api5/fib/<int:x>')
 def fib5(x):
     return str(calcfib(x))
@@ -523,65 +1220,98 @@ def proxy5():
 def index6():
     return render_template('index.html')
 
-def make_public_task6(task):
+def make_public_task6(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task6', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task6', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api6/get/context', methods=['GET'])
 def get_context6():
-    return jsonify({'context': list(map(make_public_task6, context))})
+    return list_context('get_context6', make_public_task6)
 
 @app.route('/api6/get/context/<int:task_id>', methods=['GET'])
 def get_task6(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task6(task[0])})
+    return show_task(task_id, make_public_task6)
 
 @app.route('/api6/post/context', methods=['POST'])
 def create_task6():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task6(task)}), 201
 
+@app.route('/api6/post/context/batch', methods=['POST'])
+def create_task_batch6():
+    return create_batch('get_task6')
+
 @app.route('/api6/put/context/<int:task_id>', methods=['PUT'])
 def update_task6(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task6(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task6(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api6/put/context/batch', methods=['PUT'])
+def update_task_batch6():
+    return update_batch()
 
 @app.route('/api6/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task6(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api6/delete/context/batch', methods=['DELETE'])
+def delete_task_batch6():
+    return delete_batch()
+
+@app.route('/api6/export/context', methods=['GET'])
+def export_context6():
+    return export_ndjson(make_public_task6)
+
+@app.route('/api6/search/context', methods=['GET'])
+def search_context6():
+    return search_tasks(make_public_task6)
+
+@app.route('/api6/suggest/context', methods=['GET'])
+def suggest_context6():
+    return suggest_tasks(make_public_task6)
+
+@app.route('/api6/changes', methods=['GET'])
+def get_changes6():
+    return changes_since(make_public_task6)
+
+@app.route('/api6/stream/context', methods=['GET'])
+def stream_context6():
+    return stream_events(make_public_task6)
+
+@app.route('/api6/stats/context', methods=['GET'])
+def stats_context6():
+    return show_stats()
+
 @app.route('/api6/fib/<int:x>')
 def fib6(x):
     return str(calcfib(x))
@@ -609,65 +1339,98 @@ def proxy6():
 def index7():
     return render_template('index.html')
 
-def make_public_task7(task):
+def make_public_task7(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task7', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task7', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api7/get/context', methods=['GET'])
 def get_context7():
-    return jsonify({'context': list(map(make_public_task7, context))})
+    return list_context('get_context7', make_public_task7)
 
 @app.route('/api7/get/context/<int:task_id>', methods=['GET'])
 def get_task7(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task7(task[0])})
+    return show_task(task_id, make_public_task7)
 
 @app.route('/api7/post/context', methods=['POST'])
 def create_task7():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task7(task)}), 201
 
+@app.route('/api7/post/context/batch', methods=['POST'])
+def create_task_batch7():
+    return create_batch('get_task7')
+
 @app.route('/api7/put/context/<int:task_id>', methods=['PUT'])
 def update_task7(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task7(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task7(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api7/put/context/batch', methods=['PUT'])
+def update_task_batch7():
+    return update_batch()
 
 @app.route('/api7/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task7(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api7/delete/context/batch', methods=['DELETE'])
+def delete_task_batch7():
+    return delete_batch()
+
+@app.route('/api7/export/context', methods=['GET'])
+def export_context7():
+    return export_ndjson(make_public_task7)
+
+@app.route('/api7/search/context', methods=['GET'])
+def search_context7():
+    return search_tasks(make_public_task7)
+
+@app.route('/api7/suggest/context', methods=['GET'])
+def suggest_context7():
+    return suggest_tasks(make_public_task7)
+
+@app.route('/api7/changes', methods=['GET'])
+def get_changes7():
+    return changes_since(make_public_task7)
+
+@app.route('/api7/stream/context', methods=['GET'])
+def stream_context7():
+    return stream_events(make_public_task7)
+
+@app.route('/api7/stats/context', methods=['GET'])
+def stats_context7():
+    return show_stats()
+
 @app.route('/api7/fib/<int:x>')
 def fib7(x):
     return str(calcfib(x))
@@ -695,65 +1458,98 @@ def proxy7():
 def index8():
     return render_template('index.html')
 
-def make_public_task8(task):
+def make_public_task8(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task8', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task8', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api8/get/context', methods=['GET'])
 def get_context8():
-    return jsonify({'context': list(map(make_public_task8, context))})
+    return list_context('get_context8', make_public_task8)
 
 @app.route('/api8/get/context/<int:task_id>', methods=['GET'])
 def get_task8(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task8(task[0])})
+    return show_task(task_id, make_public_task8)
 
 @app.route('/api8/post/context', methods=['POST'])
 def create_task8():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task8(task)}), 201
 
+@app.route('/api8/post/context/batch', methods=['POST'])
+def create_task_batch8():
+    return create_batch('get_task8')
+
 @app.route('/api8/put/context/<int:task_id>', methods=['PUT'])
 def update_task8(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task8(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task8(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api8/put/context/batch', methods=['PUT'])
+def update_task_batch8():
+    return update_batch()
 
 @app.route('/api8/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task8(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api8/delete/context/batch', methods=['DELETE'])
+def delete_task_batch8():
+    return delete_batch()
+
+@app.route('/api8/export/context', methods=['GET'])
+def export_context8():
+    return export_ndjson(make_public_task8)
+
+@app.route('/api8/search/context', methods=['GET'])
+def search_context8():
+    return search_tasks(make_public_task8)
+
+@app.route('/api8/suggest/context', methods=['GET'])
+def suggest_context8():
+    return suggest_tasks(make_public_task8)
+
+@app.route('/api8/changes', methods=['GET'])
+def get_changes8():
+    return changes_since(make_public_task8)
+
+@app.route('/api8/stream/context', methods=['GET'])
+def stream_context8():
+    return stream_events(make_public_task8)
+
+@app.route('/api8/stats/context', methods=['GET'])
+def stats_context8():
+    return show_stats()
+
 @app.route('/api8/fib/<int:x>')
 def fib8(x):
     return str(calcfib(x))
@@ -781,65 +1577,98 @@ def proxy8():
 def index9():
     return render_template('index.html')
 
-def make_public_task9(task):
+def make_public_task9(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task9', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task9', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api9/get/context', methods=['GET'])
 def get_context9():
-    return jsonify({'context': list(map(make_public_task9, context))})
+    return list_context('get_context9', make_public_task9)
 
 @app.route('/api9/get/context/<int:task_id>', methods=['GET'])
 def get_task9(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task9(task[0])})
+    return show_task(task_id, make_public_task9)
 
 @app.route('/api9/post/context', methods=['POST'])
 def create_task9():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task9(task)}), 201
 
+@app.route('/api9/post/context/batch', methods=['POST'])
+def create_task_batch9():
+    return create_batch('get_task9')
+
 @app.route('/api9/put/context/<int:task_id>', methods=['PUT'])
 def update_task9(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task9(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task9(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api9/put/context/batch', methods=['PUT'])
+def update_task_batch9():
+    return update_batch()
 
 @app.route('/api9/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task9(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api9/delete/context/batch', methods=['DELETE'])
+def delete_task_batch9():
+    return delete_batch()
+
+@app.route('/api9/export/context', methods=['GET'])
+def export_context9():
+    return export_ndjson(make_public_task9)
+
+@app.route('/api9/search/context', methods=['GET'])
+def search_context9():
+    return search_tasks(make_public_task9)
+
+@app.route('/api9/suggest/context', methods=['GET'])
+def suggest_context9():
+    return suggest_tasks(make_public_task9)
+
+@app.route('/api9/changes', methods=['GET'])
+def get_changes9():
+    return changes_since(make_public_task9)
+
+@app.route('/api9/stream/context', methods=['GET'])
+def stream_context9():
+    return stream_events(make_public_task9)
+
+@app.route('/api9/stats/context', methods=['GET'])
+def stats_context9():
+    return show_stats()
+
 @app.route('/api9/fib/<int:x>')
 def fib9(x):
     return str(calcfib(x))
@@ -867,65 +1696,98 @@ def proxy9():
 def index10():
     return render_template('index.html')
 
-def make_public_task10(task):
+def make_public_task10(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task10', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task10', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api10/get/context', methods=['GET'])
 def get_context10():
-    return jsonify({'context': list(map(make_public_task10, context))})
+    return list_context('get_context10', make_public_task10)
 
 @app.route('/api10/get/context/<int:task_id>', methods=['GET'])
 def get_task10(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task10(task[0])})
+    return show_task(task_id, make_public_task10)
 
 @app.route('/api10/post/context', methods=['POST'])
 def create_task10():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task10(task)}), 201
 
+@app.route('/api10/post/context/batch', methods=['POST'])
+def create_task_batch10():
+    return create_batch('get_task10')
+
 @app.route('/api10/put/context/<int:task_id>', methods=['PUT'])
 def update_task10(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task10(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task10(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api10/put/context/batch', methods=['PUT'])
+def update_task_batch10():
+    return update_batch()
 
 @app.route('/api10/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task10(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api10/delete/context/batch', methods=['DELETE'])
+def delete_task_batch10():
+    return delete_batch()
+
+@app.route('/api10/export/context', methods=['GET'])
+def export_context10():
+    return export_ndjson(make_public_task10)
+
+@app.route('/api10/search/context', methods=['GET'])
+def search_context10():
+    return search_tasks(make_public_task10)
+
+@app.route('/api10/suggest/context', methods=['GET'])
+def suggest_context10():
+    return suggest_tasks(make_public_task10)
+
+@app.route('/api10/changes', methods=['GET'])
+def get_changes10():
+    return changes_since(make_public_task10)
+
+@app.route('/api10/stream/context', methods=['GET'])
+def stream_context10():
+    return stream_events(make_public_task10)
+
+@app.route('/api10/stats/context', methods=['GET'])
+def stats_context10():
+    return show_stats()
+
 @app.route('/api10/fib/<int:x>')
 def fib10(x):
     return str(calcfib(x))
@@ -953,65 +1815,98 @@ def proxy10():
 def index11():
     return render_template('index.html')
 
-def make_public_task11(task):
+def make_public_task11(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task11', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task11', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api11/get/context', methods=['GET'])
 def get_context11():
-    return jsonify({'context': list(map(make_public_task11, context))})
+    return list_context('get_context11', make_public_task11)
 
 @app.route('/api11/get/context/<int:task_id>', methods=['GET'])
 def get_task11(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task11(task[0])})
+    return show_task(task_id, make_public_task11)
 
 @app.route('/api11/post/context', methods=['POST'])
 def create_task11():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task11(task)}), 201
 
+@app.route('/api11/post/context/batch', methods=['POST'])
+def create_task_batch11():
+    return create_batch('get_task11')
+
 @app.route('/api11/put/context/<int:task_id>', methods=['PUT'])
 def update_task11(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task11(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task11(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api11/put/context/batch', methods=['PUT'])
+def update_task_batch11():
+    return update_batch()
 
 @app.route('/api11/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task11(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api11/delete/context/batch', methods=['DELETE'])
+def delete_task_batch11():
+    return delete_batch()
+
+@app.route('/api11/export/context', methods=['GET'])
+def export_context11():
+    return export_ndjson(make_public_task11)
+
+@app.route('/api11/search/context', methods=['GET'])
+def search_context11():
+    return search_tasks(make_public_task11)
+
+@app.route('/api11/suggest/context', methods=['GET'])
+def suggest_context11():
+    return suggest_tasks(make_public_task11)
+
+@app.route('/api11/changes', methods=['GET'])
+def get_changes11():
+    return changes_since(make_public_task11)
+
+@app.route('/api11/stream/context', methods=['GET'])
+def stream_context11():
+    return stream_events(make_public_task11)
+
+@app.route('/api11/stats/context', methods=['GET'])
+def stats_context11():
+    return show_stats()
+
 @app.route('/api11/fib/<int:x>')
 def fib11(x):
     return str(calcfib(x))
@@ -1039,65 +1934,98 @@ def proxy11():
 def index12():
     return render_template('index.html')
 
-def make_public_task12(task):
+def make_public_task12(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task12', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task12', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api12/get/context', methods=['GET'])
 def get_context12():
-    return jsonify({'context': list(map(make_public_task12, context))})
+    return list_context('get_context12', make_public_task12)
 
 @app.route('/api12/get/context/<int:task_id>', methods=['GET'])
 def get_task12(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task12(task[0])})
+    return show_task(task_id, make_public_task12)
 
 @app.route('/api12/post/context', methods=['POST'])
 def create_task12():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task12(task)}), 201
 
+@app.route('/api12/post/context/batch', methods=['POST'])
+def create_task_batch12():
+    return create_batch('get_task12')
+
 @app.route('/api12/put/context/<int:task_id>', methods=['PUT'])
 def update_task12(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task12(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task12(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api12/put/context/batch', methods=['PUT'])
+def update_task_batch12():
+    return update_batch()
 
 @app.route('/api12/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task12(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api12/delete/context/batch', methods=['DELETE'])
+def delete_task_batch12():
+    return delete_batch()
+
+@app.route('/api12/export/context', methods=['GET'])
+def export_context12():
+    return export_ndjson(make_public_task12)
+
+@app.route('/api12/search/context', methods=['GET'])
+def search_context12():
+    return search_tasks(make_public_task12)
+
+@app.route('/api12/suggest/context', methods=['GET'])
+def suggest_context12():
+    return suggest_tasks(make_public_task12)
+
+@app.route('/api12/changes', methods=['GET'])
+def get_changes12():
+    return changes_since(make_public_task12)
+
+@app.route('/api12/stream/context', methods=['GET'])
+def stream_context12():
+    return stream_events(make_public_task12)
+
+@app.route('/api12/stats/context', methods=['GET'])
+def stats_context12():
+    return show_stats()
+
 @app.route('/api12/fib/<int:x>')
 def fib12(x):
     return str(calcfib(x))
@@ -1125,65 +2053,98 @@ def proxy12():
 def index13():
     return render_template('index.html')
 
-def make_public_task13(task):
+def make_public_task13(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task13', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task13', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api13/get/context', methods=['GET'])
 def get_context13():
-    return jsonify({'context': list(map(make_public_task13, context))})
+    return list_context('get_context13', make_public_task13)
 
 @app.route('/api13/get/context/<int:task_id>', methods=['GET'])
 def get_task13(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task13(task[0])})
+    return show_task(task_id, make_public_task13)
 
 @app.route('/api13/post/context', methods=['POST'])
 def create_task13():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task13(task)}), 201
 
+@app.route('/api13/post/context/batch', methods=['POST'])
+def create_task_batch13():
+    return create_batch('get_task13')
+
 @app.route('/api13/put/context/<int:task_id>', methods=['PUT'])
 def update_task13(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task13(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task13(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api13/put/context/batch', methods=['PUT'])
+def update_task_batch13():
+    return update_batch()
 
 @app.route('/api13/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task13(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api13/delete/context/batch', methods=['DELETE'])
+def delete_task_batch13():
+    return delete_batch()
+
+@app.route('/api13/export/context', methods=['GET'])
+def export_context13():
+    return export_ndjson(make_public_task13)
+
+@app.route('/api13/search/context', methods=['GET'])
+def search_context13():
+    return search_tasks(make_public_task13)
+
+@app.route('/api13/suggest/context', methods=['GET'])
+def suggest_context13():
+    return suggest_tasks(make_public_task13)
+
+@app.route('/api13/changes', methods=['GET'])
+def get_changes13():
+    return changes_since(make_public_task13)
+
+@app.route('/api13/stream/context', methods=['GET'])
+def stream_context13():
+    return stream_events(make_public_task13)
+
+@app.route('/api13/stats/context', methods=['GET'])
+def stats_context13():
+    return show_stats()
+
 @app.route('/api13/fib/<int:x>')
 def fib13(x):
     return str(calcfib(x))
@@ -1211,65 +2172,98 @@ def proxy13():
 def index14():
     return render_template('index.html')
 
-def make_public_task14(task):
+def make_public_task14(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task14', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task14', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api14/get/context', methods=['GET'])
 def get_context14():
-    return jsonify({'context': list(map(make_public_task14, context))})
+    return list_context('get_context14', make_public_task14)
 
 @app.route('/api14/get/context/<int:task_id>', methods=['GET'])
 def get_task14(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task14(task[0])})
+    return show_task(task_id, make_public_task14)
 
 @app.route('/api14/post/context', methods=['POST'])
 def create_task14():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task14(task)}), 201
 
+@app.route('/api14/post/context/batch', methods=['POST'])
+def create_task_batch14():
+    return create_batch('get_task14')
+
 @app.route('/api14/put/context/<int:task_id>', methods=['PUT'])
 def update_task14(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task14(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task14(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api14/put/context/batch', methods=['PUT'])
+def update_task_batch14():
+    return update_batch()
 
 @app.route('/api14/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task14(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api14/delete/context/batch', methods=['DELETE'])
+def delete_task_batch14():
+    return delete_batch()
+
+@app.route('/api14/export/context', methods=['GET'])
+def export_context14():
+    return export_ndjson(make_public_task14)
+
+@app.route('/api14/search/context', methods=['GET'])
+def search_context14():
+    return search_tasks(make_public_task14)
+
+@app.route('/api14/suggest/context', methods=['GET'])
+def suggest_context14():
+    return suggest_tasks(make_public_task14)
+
+@app.route('/api14/changes', methods=['GET'])
+def get_changes14():
+    return changes_since(make_public_task14)
+
+@app.route('/api14/stream/context', methods=['GET'])
+def stream_context14():
+    return stream_events(make_public_task14)
+
+@app.route('/api14/stats/context', methods=['GET'])
+def stats_context14():
+    return show_stats()
+
 @app.route('/api14/fib/<int:x>')
 def fib14(x):
     return str(calcfib(x))
@@ -1297,65 +2291,98 @@ def proxy14():
 def index15():
     return render_template('index.html')
 
-def make_public_task15(task):
+def make_public_task15(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task15', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task15', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api15/get/context', methods=['GET'])
 def get_context15():
-    return jsonify({'context': list(map(make_public_task15, context))})
+    return list_context('get_context15', make_public_task15)
 
 @app.route('/api15/get/context/<int:task_id>', methods=['GET'])
 def get_task15(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task15(task[0])})
+    return show_task(task_id, make_public_task15)
 
 @app.route('/api15/post/context', methods=['POST'])
 def create_task15():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task15(task)}), 201
 
+@app.route('/api15/post/context/batch', methods=['POST'])
+def create_task_batch15():
+    return create_batch('get_task15')
+
 @app.route('/api15/put/context/<int:task_id>', methods=['PUT'])
 def update_task15(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task15(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task15(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api15/put/context/batch', methods=['PUT'])
+def update_task_batch15():
+    return update_batch()
 
 @app.route('/api15/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task15(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api15/delete/context/batch', methods=['DELETE'])
+def delete_task_batch15():
+    return delete_batch()
+
+@app.route('/api15/export/context', methods=['GET'])
+def export_context15():
+    return export_ndjson(make_public_task15)
+
+@app.route('/api15/search/context', methods=['GET'])
+def search_context15():
+    return search_tasks(make_public_task15)
+
+@app.route('/api15/suggest/context', methods=['GET'])
+def suggest_context15():
+    return suggest_tasks(make_public_task15)
+
+@app.route('/api15/changes', methods=['GET'])
+def get_changes15():
+    return changes_since(make_public_task15)
+
+@app.route('/api15/stream/context', methods=['GET'])
+def stream_context15():
+    return stream_events(make_public_task15)
+
+@app.route('/api15/stats/context', methods=['GET'])
+def stats_context15():
+    return show_stats()
+
 @app.route('/api15/fib/<int:x>')
 def fib15(x):
     return str(calcfib(x))
@@ -1383,65 +2410,98 @@ def proxy15():
 def index16():
     return render_template('index.html')
 
-def make_public_task16(task):
+def make_public_task16(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task16', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task16', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api16/get/context', methods=['GET'])
 def get_context16():
-    return jsonify({'context': list(map(make_public_task16, context))})
+    return list_context('get_context16', make_public_task16)
 
 @app.route('/api16/get/context/<int:task_id>', methods=['GET'])
 def get_task16(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task16(task[0])})
+    return show_task(task_id, make_public_task16)
 
 @app.route('/api16/post/context', methods=['POST'])
 def create_task16():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task16(task)}), 201
 
+@app.route('/api16/post/context/batch', methods=['POST'])
+def create_task_batch16():
+    return create_batch('get_task16')
+
 @app.route('/api16/put/context/<int:task_id>', methods=['PUT'])
 def update_task16(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task16(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task16(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api16/put/context/batch', methods=['PUT'])
+def update_task_batch16():
+    return update_batch()
 
 @app.route('/api16/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task16(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api16/delete/context/batch', methods=['DELETE'])
+def delete_task_batch16():
+    return delete_batch()
+
+@app.route('/api16/export/context', methods=['GET'])
+def export_context16():
+    return export_ndjson(make_public_task16)
+
+@app.route('/api16/search/context', methods=['GET'])
+def search_context16():
+    return search_tasks(make_public_task16)
+
+@app.route('/api16/suggest/context', methods=['GET'])
+def suggest_context16():
+    return suggest_tasks(make_public_task16)
+
+@app.route('/api16/changes', methods=['GET'])
+def get_changes16():
+    return changes_since(make_public_task16)
+
+@app.route('/api16/stream/context', methods=['GET'])
+def stream_context16():
+    return stream_events(make_public_task16)
+
+@app.route('/api16/stats/context', methods=['GET'])
+def stats_context16():
+    return show_stats()
+
 @app.route('/api16/fib/<int:x>')
 def fib16(x):
     return str(calcfib(x))
@@ -1469,65 +2529,98 @@ def proxy16():
 def index17():
     return render_template('index.html')
 
-def make_public_task17(task):
+def make_public_task17(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task17', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task17', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api17/get/context', methods=['GET'])
 def get_context17():
-    return jsonify({'context': list(map(make_public_task17, context))})
+    return list_context('get_context17', make_public_task17)
 
 @app.route('/api17/get/context/<int:task_id>', methods=['GET'])
 def get_task17(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task17(task[0])})
+    return show_task(task_id, make_public_task17)
 
 @app.route('/api17/post/context', methods=['POST'])
 def create_task17():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task17(task)}), 201
 
+@app.route('/api17/post/context/batch', methods=['POST'])
+def create_task_batch17():
+    return create_batch('get_task17')
+
 @app.route('/api17/put/context/<int:task_id>', methods=['PUT'])
 def update_task17(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task17(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task17(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api17/put/context/batch', methods=['PUT'])
+def update_task_batch17():
+    return update_batch()
 
 @app.route('/api17/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task17(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api17/delete/context/batch', methods=['DELETE'])
+def delete_task_batch17():
+    return delete_batch()
+
+@app.route('/api17/export/context', methods=['GET'])
+def export_context17():
+    return export_ndjson(make_public_task17)
+
+@app.route('/api17/search/context', methods=['GET'])
+def search_context17():
+    return search_tasks(make_public_task17)
+
+@app.route('/api17/suggest/context', methods=['GET'])
+def suggest_context17():
+    return suggest_tasks(make_public_task17)
+
+@app.route('/api17/changes', methods=['GET'])
+def get_changes17():
+    return changes_since(make_public_task17)
+
+@app.route('/api17/stream/context', methods=['GET'])
+def stream_context17():
+    return stream_events(make_public_task17)
+
+@app.route('/api17/stats/context', methods=['GET'])
+def stats_context17():
+    return show_stats()
+
 @app.route('/api17/fib/<int:x>')
 def fib17(x):
     return str(calcfib(x))
@@ -1555,71 +2648,104 @@ def proxy17():
 def index18():
     return render_template('index.html')
 
-def make_public_task18(task):
+def make_public_task18(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task18', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task18', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api18/get/context', methods=['GET'])
 def get_context18():
-    return jsonify({'context': list(map(make_public_task18, context))})
+    return list_context('get_context18', make_public_task18)
 
 @app.route('/api18/get/context/<int:task_id>', methods=['GET'])
 def get_task18(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task18(task[0])})
+    return show_task(task_id, make_public_task18)
 
 @app.route('/api18/post/context', methods=['POST'])
 def create_task18():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task18(task)}), 201
 
+@app.route('/api18/post/context/batch', methods=['POST'])
+def create_task_batch18():
+    return create_batch('get_task18')
+
 @app.route('/api18/put/context/<int:task_id>', methods=['PUT'])
 def update_task18(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task18(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task18(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api18/put/context/batch', methods=['PUT'])
+def update_task_batch18():
+    return update_batch()
 
 @app.route('/api18/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task18(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
-@app.route('/api18/fib/<int:x>')
-def fib18(x):
-    return str(calcfib(x))
+@app.route('/api18/delete/context/batch', methods=['DELETE'])
+def delete_task_batch18():
+    return delete_batch()
 
-@app.route('/api18/sleep/<int:x>')
-def delay18(x):
+@app.route('/api18/export/context', methods=['GET'])
+def export_context18():
+    return export_ndjson(make_public_task18)
+
+@app.route('/api18/search/context', methods=['GET'])
+def search_context18():
+    return search_tasks(make_public_task18)
+
+@app.route('/api18/suggest/context', methods=['GET'])
+def suggest_context18():
+    return suggest_tasks(make_public_task18)
+
+@app.route('/api18/changes', methods=['GET'])
+def get_changes18():
+    return changes_since(make_public_task18)
+
+@app.route('/api18/stream/context', methods=['GET'])
+def stream_context18():
+    return stream_events(make_public_task18)
+
+@app.route('/api18/stats/context', methods=['GET'])
+def stats_context18():
+    return show_stats()
+
+@app.route('/api18/fib/<int:x>')
+def fib18(x):
+    return str(calcfib(x))
+
+@app.route('/api18/sleep/<int:x>')
+def delay18(x):
     time.sleep(x)
     return "delayed by " + str(x) + " seconds"
 
@@ -1641,65 +2767,98 @@ def proxy18():
 def index19():
     return render_template('index.html')
 
-def make_public_task19(task):
+def make_public_task19(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task19', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task19', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api19/get/context', methods=['GET'])
 def get_context19():
-    return jsonify({'context': list(map(make_public_task19, context))})
+    return list_context('get_context19', make_public_task19)
 
 @app.route('/api19/get/context/<int:task_id>', methods=['GET'])
 def get_task19(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task19(task[0])})
+    return show_task(task_id, make_public_task19)
 
 @app.route('/api19/post/context', methods=['POST'])
 def create_task19():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task19(task)}), 201
 
+@app.route('/api19/post/context/batch', methods=['POST'])
+def create_task_batch19():
+    return create_batch('get_task19')
+
 @app.route('/api19/put/context/<int:task_id>', methods=['PUT'])
 def update_task19(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task19(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task19(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api19/put/context/batch', methods=['PUT'])
+def update_task_batch19():
+    return update_batch()
 
 @app.route('/api19/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task19(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api19/delete/context/batch', methods=['DELETE'])
+def delete_task_batch19():
+    return delete_batch()
+
+@app.route('/api19/export/context', methods=['GET'])
+def export_context19():
+    return export_ndjson(make_public_task19)
+
+@app.route('/api19/search/context', methods=['GET'])
+def search_context19():
+    return search_tasks(make_public_task19)
+
+@app.route('/api19/suggest/context', methods=['GET'])
+def suggest_context19():
+    return suggest_tasks(make_public_task19)
+
+@app.route('/api19/changes', methods=['GET'])
+def get_changes19():
+    return changes_since(make_public_task19)
+
+@app.route('/api19/stream/context', methods=['GET'])
+def stream_context19():
+    return stream_events(make_public_task19)
+
+@app.route('/api19/stats/context', methods=['GET'])
+def stats_context19():
+    return show_stats()
+
 @app.route('/api19/fib/<int:x>')
 def fib19(x):
     return str(calcfib(x))
@@ -1727,65 +2886,98 @@ def proxy19():
 def index20():
     return render_template('index.html')
 
-def make_public_task20(task):
+def make_public_task20(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task20', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task20', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api20/get/context', methods=['GET'])
 def get_context20():
-    return jsonify({'context': list(map(make_public_task20, context))})
+    return list_context('get_context20', make_public_task20)
 
 @app.route('/api20/get/context/<int:task_id>', methods=['GET'])
 def get_task20(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task20(task[0])})
+    return show_task(task_id, make_public_task20)
 
 @app.route('/api20/post/context', methods=['POST'])
 def create_task20():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task20(task)}), 201
 
+@app.route('/api20/post/context/batch', methods=['POST'])
+def create_task_batch20():
+    return create_batch('get_task20')
+
 @app.route('/api20/put/context/<int:task_id>', methods=['PUT'])
 def update_task20(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task20(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task20(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api20/put/context/batch', methods=['PUT'])
+def update_task_batch20():
+    return update_batch()
 
 @app.route('/api20/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task20(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api20/delete/context/batch', methods=['DELETE'])
+def delete_task_batch20():
+    return delete_batch()
+
+@app.route('/api20/export/context', methods=['GET'])
+def export_context20():
+    return export_ndjson(make_public_task20)
+
+@app.route('/api20/search/context', methods=['GET'])
+def search_context20():
+    return search_tasks(make_public_task20)
+
+@app.route('/api20/suggest/context', methods=['GET'])
+def suggest_context20():
+    return suggest_tasks(make_public_task20)
+
+@app.route('/api20/changes', methods=['GET'])
+def get_changes20():
+    return changes_since(make_public_task20)
+
+@app.route('/api20/stream/context', methods=['GET'])
+def stream_context20():
+    return stream_events(make_public_task20)
+
+@app.route('/api20/stats/context', methods=['GET'])
+def stats_context20():
+    return show_stats()
+
 @app.route('/api20/fib/<int:x>')
 def fib20(x):
     return str(calcfib(x))
@@ -1813,65 +3005,98 @@ def proxy20():
 def index21():
     return render_template('index.html')
 
-def make_public_task21(task):
+def make_public_task21(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task21', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task21', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api21/get/context', methods=['GET'])
 def get_context21():
-    return jsonify({'context': list(map(make_public_task21, context))})
+    return list_context('get_context21', make_public_task21)
 
 @app.route('/api21/get/context/<int:task_id>', methods=['GET'])
 def get_task21(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task21(task[0])})
+    return show_task(task_id, make_public_task21)
 
 @app.route('/api21/post/context', methods=['POST'])
 def create_task21():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task21(task)}), 201
 
+@app.route('/api21/post/context/batch', methods=['POST'])
+def create_task_batch21():
+    return create_batch('get_task21')
+
 @app.route('/api21/put/context/<int:task_id>', methods=['PUT'])
 def update_task21(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task21(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task21(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api21/put/context/batch', methods=['PUT'])
+def update_task_batch21():
+    return update_batch()
 
 @app.route('/api21/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task21(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api21/delete/context/batch', methods=['DELETE'])
+def delete_task_batch21():
+    return delete_batch()
+
+@app.route('/api21/export/context', methods=['GET'])
+def export_context21():
+    return export_ndjson(make_public_task21)
+
+@app.route('/api21/search/context', methods=['GET'])
+def search_context21():
+    return search_tasks(make_public_task21)
+
+@app.route('/api21/suggest/context', methods=['GET'])
+def suggest_context21():
+    return suggest_tasks(make_public_task21)
+
+@app.route('/api21/changes', methods=['GET'])
+def get_changes21():
+    return changes_since(make_public_task21)
+
+@app.route('/api21/stream/context', methods=['GET'])
+def stream_context21():
+    return stream_events(make_public_task21)
+
+@app.route('/api21/stats/context', methods=['GET'])
+def stats_context21():
+    return show_stats()
+
 @app.route('/api21/fib/<int:x>')
 def fib21(x):
     return str(calcfib(x))
@@ -1899,65 +3124,98 @@ def proxy21():
 def index22():
     return render_template('index.html')
 
-def make_public_task22(task):
+def make_public_task22(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task22', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task22', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api22/get/context', methods=['GET'])
 def get_context22():
-    return jsonify({'context': list(map(make_public_task22, context))})
+    return list_context('get_context22', make_public_task22)
 
 @app.route('/api22/get/context/<int:task_id>', methods=['GET'])
 def get_task22(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task22(task[0])})
+    return show_task(task_id, make_public_task22)
 
 @app.route('/api22/post/context', methods=['POST'])
 def create_task22():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task22(task)}), 201
 
+@app.route('/api22/post/context/batch', methods=['POST'])
+def create_task_batch22():
+    return create_batch('get_task22')
+
 @app.route('/api22/put/context/<int:task_id>', methods=['PUT'])
 def update_task22(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task22(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task22(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api22/put/context/batch', methods=['PUT'])
+def update_task_batch22():
+    return update_batch()
 
 @app.route('/api22/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task22(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api22/delete/context/batch', methods=['DELETE'])
+def delete_task_batch22():
+    return delete_batch()
+
+@app.route('/api22/export/context', methods=['GET'])
+def export_context22():
+    return export_ndjson(make_public_task22)
+
+@app.route('/api22/search/context', methods=['GET'])
+def search_context22():
+    return search_tasks(make_public_task22)
+
+@app.route('/api22/suggest/context', methods=['GET'])
+def suggest_context22():
+    return suggest_tasks(make_public_task22)
+
+@app.route('/api22/changes', methods=['GET'])
+def get_changes22():
+    return changes_since(make_public_task22)
+
+@app.route('/api22/stream/context', methods=['GET'])
+def stream_context22():
+    return stream_events(make_public_task22)
+
+@app.route('/api22/stats/context', methods=['GET'])
+def stats_context22():
+    return show_stats()
+
 @app.route('/api22/fib/<int:x>')
 def fib22(x):
     return str(calcfib(x))
@@ -1985,65 +3243,98 @@ def proxy22():
 def index23():
     return render_template('index.html')
 
-def make_public_task23(task):
+def make_public_task23(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task23', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task23', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api23/get/context', methods=['GET'])
 def get_context23():
-    return jsonify({'context': list(map(make_public_task23, context))})
+    return list_context('get_context23', make_public_task23)
 
 @app.route('/api23/get/context/<int:task_id>', methods=['GET'])
 def get_task23(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task23(task[0])})
+    return show_task(task_id, make_public_task23)
 
 @app.route('/api23/post/context', methods=['POST'])
 def create_task23():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task23(task)}), 201
 
+@app.route('/api23/post/context/batch', methods=['POST'])
+def create_task_batch23():
+    return create_batch('get_task23')
+
 @app.route('/api23/put/context/<int:task_id>', methods=['PUT'])
 def update_task23(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task23(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task23(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api23/put/context/batch', methods=['PUT'])
+def update_task_batch23():
+    return update_batch()
 
 @app.route('/api23/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task23(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api23/delete/context/batch', methods=['DELETE'])
+def delete_task_batch23():
+    return delete_batch()
+
+@app.route('/api23/export/context', methods=['GET'])
+def export_context23():
+    return export_ndjson(make_public_task23)
+
+@app.route('/api23/search/context', methods=['GET'])
+def search_context23():
+    return search_tasks(make_public_task23)
+
+@app.route('/api23/suggest/context', methods=['GET'])
+def suggest_context23():
+    return suggest_tasks(make_public_task23)
+
+@app.route('/api23/changes', methods=['GET'])
+def get_changes23():
+    return changes_since(make_public_task23)
+
+@app.route('/api23/stream/context', methods=['GET'])
+def stream_context23():
+    return stream_events(make_public_task23)
+
+@app.route('/api23/stats/context', methods=['GET'])
+def stats_context23():
+    return show_stats()
+
 @app.route('/api23/fib/<int:x>')
 def fib23(x):
     return str(calcfib(x))
@@ -2071,65 +3362,98 @@ def proxy23():
 def index24():
     return render_template('index.html')
 
-def make_public_task24(task):
+def make_public_task24(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task24', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task24', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api24/get/context', methods=['GET'])
 def get_context24():
-    return jsonify({'context': list(map(make_public_task24, context))})
+    return list_context('get_context24', make_public_task24)
 
 @app.route('/api24/get/context/<int:task_id>', methods=['GET'])
 def get_task24(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task24(task[0])})
+    return show_task(task_id, make_public_task24)
 
 @app.route('/api24/post/context', methods=['POST'])
 def create_task24():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task24(task)}), 201
 
+@app.route('/api24/post/context/batch', methods=['POST'])
+def create_task_batch24():
+    return create_batch('get_task24')
+
 @app.route('/api24/put/context/<int:task_id>', methods=['PUT'])
 def update_task24(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task24(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task24(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api24/put/context/batch', methods=['PUT'])
+def update_task_batch24():
+    return update_batch()
 
 @app.route('/api24/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task24(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api24/delete/context/batch', methods=['DELETE'])
+def delete_task_batch24():
+    return delete_batch()
+
+@app.route('/api24/export/context', methods=['GET'])
+def export_context24():
+    return export_ndjson(make_public_task24)
+
+@app.route('/api24/search/context', methods=['GET'])
+def search_context24():
+    return search_tasks(make_public_task24)
+
+@app.route('/api24/suggest/context', methods=['GET'])
+def suggest_context24():
+    return suggest_tasks(make_public_task24)
+
+@app.route('/api24/changes', methods=['GET'])
+def get_changes24():
+    return changes_since(make_public_task24)
+
+@app.route('/api24/stream/context', methods=['GET'])
+def stream_context24():
+    return stream_events(make_public_task24)
+
+@app.route('/api24/stats/context', methods=['GET'])
+def stats_context24():
+    return show_stats()
+
 @app.route('/api24/fib/<int:x>')
 def fib24(x):
     return str(calcfib(x))
@@ -2157,65 +3481,98 @@ def proxy24():
 def index25():
     return render_template('index.html')
 
-def make_public_task25(task):
+def make_public_task25(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task25', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task25', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api25/get/context', methods=['GET'])
 def get_context25():
-    return jsonify({'context': list(map(make_public_task25, context))})
+    return list_context('get_context25', make_public_task25)
 
 @app.route('/api25/get/context/<int:task_id>', methods=['GET'])
 def get_task25(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task25(task[0])})
+    return show_task(task_id, make_public_task25)
 
 @app.route('/api25/post/context', methods=['POST'])
 def create_task25():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task25(task)}), 201
 
+@app.route('/api25/post/context/batch', methods=['POST'])
+def create_task_batch25():
+    return create_batch('get_task25')
+
 @app.route('/api25/put/context/<int:task_id>', methods=['PUT'])
 def update_task25(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task25(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task25(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api25/put/context/batch', methods=['PUT'])
+def update_task_batch25():
+    return update_batch()
 
 @app.route('/api25/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task25(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api25/delete/context/batch', methods=['DELETE'])
+def delete_task_batch25():
+    return delete_batch()
+
+@app.route('/api25/export/context', methods=['GET'])
+def export_context25():
+    return export_ndjson(make_public_task25)
+
+@app.route('/api25/search/context', methods=['GET'])
+def search_context25():
+    return search_tasks(make_public_task25)
+
+@app.route('/api25/suggest/context', methods=['GET'])
+def suggest_context25():
+    return suggest_tasks(make_public_task25)
+
+@app.route('/api25/changes', methods=['GET'])
+def get_changes25():
+    return changes_since(make_public_task25)
+
+@app.route('/api25/stream/context', methods=['GET'])
+def stream_context25():
+    return stream_events(make_public_task25)
+
+@app.route('/api25/stats/context', methods=['GET'])
+def stats_context25():
+    return show_stats()
+
 @app.route('/api25/fib/<int:x>')
 def fib25(x):
     return str(calcfib(x))
@@ -2243,65 +3600,98 @@ def proxy25():
 def index26():
     return render_template('index.html')
 
-def make_public_task26(task):
+def make_public_task26(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task26', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task26', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api26/get/context', methods=['GET'])
 def get_context26():
-    return jsonify({'context': list(map(make_public_task26, context))})
+    return list_context('get_context26', make_public_task26)
 
 @app.route('/api26/get/context/<int:task_id>', methods=['GET'])
 def get_task26(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task26(task[0])})
+    return show_task(task_id, make_public_task26)
 
 @app.route('/api26/post/context', methods=['POST'])
 def create_task26():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task26(task)}), 201
 
+@app.route('/api26/post/context/batch', methods=['POST'])
+def create_task_batch26():
+    return create_batch('get_task26')
+
 @app.route('/api26/put/context/<int:task_id>', methods=['PUT'])
 def update_task26(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task26(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task26(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api26/put/context/batch', methods=['PUT'])
+def update_task_batch26():
+    return update_batch()
 
 @app.route('/api26/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task26(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api26/delete/context/batch', methods=['DELETE'])
+def delete_task_batch26():
+    return delete_batch()
+
+@app.route('/api26/export/context', methods=['GET'])
+def export_context26():
+    return export_ndjson(make_public_task26)
+
+@app.route('/api26/search/context', methods=['GET'])
+def search_context26():
+    return search_tasks(make_public_task26)
+
+@app.route('/api26/suggest/context', methods=['GET'])
+def suggest_context26():
+    return suggest_tasks(make_public_task26)
+
+@app.route('/api26/changes', methods=['GET'])
+def get_changes26():
+    return changes_since(make_public_task26)
+
+@app.route('/api26/stream/context', methods=['GET'])
+def stream_context26():
+    return stream_events(make_public_task26)
+
+@app.route('/api26/stats/context', methods=['GET'])
+def stats_context26():
+    return show_stats()
+
 @app.route('/api26/fib/<int:x>')
 def fib26(x):
     return str(calcfib(x))
@@ -2329,65 +3719,98 @@ def proxy26():
 def index27():
     return render_template('index.html')
 
-def make_public_task27(task):
+def make_public_task27(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task27', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task27', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api27/get/context', methods=['GET'])
 def get_context27():
-    return jsonify({'context': list(map(make_public_task27, context))})
+    return list_context('get_context27', make_public_task27)
 
 @app.route('/api27/get/context/<int:task_id>', methods=['GET'])
 def get_task27(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task27(task[0])})
+    return show_task(task_id, make_public_task27)
 
 @app.route('/api27/post/context', methods=['POST'])
 def create_task27():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task27(task)}), 201
 
+@app.route('/api27/post/context/batch', methods=['POST'])
+def create_task_batch27():
+    return create_batch('get_task27')
+
 @app.route('/api27/put/context/<int:task_id>', methods=['PUT'])
 def update_task27(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task27(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task27(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api27/put/context/batch', methods=['PUT'])
+def update_task_batch27():
+    return update_batch()
 
 @app.route('/api27/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task27(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api27/delete/context/batch', methods=['DELETE'])
+def delete_task_batch27():
+    return delete_batch()
+
+@app.route('/api27/export/context', methods=['GET'])
+def export_context27():
+    return export_ndjson(make_public_task27)
+
+@app.route('/api27/search/context', methods=['GET'])
+def search_context27():
+    return search_tasks(make_public_task27)
+
+@app.route('/api27/suggest/context', methods=['GET'])
+def suggest_context27():
+    return suggest_tasks(make_public_task27)
+
+@app.route('/api27/changes', methods=['GET'])
+def get_changes27():
+    return changes_since(make_public_task27)
+
+@app.route('/api27/stream/context', methods=['GET'])
+def stream_context27():
+    return stream_events(make_public_task27)
+
+@app.route('/api27/stats/context', methods=['GET'])
+def stats_context27():
+    return show_stats()
+
 @app.route('/api27/fib/<int:x>')
 def fib27(x):
     return str(calcfib(x))
@@ -2415,65 +3838,98 @@ def proxy27():
 def index28():
     return render_template('index.html')
 
-def make_public_task28(task):
+def make_public_task28(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task28', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task28', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api28/get/context', methods=['GET'])
 def get_context28():
-    return jsonify({'context': list(map(make_public_task28, context))})
+    return list_context('get_context28', make_public_task28)
 
 @app.route('/api28/get/context/<int:task_id>', methods=['GET'])
 def get_task28(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task28(task[0])})
+    return show_task(task_id, make_public_task28)
 
 @app.route('/api28/post/context', methods=['POST'])
 def create_task28():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task28(task)}), 201
 
+@app.route('/api28/post/context/batch', methods=['POST'])
+def create_task_batch28():
+    return create_batch('get_task28')
+
 @app.route('/api28/put/context/<int:task_id>', methods=['PUT'])
 def update_task28(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task28(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task28(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api28/put/context/batch', methods=['PUT'])
+def update_task_batch28():
+    return update_batch()
 
 @app.route('/api28/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task28(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api28/delete/context/batch', methods=['DELETE'])
+def delete_task_batch28():
+    return delete_batch()
+
+@app.route('/api28/export/context', methods=['GET'])
+def export_context28():
+    return export_ndjson(make_public_task28)
+
+@app.route('/api28/search/context', methods=['GET'])
+def search_context28():
+    return search_tasks(make_public_task28)
+
+@app.route('/api28/suggest/context', methods=['GET'])
+def suggest_context28():
+    return suggest_tasks(make_public_task28)
+
+@app.route('/api28/changes', methods=['GET'])
+def get_changes28():
+    return changes_since(make_public_task28)
+
+@app.route('/api28/stream/context', methods=['GET'])
+def stream_context28():
+    return stream_events(make_public_task28)
+
+@app.route('/api28/stats/context', methods=['GET'])
+def stats_context28():
+    return show_stats()
+
 @app.route('/api28/fib/<int:x>')
 def fib28(x):
     return str(calcfib(x))
@@ -2501,65 +3957,98 @@ def proxy28():
 def index29():
     return render_template('index.html')
 
-def make_public_task29(task):
+def make_public_task29(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task29', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task29', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api29/get/context', methods=['GET'])
 def get_context29():
-    return jsonify({'context': list(map(make_public_task29, context))})
+    return list_context('get_context29', make_public_task29)
 
 @app.route('/api29/get/context/<int:task_id>', methods=['GET'])
 def get_task29(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task29(task[0])})
+    return show_task(task_id, make_public_task29)
 
 @app.route('/api29/post/context', methods=['POST'])
 def create_task29():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task29(task)}), 201
 
+@app.route('/api29/post/context/batch', methods=['POST'])
+def create_task_batch29():
+    return create_batch('get_task29')
+
 @app.route('/api29/put/context/<int:task_id>', methods=['PUT'])
 def update_task29(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task29(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task29(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api29/put/context/batch', methods=['PUT'])
+def update_task_batch29():
+    return update_batch()
 
 @app.route('/api29/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task29(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api29/delete/context/batch', methods=['DELETE'])
+def delete_task_batch29():
+    return delete_batch()
+
+@app.route('/api29/export/context', methods=['GET'])
+def export_context29():
+    return export_ndjson(make_public_task29)
+
+@app.route('/api29/search/context', methods=['GET'])
+def search_context29():
+    return search_tasks(make_public_task29)
+
+@app.route('/api29/suggest/context', methods=['GET'])
+def suggest_context29():
+    return suggest_tasks(make_public_task29)
+
+@app.route('/api29/changes', methods=['GET'])
+def get_changes29():
+    return changes_since(make_public_task29)
+
+@app.route('/api29/stream/context', methods=['GET'])
+def stream_context29():
+    return stream_events(make_public_task29)
+
+@app.route('/api29/stats/context', methods=['GET'])
+def stats_context29():
+    return show_stats()
+
 @app.route('/api29/fib/<int:x>')
 def fib29(x):
     return str(calcfib(x))
@@ -2587,65 +4076,98 @@ def proxy29():
 def index30():
     return render_template('index.html')
 
-def make_public_task30(task):
+def make_public_task30(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task30', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task30', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api30/get/context', methods=['GET'])
 def get_context30():
-    return jsonify({'context': list(map(make_public_task30, context))})
+    return list_context('get_context30', make_public_task30)
 
 @app.route('/api30/get/context/<int:task_id>', methods=['GET'])
 def get_task30(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task30(task[0])})
+    return show_task(task_id, make_public_task30)
 
 @app.route('/api30/post/context', methods=['POST'])
 def create_task30():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task30(task)}), 201
 
+@app.route('/api30/post/context/batch', methods=['POST'])
+def create_task_batch30():
+    return create_batch('get_task30')
+
 @app.route('/api30/put/context/<int:task_id>', methods=['PUT'])
 def update_task30(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task30(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task30(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api30/put/context/batch', methods=['PUT'])
+def update_task_batch30():
+    return update_batch()
 
 @app.route('/api30/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task30(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api30/delete/context/batch', methods=['DELETE'])
+def delete_task_batch30():
+    return delete_batch()
+
+@app.route('/api30/export/context', methods=['GET'])
+def export_context30():
+    return export_ndjson(make_public_task30)
+
+@app.route('/api30/search/context', methods=['GET'])
+def search_context30():
+    return search_tasks(make_public_task30)
+
+@app.route('/api30/suggest/context', methods=['GET'])
+def suggest_context30():
+    return suggest_tasks(make_public_task30)
+
+@app.route('/api30/changes', methods=['GET'])
+def get_changes30():
+    return changes_since(make_public_task30)
+
+@app.route('/api30/stream/context', methods=['GET'])
+def stream_context30():
+    return stream_events(make_public_task30)
+
+@app.route('/api30/stats/context', methods=['GET'])
+def stats_context30():
+    return show_stats()
+
 @app.route('/api30/fib/<int:x>')
 def fib30(x):
     return str(calcfib(x))
@@ -2673,65 +4195,98 @@ def proxy30():
 def index31():
     return render_template('index.html')
 
-def make_public_task31(task):
+def make_public_task31(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task31', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task31', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api31/get/context', methods=['GET'])
 def get_context31():
-    return jsonify({'context': list(map(make_public_task31, context))})
+    return list_context('get_context31', make_public_task31)
 
 @app.route('/api31/get/context/<int:task_id>', methods=['GET'])
 def get_task31(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task31(task[0])})
+    return show_task(task_id, make_public_task31)
 
 @app.route('/api31/post/context', methods=['POST'])
 def create_task31():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task31(task)}), 201
 
+@app.route('/api31/post/context/batch', methods=['POST'])
+def create_task_batch31():
+    return create_batch('get_task31')
+
 @app.route('/api31/put/context/<int:task_id>', methods=['PUT'])
 def update_task31(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task31(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task31(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api31/put/context/batch', methods=['PUT'])
+def update_task_batch31():
+    return update_batch()
 
 @app.route('/api31/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task31(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api31/delete/context/batch', methods=['DELETE'])
+def delete_task_batch31():
+    return delete_batch()
+
+@app.route('/api31/export/context', methods=['GET'])
+def export_context31():
+    return export_ndjson(make_public_task31)
+
+@app.route('/api31/search/context', methods=['GET'])
+def search_context31():
+    return search_tasks(make_public_task31)
+
+@app.route('/api31/suggest/context', methods=['GET'])
+def suggest_context31():
+    return suggest_tasks(make_public_task31)
+
+@app.route('/api31/changes', methods=['GET'])
+def get_changes31():
+    return changes_since(make_public_task31)
+
+@app.route('/api31/stream/context', methods=['GET'])
+def stream_context31():
+    return stream_events(make_public_task31)
+
+@app.route('/api31/stats/context', methods=['GET'])
+def stats_context31():
+    return show_stats()
+
 @app.route('/api31/fib/<int:x>')
 def fib31(x):
     return str(calcfib(x))
@@ -2759,65 +4314,98 @@ def proxy31():
 def index32():
     return render_template('index.html')
 
-def make_public_task32(task):
+def make_public_task32(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task32', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task32', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api32/get/context', methods=['GET'])
 def get_context32():
-    return jsonify({'context': list(map(make_public_task32, context))})
+    return list_context('get_context32', make_public_task32)
 
 @app.route('/api32/get/context/<int:task_id>', methods=['GET'])
 def get_task32(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task32(task[0])})
+    return show_task(task_id, make_public_task32)
 
 @app.route('/api32/post/context', methods=['POST'])
 def create_task32():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task32(task)}), 201
 
+@app.route('/api32/post/context/batch', methods=['POST'])
+def create_task_batch32():
+    return create_batch('get_task32')
+
 @app.route('/api32/put/context/<int:task_id>', methods=['PUT'])
 def update_task32(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task32(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task32(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api32/put/context/batch', methods=['PUT'])
+def update_task_batch32():
+    return update_batch()
 
 @app.route('/api32/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task32(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api32/delete/context/batch', methods=['DELETE'])
+def delete_task_batch32():
+    return delete_batch()
+
+@app.route('/api32/export/context', methods=['GET'])
+def export_context32():
+    return export_ndjson(make_public_task32)
+
+@app.route('/api32/search/context', methods=['GET'])
+def search_context32():
+    return search_tasks(make_public_task32)
+
+@app.route('/api32/suggest/context', methods=['GET'])
+def suggest_context32():
+    return suggest_tasks(make_public_task32)
+
+@app.route('/api32/changes', methods=['GET'])
+def get_changes32():
+    return changes_since(make_public_task32)
+
+@app.route('/api32/stream/context', methods=['GET'])
+def stream_context32():
+    return stream_events(make_public_task32)
+
+@app.route('/api32/stats/context', methods=['GET'])
+def stats_context32():
+    return show_stats()
+
 @app.route('/api32/fib/<int:x>')
 def fib32(x):
     return str(calcfib(x))
@@ -2845,65 +4433,98 @@ def proxy32():
 def index33():
     return render_template('index.html')
 
-def make_public_task33(task):
+def make_public_task33(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task33', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task33', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api33/get/context', methods=['GET'])
 def get_context33():
-    return jsonify({'context': list(map(make_public_task33, context))})
+    return list_context('get_context33', make_public_task33)
 
 @app.route('/api33/get/context/<int:task_id>', methods=['GET'])
 def get_task33(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task33(task[0])})
+    return show_task(task_id, make_public_task33)
 
 @app.route('/api33/post/context', methods=['POST'])
 def create_task33():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task33(task)}), 201
 
+@app.route('/api33/post/context/batch', methods=['POST'])
+def create_task_batch33():
+    return create_batch('get_task33')
+
 @app.route('/api33/put/context/<int:task_id>', methods=['PUT'])
 def update_task33(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task33(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task33(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api33/put/context/batch', methods=['PUT'])
+def update_task_batch33():
+    return update_batch()
 
 @app.route('/api33/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task33(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api33/delete/context/batch', methods=['DELETE'])
+def delete_task_batch33():
+    return delete_batch()
+
+@app.route('/api33/export/context', methods=['GET'])
+def export_context33():
+    return export_ndjson(make_public_task33)
+
+@app.route('/api33/search/context', methods=['GET'])
+def search_context33():
+    return search_tasks(make_public_task33)
+
+@app.route('/api33/suggest/context', methods=['GET'])
+def suggest_context33():
+    return suggest_tasks(make_public_task33)
+
+@app.route('/api33/changes', methods=['GET'])
+def get_changes33():
+    return changes_since(make_public_task33)
+
+@app.route('/api33/stream/context', methods=['GET'])
+def stream_context33():
+    return stream_events(make_public_task33)
+
+@app.route('/api33/stats/context', methods=['GET'])
+def stats_context33():
+    return show_stats()
+
 @app.route('/api33/fib/<int:x>')
 def fib33(x):
     return str(calcfib(x))
@@ -2931,65 +4552,98 @@ def proxy33():
 def index34():
     return render_template('index.html')
 
-def make_public_task34(task):
+def make_public_task34(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task34', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task34', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api34/get/context', methods=['GET'])
 def get_context34():
-    return jsonify({'context': list(map(make_public_task34, context))})
+    return list_context('get_context34', make_public_task34)
 
 @app.route('/api34/get/context/<int:task_id>', methods=['GET'])
 def get_task34(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task34(task[0])})
+    return show_task(task_id, make_public_task34)
 
 @app.route('/api34/post/context', methods=['POST'])
 def create_task34():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task34(task)}), 201
 
+@app.route('/api34/post/context/batch', methods=['POST'])
+def create_task_batch34():
+    return create_batch('get_task34')
+
 @app.route('/api34/put/context/<int:task_id>', methods=['PUT'])
 def update_task34(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task34(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task34(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api34/put/context/batch', methods=['PUT'])
+def update_task_batch34():
+    return update_batch()
 
 @app.route('/api34/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task34(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api34/delete/context/batch', methods=['DELETE'])
+def delete_task_batch34():
+    return delete_batch()
+
+@app.route('/api34/export/context', methods=['GET'])
+def export_context34():
+    return export_ndjson(make_public_task34)
+
+@app.route('/api34/search/context', methods=['GET'])
+def search_context34():
+    return search_tasks(make_public_task34)
+
+@app.route('/api34/suggest/context', methods=['GET'])
+def suggest_context34():
+    return suggest_tasks(make_public_task34)
+
+@app.route('/api34/changes', methods=['GET'])
+def get_changes34():
+    return changes_since(make_public_task34)
+
+@app.route('/api34/stream/context', methods=['GET'])
+def stream_context34():
+    return stream_events(make_public_task34)
+
+@app.route('/api34/stats/context', methods=['GET'])
+def stats_context34():
+    return show_stats()
+
 @app.route('/api34/fib/<int:x>')
 def fib34(x):
     return str(calcfib(x))
@@ -3017,65 +4671,98 @@ def proxy34():
 def index35():
     return render_template('index.html')
 
-def make_public_task35(task):
+def make_public_task35(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task35', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task35', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api35/get/context', methods=['GET'])
 def get_context35():
-    return jsonify({'context': list(map(make_public_task35, context))})
+    return list_context('get_context35', make_public_task35)
 
 @app.route('/api35/get/context/<int:task_id>', methods=['GET'])
 def get_task35(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task35(task[0])})
+    return show_task(task_id, make_public_task35)
 
 @app.route('/api35/post/context', methods=['POST'])
 def create_task35():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task35(task)}), 201
 
+@app.route('/api35/post/context/batch', methods=['POST'])
+def create_task_batch35():
+    return create_batch('get_task35')
+
 @app.route('/api35/put/context/<int:task_id>', methods=['PUT'])
 def update_task35(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task35(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task35(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api35/put/context/batch', methods=['PUT'])
+def update_task_batch35():
+    return update_batch()
 
 @app.route('/api35/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task35(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api35/delete/context/batch', methods=['DELETE'])
+def delete_task_batch35():
+    return delete_batch()
+
+@app.route('/api35/export/context', methods=['GET'])
+def export_context35():
+    return export_ndjson(make_public_task35)
+
+@app.route('/api35/search/context', methods=['GET'])
+def search_context35():
+    return search_tasks(make_public_task35)
+
+@app.route('/api35/suggest/context', methods=['GET'])
+def suggest_context35():
+    return suggest_tasks(make_public_task35)
+
+@app.route('/api35/changes', methods=['GET'])
+def get_changes35():
+    return changes_since(make_public_task35)
+
+@app.route('/api35/stream/context', methods=['GET'])
+def stream_context35():
+    return stream_events(make_public_task35)
+
+@app.route('/api35/stats/context', methods=['GET'])
+def stats_context35():
+    return show_stats()
+
 @app.route('/api35/fib/<int:x>')
 def fib35(x):
     return str(calcfib(x))
@@ -3103,65 +4790,98 @@ def proxy35():
 def index36():
     return render_template('index.html')
 
-def make_public_task36(task):
+def make_public_task36(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task36', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task36', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api36/get/context', methods=['GET'])
 def get_context36():
-    return jsonify({'context': list(map(make_public_task36, context))})
+    return list_context('get_context36', make_public_task36)
 
 @app.route('/api36/get/context/<int:task_id>', methods=['GET'])
 def get_task36(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task36(task[0])})
+    return show_task(task_id, make_public_task36)
 
 @app.route('/api36/post/context', methods=['POST'])
 def create_task36():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task36(task)}), 201
 
+@app.route('/api36/post/context/batch', methods=['POST'])
+def create_task_batch36():
+    return create_batch('get_task36')
+
 @app.route('/api36/put/context/<int:task_id>', methods=['PUT'])
 def update_task36(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task36(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task36(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api36/put/context/batch', methods=['PUT'])
+def update_task_batch36():
+    return update_batch()
 
 @app.route('/api36/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task36(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api36/delete/context/batch', methods=['DELETE'])
+def delete_task_batch36():
+    return delete_batch()
+
+@app.route('/api36/export/context', methods=['GET'])
+def export_context36():
+    return export_ndjson(make_public_task36)
+
+@app.route('/api36/search/context', methods=['GET'])
+def search_context36():
+    return search_tasks(make_public_task36)
+
+@app.route('/api36/suggest/context', methods=['GET'])
+def suggest_context36():
+    return suggest_tasks(make_public_task36)
+
+@app.route('/api36/changes', methods=['GET'])
+def get_changes36():
+    return changes_since(make_public_task36)
+
+@app.route('/api36/stream/context', methods=['GET'])
+def stream_context36():
+    return stream_events(make_public_task36)
+
+@app.route('/api36/stats/context', methods=['GET'])
+def stats_context36():
+    return show_stats()
+
 @app.route('/api36/fib/<int:x>')
 def fib36(x):
     return str(calcfib(x))
@@ -3189,65 +4909,98 @@ def proxy36():
 def index37():
     return render_template('index.html')
 
-def make_public_task37(task):
+def make_public_task37(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task37', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task37', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api37/get/context', methods=['GET'])
 def get_context37():
-    return jsonify({'context': list(map(make_public_task37, context))})
+    return list_context('get_context37', make_public_task37)
 
 @app.route('/api37/get/context/<int:task_id>', methods=['GET'])
 def get_task37(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task37(task[0])})
+    return show_task(task_id, make_public_task37)
 
 @app.route('/api37/post/context', methods=['POST'])
 def create_task37():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task37(task)}), 201
 
+@app.route('/api37/post/context/batch', methods=['POST'])
+def create_task_batch37():
+    return create_batch('get_task37')
+
 @app.route('/api37/put/context/<int:task_id>', methods=['PUT'])
 def update_task37(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task37(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task37(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api37/put/context/batch', methods=['PUT'])
+def update_task_batch37():
+    return update_batch()
 
 @app.route('/api37/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task37(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api37/delete/context/batch', methods=['DELETE'])
+def delete_task_batch37():
+    return delete_batch()
+
+@app.route('/api37/export/context', methods=['GET'])
+def export_context37():
+    return export_ndjson(make_public_task37)
+
+@app.route('/api37/search/context', methods=['GET'])
+def search_context37():
+    return search_tasks(make_public_task37)
+
+@app.route('/api37/suggest/context', methods=['GET'])
+def suggest_context37():
+    return suggest_tasks(make_public_task37)
+
+@app.route('/api37/changes', methods=['GET'])
+def get_changes37():
+    return changes_since(make_public_task37)
+
+@app.route('/api37/stream/context', methods=['GET'])
+def stream_context37():
+    return stream_events(make_public_task37)
+
+@app.route('/api37/stats/context', methods=['GET'])
+def stats_context37():
+    return show_stats()
+
 @app.route('/api37/fib/<int:x>')
 def fib37(x):
     return str(calcfib(x))
@@ -3275,65 +5028,98 @@ def proxy37():
 def index38():
     return render_template('index.html')
 
-def make_public_task38(task):
+def make_public_task38(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task38', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task38', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api38/get/context', methods=['GET'])
 def get_context38():
-    return jsonify({'context': list(map(make_public_task38, context))})
+    return list_context('get_context38', make_public_task38)
 
 @app.route('/api38/get/context/<int:task_id>', methods=['GET'])
 def get_task38(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task38(task[0])})
+    return show_task(task_id, make_public_task38)
 
 @app.route('/api38/post/context', methods=['POST'])
 def create_task38():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task38(task)}), 201
 
+@app.route('/api38/post/context/batch', methods=['POST'])
+def create_task_batch38():
+    return create_batch('get_task38')
+
 @app.route('/api38/put/context/<int:task_id>', methods=['PUT'])
 def update_task38(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task38(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task38(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api38/put/context/batch', methods=['PUT'])
+def update_task_batch38():
+    return update_batch()
 
 @app.route('/api38/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task38(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api38/delete/context/batch', methods=['DELETE'])
+def delete_task_batch38():
+    return delete_batch()
+
+@app.route('/api38/export/context', methods=['GET'])
+def export_context38():
+    return export_ndjson(make_public_task38)
+
+@app.route('/api38/search/context', methods=['GET'])
+def search_context38():
+    return search_tasks(make_public_task38)
+
+@app.route('/api38/suggest/context', methods=['GET'])
+def suggest_context38():
+    return suggest_tasks(make_public_task38)
+
+@app.route('/api38/changes', methods=['GET'])
+def get_changes38():
+    return changes_since(make_public_task38)
+
+@app.route('/api38/stream/context', methods=['GET'])
+def stream_context38():
+    return stream_events(make_public_task38)
+
+@app.route('/api38/stats/context', methods=['GET'])
+def stats_context38():
+    return show_stats()
+
 @app.route('/api38/fib/<int:x>')
 def fib38(x):
     return str(calcfib(x))
@@ -3361,65 +5147,98 @@ def proxy38():
 def index39():
     return render_template('index.html')
 
-def make_public_task39(task):
+def make_public_task39(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task39', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task39', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api39/get/context', methods=['GET'])
 def get_context39():
-    return jsonify({'context': list(map(make_public_task39, context))})
+    return list_context('get_context39', make_public_task39)
 
 @app.route('/api39/get/context/<int:task_id>', methods=['GET'])
 def get_task39(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task39(task[0])})
+    return show_task(task_id, make_public_task39)
 
 @app.route('/api39/post/context', methods=['POST'])
 def create_task39():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task39(task)}), 201
 
+@app.route('/api39/post/context/batch', methods=['POST'])
+def create_task_batch39():
+    return create_batch('get_task39')
+
 @app.route('/api39/put/context/<int:task_id>', methods=['PUT'])
 def update_task39(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task39(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task39(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api39/put/context/batch', methods=['PUT'])
+def update_task_batch39():
+    return update_batch()
 
 @app.route('/api39/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task39(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api39/delete/context/batch', methods=['DELETE'])
+def delete_task_batch39():
+    return delete_batch()
+
+@app.route('/api39/export/context', methods=['GET'])
+def export_context39():
+    return export_ndjson(make_public_task39)
+
+@app.route('/api39/search/context', methods=['GET'])
+def search_context39():
+    return search_tasks(make_public_task39)
+
+@app.route('/api39/suggest/context', methods=['GET'])
+def suggest_context39():
+    return suggest_tasks(make_public_task39)
+
+@app.route('/api39/changes', methods=['GET'])
+def get_changes39():
+    return changes_since(make_public_task39)
+
+@app.route('/api39/stream/context', methods=['GET'])
+def stream_context39():
+    return stream_events(make_public_task39)
+
+@app.route('/api39/stats/context', methods=['GET'])
+def stats_context39():
+    return show_stats()
+
 @app.route('/api39/fib/<int:x>')
 def fib39(x):
     return str(calcfib(x))
@@ -3447,65 +5266,98 @@ def proxy39():
 def index40():
     return render_template('index.html')
 
-def make_public_task40(task):
+def make_public_task40(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task40', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task40', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api40/get/context', methods=['GET'])
 def get_context40():
-    return jsonify({'context': list(map(make_public_task40, context))})
+    return list_context('get_context40', make_public_task40)
 
 @app.route('/api40/get/context/<int:task_id>', methods=['GET'])
 def get_task40(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task40(task[0])})
+    return show_task(task_id, make_public_task40)
 
 @app.route('/api40/post/context', methods=['POST'])
 def create_task40():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task40(task)}), 201
 
+@app.route('/api40/post/context/batch', methods=['POST'])
+def create_task_batch40():
+    return create_batch('get_task40')
+
 @app.route('/api40/put/context/<int:task_id>', methods=['PUT'])
 def update_task40(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task40(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task40(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api40/put/context/batch', methods=['PUT'])
+def update_task_batch40():
+    return update_batch()
 
 @app.route('/api40/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task40(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api40/delete/context/batch', methods=['DELETE'])
+def delete_task_batch40():
+    return delete_batch()
+
+@app.route('/api40/export/context', methods=['GET'])
+def export_context40():
+    return export_ndjson(make_public_task40)
+
+@app.route('/api40/search/context', methods=['GET'])
+def search_context40():
+    return search_tasks(make_public_task40)
+
+@app.route('/api40/suggest/context', methods=['GET'])
+def suggest_context40():
+    return suggest_tasks(make_public_task40)
+
+@app.route('/api40/changes', methods=['GET'])
+def get_changes40():
+    return changes_since(make_public_task40)
+
+@app.route('/api40/stream/context', methods=['GET'])
+def stream_context40():
+    return stream_events(make_public_task40)
+
+@app.route('/api40/stats/context', methods=['GET'])
+def stats_context40():
+    return show_stats()
+
 @app.route('/api40/fib/<int:x>')
 def fib40(x):
     return str(calcfib(x))
@@ -3533,65 +5385,98 @@ def proxy40():
 def index41():
     return render_template('index.html')
 
-def make_public_task41(task):
+def make_public_task41(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task41', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task41', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api41/get/context', methods=['GET'])
 def get_context41():
-    return jsonify({'context': list(map(make_public_task41, context))})
+    return list_context('get_context41', make_public_task41)
 
 @app.route('/api41/get/context/<int:task_id>', methods=['GET'])
 def get_task41(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task41(task[0])})
+    return show_task(task_id, make_public_task41)
 
 @app.route('/api41/post/context', methods=['POST'])
 def create_task41():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task41(task)}), 201
 
+@app.route('/api41/post/context/batch', methods=['POST'])
+def create_task_batch41():
+    return create_batch('get_task41')
+
 @app.route('/api41/put/context/<int:task_id>', methods=['PUT'])
 def update_task41(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task41(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task41(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api41/put/context/batch', methods=['PUT'])
+def update_task_batch41():
+    return update_batch()
 
 @app.route('/api41/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task41(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api41/delete/context/batch', methods=['DELETE'])
+def delete_task_batch41():
+    return delete_batch()
+
+@app.route('/api41/export/context', methods=['GET'])
+def export_context41():
+    return export_ndjson(make_public_task41)
+
+@app.route('/api41/search/context', methods=['GET'])
+def search_context41():
+    return search_tasks(make_public_task41)
+
+@app.route('/api41/suggest/context', methods=['GET'])
+def suggest_context41():
+    return suggest_tasks(make_public_task41)
+
+@app.route('/api41/changes', methods=['GET'])
+def get_changes41():
+    return changes_since(make_public_task41)
+
+@app.route('/api41/stream/context', methods=['GET'])
+def stream_context41():
+    return stream_events(make_public_task41)
+
+@app.route('/api41/stats/context', methods=['GET'])
+def stats_context41():
+    return show_stats()
+
 @app.route('/api41/fib/<int:x>')
 def fib41(x):
     return str(calcfib(x))
@@ -3619,65 +5504,98 @@ def proxy41():
 def index42():
     return render_template('index.html')
 
-def make_public_task42(task):
+def make_public_task42(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task42', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task42', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api42/get/context', methods=['GET'])
 def get_context42():
-    return jsonify({'context': list(map(make_public_task42, context))})
+    return list_context('get_context42', make_public_task42)
 
 @app.route('/api42/get/context/<int:task_id>', methods=['GET'])
 def get_task42(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task42(task[0])})
+    return show_task(task_id, make_public_task42)
 
 @app.route('/api42/post/context', methods=['POST'])
 def create_task42():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task42(task)}), 201
 
+@app.route('/api42/post/context/batch', methods=['POST'])
+def create_task_batch42():
+    return create_batch('get_task42')
+
 @app.route('/api42/put/context/<int:task_id>', methods=['PUT'])
 def update_task42(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task42(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task42(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api42/put/context/batch', methods=['PUT'])
+def update_task_batch42():
+    return update_batch()
 
 @app.route('/api42/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task42(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api42/delete/context/batch', methods=['DELETE'])
+def delete_task_batch42():
+    return delete_batch()
+
+@app.route('/api42/export/context', methods=['GET'])
+def export_context42():
+    return export_ndjson(make_public_task42)
+
+@app.route('/api42/search/context', methods=['GET'])
+def search_context42():
+    return search_tasks(make_public_task42)
+
+@app.route('/api42/suggest/context', methods=['GET'])
+def suggest_context42():
+    return suggest_tasks(make_public_task42)
+
+@app.route('/api42/changes', methods=['GET'])
+def get_changes42():
+    return changes_since(make_public_task42)
+
+@app.route('/api42/stream/context', methods=['GET'])
+def stream_context42():
+    return stream_events(make_public_task42)
+
+@app.route('/api42/stats/context', methods=['GET'])
+def stats_context42():
+    return show_stats()
+
 @app.route('/api42/fib/<int:x>')
 def fib42(x):
     return str(calcfib(x))
@@ -3705,65 +5623,98 @@ def proxy42():
 def index43():
     return render_template('index.html')
 
-def make_public_task43(task):
+def make_public_task43(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task43', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task43', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api43/get/context', methods=['GET'])
 def get_context43():
-    return jsonify({'context': list(map(make_public_task43, context))})
+    return list_context('get_context43', make_public_task43)
 
 @app.route('/api43/get/context/<int:task_id>', methods=['GET'])
 def get_task43(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task43(task[0])})
+    return show_task(task_id, make_public_task43)
 
 @app.route('/api43/post/context', methods=['POST'])
 def create_task43():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task43(task)}), 201
 
+@app.route('/api43/post/context/batch', methods=['POST'])
+def create_task_batch43():
+    return create_batch('get_task43')
+
 @app.route('/api43/put/context/<int:task_id>', methods=['PUT'])
 def update_task43(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task43(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task43(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api43/put/context/batch', methods=['PUT'])
+def update_task_batch43():
+    return update_batch()
 
 @app.route('/api43/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task43(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api43/delete/context/batch', methods=['DELETE'])
+def delete_task_batch43():
+    return delete_batch()
+
+@app.route('/api43/export/context', methods=['GET'])
+def export_context43():
+    return export_ndjson(make_public_task43)
+
+@app.route('/api43/search/context', methods=['GET'])
+def search_context43():
+    return search_tasks(make_public_task43)
+
+@app.route('/api43/suggest/context', methods=['GET'])
+def suggest_context43():
+    return suggest_tasks(make_public_task43)
+
+@app.route('/api43/changes', methods=['GET'])
+def get_changes43():
+    return changes_since(make_public_task43)
+
+@app.route('/api43/stream/context', methods=['GET'])
+def stream_context43():
+    return stream_events(make_public_task43)
+
+@app.route('/api43/stats/context', methods=['GET'])
+def stats_context43():
+    return show_stats()
+
 @app.route('/api43/fib/<int:x>')
 def fib43(x):
     return str(calcfib(x))
@@ -3791,65 +5742,98 @@ def proxy43():
 def index44():
     return render_template('index.html')
 
-def make_public_task44(task):
+def make_public_task44(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task44', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task44', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api44/get/context', methods=['GET'])
 def get_context44():
-    return jsonify({'context': list(map(make_public_task44, context))})
+    return list_context('get_context44', make_public_task44)
 
 @app.route('/api44/get/context/<int:task_id>', methods=['GET'])
 def get_task44(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task44(task[0])})
+    return show_task(task_id, make_public_task44)
 
 @app.route('/api44/post/context', methods=['POST'])
 def create_task44():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task44(task)}), 201
 
+@app.route('/api44/post/context/batch', methods=['POST'])
+def create_task_batch44():
+    return create_batch('get_task44')
+
 @app.route('/api44/put/context/<int:task_id>', methods=['PUT'])
 def update_task44(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task44(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task44(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api44/put/context/batch', methods=['PUT'])
+def update_task_batch44():
+    return update_batch()
 
 @app.route('/api44/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task44(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api44/delete/context/batch', methods=['DELETE'])
+def delete_task_batch44():
+    return delete_batch()
+
+@app.route('/api44/export/context', methods=['GET'])
+def export_context44():
+    return export_ndjson(make_public_task44)
+
+@app.route('/api44/search/context', methods=['GET'])
+def search_context44():
+    return search_tasks(make_public_task44)
+
+@app.route('/api44/suggest/context', methods=['GET'])
+def suggest_context44():
+    return suggest_tasks(make_public_task44)
+
+@app.route('/api44/changes', methods=['GET'])
+def get_changes44():
+    return changes_since(make_public_task44)
+
+@app.route('/api44/stream/context', methods=['GET'])
+def stream_context44():
+    return stream_events(make_public_task44)
+
+@app.route('/api44/stats/context', methods=['GET'])
+def stats_context44():
+    return show_stats()
+
 @app.route('/api44/fib/<int:x>')
 def fib44(x):
     return str(calcfib(x))
@@ -3877,65 +5861,98 @@ def proxy44():
 def index45():
     return render_template('index.html')
 
-def make_public_task45(task):
+def make_public_task45(task, fields=PUBLIC_FIELDS):
     new_task = {}
     for field in task:
         if field == 'id':
-            new_task['uri'] = url_for('get_task45', task_id=task['id'], _external=True)
-        else:
+            if 'uri' in fields:
+                new_task['uri'] = url_for('get_task45', task_id=task['id'], _external=True)
+        elif field in fields:
             new_task[field] = task[field]
     return new_task
 
 @app.route('/api45/get/context', methods=['GET'])
 def get_context45():
-    return jsonify({'context': list(map(make_public_task45, context))})
+    return list_context('get_context45', make_public_task45)
 
 @app.route('/api45/get/context/<int:task_id>', methods=['GET'])
 def get_task45(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
-        abort(404)
-    return jsonify({'task': make_public_task45(task[0])})
+    return show_task(task_id, make_public_task45)
 
 @app.route('/api45/post/context', methods=['POST'])
 def create_task45():
     if not request.json or not 'title' in request.json:
         abort(400)
-    task = {
-        'id': context[-1]['id'] + 1,
+    if not is_text(request.json['title']):
+        abort(400)
+    if not is_text(request.json.get('description', "")):
+        abort(400)
+    task = family_store().insert({
         'title': request.json['title'],
         'description': request.json.get('description', ""),
         'done': False
-    }
-    context.append(task)
+    })
     return jsonify({'task': make_public_task45(task)}), 201
 
+@app.route('/api45/post/context/batch', methods=['POST'])
+def create_task_batch45():
+    return create_batch('get_task45')
+
 @app.route('/api45/put/context/<int:task_id>', methods=['PUT'])
 def update_task45(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if task_id not in family_store():
         abort(404)
     if not request.json:
         abort(400)
-    if 'title' in request.json and type(request.json['title']) != str:
+    if 'title' in request.json and not is_text(request.json['title']):
         abort(400)
-    if 'description' in request.json and type(request.json['description']) is not str:
+    if 'description' in request.json and not is_text(request.json['description']):
         abort(400)
     if 'done' in request.json and type(request.json['done']) is not bool:
         abort(400)
-    task[0]['title'] = request.json.get('title', task[0]['title'])
-    task[0]['description'] = request.json.get('description', task[0]['description'])
-    task[0]['done'] = request.json.get('done', task[0]['done'])
-    return jsonify({'task': make_public_task45(task[0])})
+    task = update_if_match(task_id, request.json)
+    response = jsonify({'task': make_public_task45(task)})
+    response.set_etag(make_etag(task['version']))
+    return response
+
+@app.route('/api45/put/context/batch', methods=['PUT'])
+def update_task_batch45():
+    return update_batch()
 
 @app.route('/api45/delete/context/<int:task_id>', methods=['DELETE'])
 def delete_task45(task_id):
-    task = list(filter(lambda t: t['id'] == task_id, context))
-    if len(task) == 0:
+    if family_store().remove(task_id) is None:
         abort(404)
-    context.remove(task[0])
     return jsonify({'result': True})
 
+@app.route('/api45/delete/context/batch', methods=['DELETE'])
+def delete_task_batch45():
+    return delete_batch()
+
+@app.route('/api45/export/context', methods=['GET'])
+def export_context45():
+    return export_ndjson(make_public_task45)
+
+@app.route('/api45/search/context', methods=['GET'])
+def search_context45():
+    return search_tasks(make_public_task45)
+
+@app.route('/api45/suggest/context', methods=['GET'])
+def suggest_context45():
+    return suggest_tasks(make_public_task45)
+
+@app.route('/api45/changes', methods=['GET'])
+def get_changes45():
+    return changes_since(make_public_task45)
+
+@app.route('/api45/stream/context', methods=['GET'])
+def stream_context45():
+    return stream_events(make_public_task45)
+
+@app.route('/api45/stats/context', methods=['GET'])
+def stats_context45():
+    return show_stats()
+
 @app.route('/api45/fib/<int:x>')
 def fib45(x):
     return str(calcfib(x))
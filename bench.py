@@ -0,0 +1,455 @@
+#!/usr/bin/env python
+# Micro benchmarks for the task store and the context routes.
+# Usage: python bench.py <name> [<name> ...]   (no name runs everything)
+import sys
+import time
+
+import app
+from store import TaskStore, ColumnarTaskStore, ShardedTaskStore, SharedTaskStore
+
+
+def seed(n):
+    return [{'id': i, 'title': u'task %d' % i, 'description': u'seeded task %d' % i, 'done': False}
+            for i in range(1, n + 1)]
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_lookup():
+    """get/update/delete latency across store sizes, via the test client."""
+    client = app.app.test_client()
+    print('%10s %12s %12s %12s' % ('tasks', 'get us', 'put us', 'delete us'))
+    for n in (10, 1000, 100000, 1000000):
+        app.context = TaskStore(seed(n))
+        mid = n // 2 + 1
+        get_s = timed(lambda: client.get('/api2/get/context/%d' % mid), 200)
+        put_s = timed(lambda: client.put('/api2/put/context/%d' % mid, json={'done': True}), 200)
+        ids = iter(range(1, n + 1))
+        delete_s = timed(lambda: client.delete('/api2/delete/context/%d' % next(ids)), min(n, 200))
+        print('%10d %12.1f %12.1f %12.1f' % (n, get_s * 1e6, put_s * 1e6, delete_s * 1e6))
+
+
+def bench_contention():
+    """Mixed POST/PUT/GET throughput with 1..32 client threads."""
+    import threading
+
+    def worker(requests_per_thread):
+        client = app.app.test_client()
+        for i in range(requests_per_thread):
+            op = i % 3
+            if op == 0:
+                client.post('/api2/post/context', json={'title': 'bench'})
+            elif op == 1:
+                client.put('/api2/put/context/%d' % (i % 1000 + 1), json={'done': True})
+            else:
+                client.get('/api2/get/context/%d' % (i % 1000 + 1))
+
+    print('%8s %12s %10s' % ('threads', 'req/s', 'dup ids'))
+    for threads in (1, 2, 4, 8, 16, 32):
+        app.context = TaskStore(seed(1000))
+        per_thread = 3000 // threads
+        pool = [threading.Thread(target=worker, args=(per_thread,)) for _ in range(threads)]
+        start = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        elapsed = time.perf_counter() - start
+        ids = [task['id'] for task in app.context]
+        print('%8d %12.0f %10d' % (threads, per_thread * threads / elapsed, len(ids) - len(set(ids))))
+
+
+def bench_paging():
+    """Cost of one ?limit=100 page at increasing cursor depth in 1M tasks."""
+    client = app.app.test_client()
+    app.context = TaskStore(seed(1000000))
+    print('%10s %12s' % ('after id', 'page us'))
+    for after in (0, 10000, 500000, 999800):
+        url = '/api2/get/context?limit=100&cursor=%s' % app.encode_cursor(after)
+        print('%10d %12.1f' % (after, timed(lambda: client.get(url), 100) * 1e6))
+
+
+def bench_batch():
+    """10k creates: one POST per task versus one batch POST."""
+    client = app.app.test_client()
+    batch = [{'title': 'task %d' % i, 'description': 'batched'} for i in range(10000)]
+    app.context = TaskStore(seed(4))
+    start = time.perf_counter()
+    for fields in batch:
+        client.post('/api2/post/context', json=fields)
+    loop_s = time.perf_counter() - start
+    app.context = TaskStore(seed(4))
+    start = time.perf_counter()
+    client.post('/api2/post/context/batch', json=batch)
+    batch_s = time.perf_counter() - start
+    print('per-task loop %.2fs, batch %.3fs, speedup %.0fx' % (loop_s, batch_s, loop_s / batch_s))
+
+
+def bench_done_filter():
+    """?done=true over 1M tasks with a 1% match rate, index versus scan."""
+    client = app.app.test_client()
+    tasks = seed(1000000)
+    for task in tasks[::100]:
+        task['done'] = True
+    app.context = TaskStore(tasks)
+    scan_s = timed(lambda: [task for task in app.context if task['done']], 5)
+    index_s = timed(lambda: app.context.where(True), 20)
+    listing_s = timed(lambda: client.get('/api2/get/context?done=true&fields=title'), 5)
+    page_s = timed(lambda: client.get('/api2/get/context?done=true&limit=100'), 20)
+    print('full scan %.1fms, index %.1fms' % (scan_s * 1e3, index_s * 1e3))
+    print('GET ?done=true (10k rows) %.1fms, GET ?done=true&limit=100 %.1fms' % (listing_s * 1e3, page_s * 1e3))
+
+
+def bench_search():
+    """?q= latency over 1M tasks with a 1000-word vocabulary."""
+    import random
+    random.seed(1)
+    words = ['word%d' % i for i in range(1000)]
+    tasks = seed(1000000)
+    for task in tasks:
+        task['title'] = ' '.join(random.sample(words, 3))
+        task['description'] = ' '.join(random.sample(words, 5))
+    client = app.app.test_client()
+    app.context = TaskStore(tasks)
+    client.get('/api2/search/context?q=warmup')
+    for query in ('word1', 'word1 word2', 'word1 word2 word3'):
+        url = '/api2/search/context?q=%s&fields=title' % query.replace(' ', '+')
+        print('%-20s %8.2fms' % (query, timed(lambda: client.get(url), 20) * 1e3))
+
+
+def bench_suggest():
+    """Store-level suggest() latency for 1M tasks, plus one HTTP request."""
+    import random
+    random.seed(1)
+    tasks = seed(1000000)
+    for task in tasks:
+        task['title'] = '%08x task' % random.getrandbits(32)
+    app.context = TaskStore(tasks)
+    for prefix in ('a', 'ab', 'abc', 'abcd'):
+        print('%-6s %8.1fus' % (prefix, timed(lambda: app.context.suggest(prefix, 10), 1000) * 1e6))
+    client = app.app.test_client()
+    print('GET ?prefix=ab %.2fms' % (timed(lambda: client.get('/api2/suggest/context?prefix=ab'), 100) * 1e3))
+
+
+def bench_listing():
+    """Full GET listing req/s with the listing cache off and on."""
+    client = app.app.test_client()
+    print('%8s %10s %14s %14s' % ('tasks', 'encoding', 'uncached req/s', 'cached req/s'))
+    for n in (100, 10000):
+        app.context = TaskStore(seed(n))
+        for encoding in ('identity', 'gzip'):
+            headers = {'Accept-Encoding': encoding}
+            rates = []
+            for size in (0, 64 << 20):
+                app.LISTING_CACHE_BYTES = size
+                app.clear_listing_cache()
+                client.get('/api2/get/context', headers=headers)
+                rates.append(1 / timed(lambda: client.get('/api2/get/context', headers=headers), 20))
+            print('%8d %10s %14.0f %14.0f' % (n, encoding, rates[0], rates[1]))
+
+
+def bench_memory():
+    """tracemalloc bytes per task: plain dict records versus Task records."""
+    import tracemalloc
+    from store import Task
+    n = 100000
+    tasks = seed(n)
+    print('%10s %12s' % ('record', 'bytes/task'))
+    for name, build in (('dict', lambda: [dict(task, version=0) for task in tasks]),
+                        ('Task', lambda: [Task.from_fields(task['id'], task, 0) for task in tasks])):
+        tracemalloc.start()
+        records = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print('%10s %12.0f' % (name, float(size) / len(records)))
+    tracemalloc.start()
+    store = TaskStore(tasks)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print('whole TaskStore with indexes: %.0f bytes/task' % (float(size) / len(store)))
+
+
+def bench_columnar():
+    """1M tasks: listing and done-count, dict store versus columnar store."""
+    import tracemalloc
+    tasks = seed(1000000)
+    for task in tasks[::3]:
+        task['done'] = True
+    client = app.app.test_client()
+    app.LISTING_CACHE_BYTES = 0
+    print('%18s %10s %12s %12s %12s %12s' % ('store', 'MB', 'snapshot ms', 'GET ms', 'scan cnt ms', 'count() ms'))
+    for cls in (TaskStore, ColumnarTaskStore):
+        tracemalloc.start()
+        app.context = cls(tasks)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        snapshot_s = timed(app.context.snapshot, 3)
+        listing_s = timed(lambda: client.get('/api2/get/context?fields=title,done'), 1)
+        scan_s = timed(lambda: sum(1 for task in app.context if task['done']), 3)
+        count_s = timed(lambda: app.context.count(True), 3)
+        print('%18s %10.0f %12.0f %12.0f %12.1f %12.3f' % (
+            cls.__name__, size / 1e6, snapshot_s * 1e3, listing_s * 1e3, scan_s * 1e3, count_s * 1e3))
+    app.LISTING_CACHE_BYTES = 64 << 20
+
+
+def bench_wal():
+    """Store insert throughput from 8 threads per WAL fsync policy."""
+    import os
+    import tempfile
+    import threading
+    from wal import WriteAheadLog
+
+    def worker(store, count):
+        for i in range(count):
+            store.insert({'title': 'task %d' % i, 'description': 'logged', 'done': False})
+
+    print('%12s %12s' % ('fsync', 'writes/s'))
+    policies = (('no wal', False), ('never', None), ('every write', 0), ('1ms', 0.001), ('10ms', 0.01), ('100ms', 0.1))
+    for label, policy in policies:
+        with tempfile.TemporaryDirectory() as tmp:
+            wal = None if policy is False else WriteAheadLog(os.path.join(tmp, 'tasks.wal'), policy)
+            store = TaskStore(seed(1000), wal=wal)
+            pool = [threading.Thread(target=worker, args=(store, 2000)) for _ in range(8)]
+            start = time.perf_counter()
+            for t in pool:
+                t.start()
+            for t in pool:
+                t.join()
+            elapsed = time.perf_counter() - start
+            if wal is not None:
+                wal.close()
+        print('%12s %12.0f' % (label, 16000 / elapsed))
+
+
+def bench_snapshot():
+    """Cold start for 1M tasks: JSON seed, WAL replay and mmap snapshot."""
+    import json
+    import os
+    import tempfile
+    from wal import WriteAheadLog
+    tasks = seed(1000000)
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_path = os.path.join(tmp, 'seed.json')
+        wal_path = os.path.join(tmp, 'tasks.wal')
+        snapshot_path = os.path.join(tmp, 'tasks.snap')
+        with open(seed_path, 'w') as f:
+            json.dump(tasks, f)
+        wal = WriteAheadLog(wal_path, None)
+        store = ColumnarTaskStore(wal=wal)
+        for i in range(0, len(tasks), 10000):
+            store.insert_many(tasks[i:i + 10000])
+        wal.close()
+        store.save(snapshot_path)
+        del store
+
+        def from_json():
+            with open(seed_path) as f:
+                return TaskStore(json.load(f))
+
+        def from_json_columnar():
+            with open(seed_path) as f:
+                return ColumnarTaskStore(json.load(f))
+
+        def from_wal():
+            wal = WriteAheadLog(wal_path, None)
+            store = TaskStore(wal=wal)
+            wal.close()
+            return store
+
+        def from_snapshot():
+            store = ColumnarTaskStore.load(snapshot_path)
+            store.get(500000)
+            store.page(0, 100)
+            return store
+
+        def first_search():
+            ColumnarTaskStore.load(snapshot_path).search('task', 10)
+
+        print('%24s %12s' % ('start from', 'seconds'))
+        for name, start in (('JSON seed, TaskStore', from_json), ('JSON seed, columnar', from_json_columnar),
+                            ('WAL replay, TaskStore', from_wal), ('snapshot, first reads', from_snapshot),
+                            ('snapshot, first search', first_search)):
+            print('%24s %12.3f' % (name, timed(start, 1)))
+
+
+def bench_if_match():
+    """Read-modify-write counters from 8 threads: a client lock versus If-Match."""
+    import threading
+    lock = threading.Lock()
+
+    def increment(client, task_id, mode, stats):
+        while True:
+            response = client.get('/api2/get/context/%d' % task_id)
+            count = int(response.json['task']['title']) + 1
+            headers = {'If-Match': response.headers['ETag']} if mode == 'if-match' else {}
+            if client.put('/api2/put/context/%d' % task_id, json={'title': str(count)}, headers=headers).status_code != 412:
+                return
+            stats['retries'] += 1
+
+    def worker(mode, tasks, stats):
+        client = app.app.test_client()
+        for i in range(250):
+            task_id = i % tasks + 1
+            if mode == 'lock':
+                with lock:
+                    increment(client, task_id, mode, stats)
+            else:
+                increment(client, task_id, mode, stats)
+
+    print('%8s %10s %10s %10s %10s' % ('tasks', 'mode', 'rmw/s', 'lost', 'retries'))
+    for tasks in (1, 100):
+        for mode in ('none', 'lock', 'if-match'):
+            app.context = TaskStore([{'id': i, 'title': '0', 'description': '', 'done': False} for i in range(1, tasks + 1)])
+            stats = {'retries': 0}
+            pool = [threading.Thread(target=worker, args=(mode, tasks, stats)) for _ in range(8)]
+            start = time.perf_counter()
+            for t in pool:
+                t.start()
+            for t in pool:
+                t.join()
+            elapsed = time.perf_counter() - start
+            lost = 2000 - sum(int(task['title']) for task in app.context)
+            print('%8d %10s %10.0f %10d %10d' % (tasks, mode, 2000 / elapsed, lost, stats['retries']))
+
+
+def shared_reader(path, seconds, results):
+    import random
+    store = SharedTaskStore(path)
+    reads = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        store.get(random.randint(1, 100000))
+        reads += 1
+    results.put(reads)
+
+
+def shared_writer(path, stop):
+    store = SharedTaskStore(path)
+    while not stop.is_set():
+        store.update(1, {'done': True})
+
+
+def bench_shared():
+    """get() throughput over one shared-memory store from 1, 4 and 16 processes."""
+    import multiprocessing
+    import os
+    import tempfile
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') else None
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        path = os.path.join(tmp, 'tasks')
+        store = SharedTaskStore(path, seed(100000))
+        fork = multiprocessing.get_context('fork')
+        check = fork.Process(target=lambda: SharedTaskStore(path).insert({'title': 'from a child'}))
+        check.start()
+        check.join()
+        print('write from another process visible: %s' % (store.get(100001)['title'] == 'from a child'))
+        print('%10s %8s %12s' % ('processes', 'writer', 'reads/s'))
+        for processes in (1, 4, 16):
+            for writing in (False, True):
+                results = fork.Queue()
+                stop = fork.Event()
+                writer = fork.Process(target=shared_writer, args=(path, stop))
+                if writing:
+                    writer.start()
+                pool = [fork.Process(target=shared_reader, args=(path, 2, results)) for _ in range(processes)]
+                for p in pool:
+                    p.start()
+                total = sum(results.get() for _ in pool)
+                for p in pool:
+                    p.join()
+                stop.set()
+                if writing:
+                    writer.join()
+                print('%10d %8s %12.0f' % (processes, writing, total / 2.0))
+
+
+def bench_sharding():
+    """Store writes/s from 8 threads against 1..16 shards."""
+    import random
+    import sys
+    import threading
+
+    def worker(store, n):
+        rand = random.Random(n)
+        for i in range(5000):
+            if i % 4 == 0:
+                store.insert({'title': 'task %d' % i, 'description': 'sharded', 'done': False})
+            else:
+                store.update(rand.randint(1, 100000), {'done': i % 2 == 0})
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print('GIL %s' % ('enabled' if gil else 'disabled'))
+    print('%8s %12s' % ('shards', 'writes/s'))
+    for shards in (1, 2, 4, 8, 16):
+        store = ShardedTaskStore(seed(100000), shards)
+        pool = [threading.Thread(target=worker, args=(store, n)) for n in range(8)]
+        start = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        print('%8d %12.0f' % (shards, 40000 / (time.perf_counter() - start)))
+
+
+def bench_sorting():
+    """?sort= pages from the maintained indexes versus sorting the whole store."""
+    import random
+    client = app.app.test_client()
+    print('%10s %8s %12s %12s' % ('tasks', 'sort', 'page ms', 'sorted() ms'))
+    for n in (1000, 100000, 1000000):
+        tasks = seed(n)
+        rng = random.Random(0)
+        for task in tasks:
+            task['title'] = u'task %d' % rng.randrange(n)
+            task['done'] = rng.random() < 0.5
+        app.context = TaskStore(tasks)
+        for sort, key in (('title', lambda task: (task['title'].lower(), task['id'])),
+                          ('done,id', lambda task: (task['done'], task['id']))):
+            cursor = app.encode_cursor(app.sort_key(sort, app.context.get(n // 2 + 1)))
+            url = '/api2/get/context?limit=100&sort=%s&cursor=%s' % (sort, cursor)
+            page_s = timed(lambda: (app.clear_listing_cache(), client.get(url)), 50)
+            sort_s = timed(lambda: sorted(app.context, key=key), 1)
+            print('%10d %8s %12.2f %12.1f' % (n, sort, page_s * 1e3, sort_s * 1e3))
+
+
+def bench_stats():
+    """Dashboard counts across store sizes: /stats/context versus the full listing."""
+    client = app.app.test_client()
+    print('%10s %12s %12s' % ('tasks', 'stats us', 'listing ms'))
+    for n in (1000, 100000, 1000000):
+        app.context = TaskStore(seed(n))
+        stats_s = timed(lambda: client.get('/api2/stats/context'), 200)
+        app.clear_listing_cache()
+        listing_s = timed(lambda: client.get('/api2/get/context?fields=title,description,done'), 1)
+        print('%10d %12.1f %12.1f' % (n, stats_s * 1e6, listing_s * 1e3))
+
+
+BENCHES = {
+    'batch': bench_batch,
+    'columnar': bench_columnar,
+    'contention': bench_contention,
+    'done_filter': bench_done_filter,
+    'if_match': bench_if_match,
+    'listing': bench_listing,
+    'lookup': bench_lookup,
+    'memory': bench_memory,
+    'paging': bench_paging,
+    'search': bench_search,
+    'shared': bench_shared,
+    'sharding': bench_sharding,
+    'snapshot': bench_snapshot,
+    'sorting': bench_sorting,
+    'stats': bench_stats,
+    'suggest': bench_suggest,
+    'wal': bench_wal,
+}
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or sorted(BENCHES):
+        print('== %s' % name)
+        BENCHES[name]()
@@ -0,0 +1,2034 @@
+import fcntl
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from itertools import chain, count, islice
+from bisect import bisect_left, bisect_right, insort
+from heapq import merge, nlargest, nsmallest
+
+TASK_FIELDS = ('id', 'title', 'description', 'done', 'version')
+UPDATABLE_FIELDS = ('title', 'description', 'done')
+TERM_RE = re.compile(r'\w+')
+# Keys per SortedIndex block; a block is split once it holds twice this.
+INDEX_BLOCK = 1000
+# Orders sorted_page() serves from maintained indexes.
+SORT_ORDERS = ('title', '-title', 'done,id')
+CHANGE_LOG_SIZE = 10000
+# Value of a removed row in ColumnarTaskStore's done column.
+DEAD = 2
+# Snapshot header: magic, rows, version, last id, title bytes, description bytes.
+SNAPSHOT_HEADER = struct.Struct('<8s5q')
+SNAPSHOT_MAGIC = b'TASKSNP1'
+# SharedTaskStore file layout: a header page of int64 counters, a ring of
+# (version, op, id) changes, the id index (ids, then their rows; 2 *
+# capacity each), a stack of free rows (capacity), then fixed-width rows.
+SHARED_MAGIC = b'TASKSHM4'
+SHARED_HEADER_SIZE = 4096
+SHARED_COUNTERS = 14
+(SEQ, CAPACITY, LOG_SIZE, NEXT_ID, VERSION, LIVE, DONE_COUNT, LOG_COUNT, TITLE_BYTES, DESCRIPTION_BYTES, EPOCH,
+ INDEX_COUNT, ROWS_USED, FREE_COUNT) = range(SHARED_COUNTERS)
+SHARED_TITLE_BYTES = 256
+SHARED_DESCRIPTION_BYTES = 2048
+SHARED_CAPACITY = 1 << 20
+SHARED_ROW = struct.Struct('<qqBHH%ds%ds' % (SHARED_TITLE_BYTES, SHARED_DESCRIPTION_BYTES))
+SHARED_LOG_ENTRY = struct.Struct('<qBq')
+ROW_EMPTY, ROW_OPEN, ROW_DONE = 0, 1, 2
+OPS = ('create', 'update', 'delete')
+# Rows read per seqlock section, and how often other processes' writes are polled for.
+SHARED_CHUNK_ROWS = 1024
+SHARED_POLL_SECONDS = 0.05
+
+
+class VersionConflict(Exception):
+    """An update's expected versions did not include the task's current one."""
+
+    def __init__(self, task):
+        Exception.__init__(self, 'task %d is at version %d' % (task['id'], task['version']))
+        self.task = task
+
+
+class StoreLimitExceeded(ValueError):
+    """A write does not fit a fixed-size store."""
+
+
+def new_epoch():
+    """A random tag for one run of a store's version sequence."""
+    return os.urandom(4).hex()
+
+
+def tokenize(text):
+    return TERM_RE.findall(text.lower())
+
+
+def task_terms(task):
+    return set(tokenize(task['title'])) | set(tokenize(task['description']))
+
+
+def text_bytes(task):
+    """UTF-8 sizes of a task's title and description."""
+    return len(task['title'].encode('utf-8')), len(task['description'].encode('utf-8'))
+
+
+def task_stats(total, done, title_bytes, description_bytes):
+    return {
+        'total': total,
+        'done': done,
+        'open': total - done,
+        'title_bytes': title_bytes,
+        'description_bytes': description_bytes
+    }
+
+
+def shared_index_offset(log_size):
+    # Past the change ring, aligned for the int64 index.
+    return (SHARED_HEADER_SIZE + log_size * SHARED_LOG_ENTRY.size + 7) // 8 * 8
+
+
+def shared_rows_offset(capacity, log_size):
+    return shared_index_offset(log_size) + 5 * 8 * capacity
+
+
+def title_key(task):
+    return (task['title'].lower(), task['id'])
+
+
+def sort_key(order, task):
+    """Where task falls in a SORT_ORDERS order; sorted_page() resumes after it."""
+    if order == 'done,id':
+        return (task['done'], task['id'])
+    return title_key(task)
+
+
+class SortedIndex(object):
+    """Sorted keys in blocks of up to 2 * INDEX_BLOCK, found by bisection.
+
+    Adding or removing a key moves only the rest of its block, so an edit
+    costs about the same at any size; in one sorted list it would move
+    every key after it. Edits bigger than a block per key rebuild the
+    blocks in one pass. Not thread-safe: the stores read and edit it
+    under their lock.
+    """
+
+    def __init__(self, keys=()):
+        self._build(sorted(keys))
+
+    def _build(self, keys):
+        self._blocks = [keys[i:i + INDEX_BLOCK] for i in range(0, len(keys), INDEX_BLOCK)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(keys)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return chain.from_iterable(self._blocks)
+
+    def update(self, keys):
+        keys = sorted(keys)
+        if not keys:
+            return
+        if not self._blocks or keys[0] > self._maxes[-1]:
+            # New ids always sort last, so this is the common case.
+            self._append(keys)
+        elif len(keys) * INDEX_BLOCK > self._len:
+            self._build(list(merge(self, keys)))
+        else:
+            for key in keys:
+                self._add(key)
+
+    def _append(self, keys):
+        if not self._blocks:
+            self._blocks.append([])
+            self._maxes.append(None)
+        block = self._blocks[-1]
+        block.extend(keys)
+        self._len += len(keys)
+        if len(block) > 2 * INDEX_BLOCK:
+            self._blocks[-1:] = [block[i:i + INDEX_BLOCK] for i in range(0, len(block), INDEX_BLOCK)]
+            self._maxes[-1:] = [block[-1] for block in self._blocks[len(self._maxes) - 1:]]
+        else:
+            self._maxes[-1] = block[-1]
+
+    def _add(self, key):
+        i = min(bisect_left(self._maxes, key), len(self._maxes) - 1)
+        block = self._blocks[i]
+        insort(block, key)
+        self._maxes[i] = block[-1]
+        self._len += 1
+        if len(block) > 2 * INDEX_BLOCK:
+            self._blocks[i:i + 1] = [block[:INDEX_BLOCK], block[INDEX_BLOCK:]]
+            self._maxes[i:i + 1] = [block[INDEX_BLOCK - 1], block[-1]]
+
+    def difference_update(self, keys):
+        if len(keys) * INDEX_BLOCK > self._len:
+            keys = set(keys)
+            self._build([key for key in self if key not in keys])
+            return
+        for key in keys:
+            self._discard(key)
+
+    def _discard(self, key):
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return
+        block = self._blocks[i]
+        j = bisect_left(block, key)
+        if block[j] != key:
+            return
+        del block[j]
+        self._len -= 1
+        if block:
+            self._maxes[i] = block[-1]
+        else:
+            del self._blocks[i], self._maxes[i]
+
+    def after(self, key, limit):
+        """Up to limit keys greater than key, or the first ones for None."""
+        i = j = 0
+        if key is not None:
+            i = bisect_right(self._maxes, key)
+            j = bisect_right(self._blocks[i], key) if i < len(self._blocks) else 0
+        keys = []
+        while i < len(self._blocks) and len(keys) < limit:
+            keys.extend(self._blocks[i][j:j + limit - len(keys)])
+            i, j = i + 1, 0
+        return keys
+
+    def before(self, key, limit):
+        """Up to limit keys less than key, or the last ones for None; nearest first."""
+        i = len(self._blocks) if key is None else bisect_left(self._maxes, key)
+        if i < len(self._blocks):
+            j = bisect_left(self._blocks[i], key)
+        elif self._blocks:
+            i, j = i - 1, len(self._blocks[-1])
+        else:
+            return []
+        keys = []
+        while i >= 0 and len(keys) < limit:
+            keys.extend(reversed(self._blocks[i][max(j - limit + len(keys), 0):j]))
+            i -= 1
+            j = len(self._blocks[i]) if i >= 0 else 0
+        return keys
+
+
+def done_order_page(store, after, limit):
+    """sorted_page() by done, id: open tasks by id, then done ones."""
+    done, task_id = after or (False, 0)
+    tasks = store.page(task_id, limit, done)
+    if not done and len(tasks) < limit:
+        tasks += store.page(0, limit - len(tasks), True)
+    return tasks
+
+
+class Task(object):
+    """One stored task: a fixed set of slots that reads like a dict.
+
+    Field names live once on the class instead of in a per-task dict,
+    which makes a task about a third of the size. task['title'],
+    iteration over field names and dict(task) all work as they do on a
+    dict, so callers convert only when they serialize.
+    """
+
+    __slots__ = TASK_FIELDS
+
+    def __init__(self, id, title, description, done, version=0):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.done = done
+        self.version = version
+
+    @classmethod
+    def from_fields(cls, task_id, fields, version):
+        return cls(task_id, fields['title'], fields.get('description', ''), fields.get('done', False), version)
+
+    def __getitem__(self, field):
+        if field in TASK_FIELDS:
+            return getattr(self, field)
+        raise KeyError(field)
+
+    def get(self, field, default=None):
+        return getattr(self, field) if field in TASK_FIELDS else default
+
+    def __iter__(self):
+        return iter(TASK_FIELDS)
+
+    def keys(self):
+        return TASK_FIELDS
+
+    def __repr__(self):
+        return 'Task(%r, %r, %r, %r, %r)' % (self.id, self.title, self.description, self.done, self.version)
+
+
+def apply_changes(task, changes, version):
+    return Task(
+        task.id,
+        changes.get('title', task.title),
+        changes.get('description', task.description),
+        changes.get('done', task.done),
+        version
+    )
+
+
+class TaskStore(object):
+    """Tasks keyed by id, iterated in insertion order.
+
+    Writers serialize on a lock and never mutate a stored task in place:
+    an update swaps in a new Task. Readers take no lock and always see
+    whole tasks.
+
+    Every mutation stamps the next store-wide version on the tasks it
+    writes, so a task's version changes whenever it does. _log publishes
+    that version only once the tasks are in place, so a reader that sees
+    a version also sees everything written at it. The last
+    change_log_size (version, op, id) entries are kept for delta sync;
+    _log_floor is the newest version that has been evicted. With a
+    wal.WriteAheadLog, the store starts from its replay and logs every
+    mutation to it.
+
+    Versions only order writes within one store: a restarted store may
+    reuse them for different contents. epoch is random per store, so
+    tags built from a version can carry it and go stale on a restart.
+
+    _ids is the SortedIndex of ids used for keyset paging; removed ids
+    are taken out of it, so a page never walks past them. _by_done holds
+    one per done flag and _titles one of title_key()s, so done filters
+    and sorted listings page by bisection too. These indexes are edited
+    in place, so pages bisect and slice them under the lock; that costs
+    O(log n + limit). Secondary indexes, and the title and description
+    byte totals behind stats(), are kept in step by
+    _index/_unindex/_reindex, always under the lock.
+    """
+
+    def __init__(self, tasks=(), change_log_size=CHANGE_LOG_SIZE, wal=None):
+        self.epoch = new_epoch()
+        self._lock = threading.Lock()
+        self._wal = wal
+        last_id = version = 0
+        if wal is not None:
+            tasks, last_id, version = wal.replay(tasks)
+        self._tasks = {}
+        self._by_done = {True: SortedIndex(), False: SortedIndex()}
+        self._postings = {}
+        self._titles = SortedIndex()
+        self._title_bytes = self._description_bytes = 0
+        for task in tasks:
+            self._tasks[task['id']] = Task.from_fields(task['id'], task, task.get('version', 0))
+        self._index(list(self._tasks.values()))
+        self._ids = SortedIndex(self._tasks)
+        self._next_id = max(max(self._tasks, default=0), last_id) + 1
+        self._version = max([task['version'] for task in self._tasks.values()] + [version])
+        self._changes = deque(maxlen=change_log_size)
+        self._log_floor = self._version
+        self._changed = threading.Condition()
+
+    def _index(self, tasks):
+        # Counting encodes every title and description first, so bad
+        # text fails here, before any index has changed.
+        self._count_text(tasks)
+        for done in (False, True):
+            self._add_done(done, [task['id'] for task in tasks if task['done'] is done])
+        self._index_text(tasks)
+
+    def _unindex(self, tasks):
+        for done in (False, True):
+            self._drop_done(done, [task['id'] for task in tasks if task['done'] is done])
+        self._count_text(tasks, -1)
+        self._unindex_text(tasks)
+
+    def _reindex(self, pairs):
+        """Move the indexes from each (old, new) pair, touching only what changed."""
+        # Recounting encodes the new text, so bad text fails here, before
+        # any index has changed.
+        self._recount_text(pairs)
+        for done in (False, True):
+            moved = [task['id'] for old, task in pairs if old['done'] is not done and task['done'] is done]
+            self._drop_done(not done, moved)
+            self._add_done(done, moved)
+        self._reindex_text(pairs)
+
+    def _add_done(self, done, ids):
+        self._by_done[done].update(ids)
+
+    def _drop_done(self, done, ids):
+        self._by_done[done].difference_update(ids)
+
+    def _count_text(self, tasks, sign=1):
+        self._add_text_sizes([text_bytes(task) for task in tasks], sign)
+
+    def _add_text_sizes(self, sizes, sign=1):
+        self._title_bytes += sign * sum(title for title, description in sizes)
+        self._description_bytes += sign * sum(description for title, description in sizes)
+
+    def _recount_text(self, pairs):
+        changed = [(old, task) for old, task in pairs
+                   if old['title'] != task['title'] or old['description'] != task['description']]
+        # The new text is encoded before either total moves.
+        sizes = [text_bytes(task) for old, task in changed]
+        self._count_text([old for old, task in changed], -1)
+        self._add_text_sizes(sizes)
+
+    def _index_text(self, tasks):
+        for task in tasks:
+            for term in task_terms(task):
+                self._postings.setdefault(term, set()).add(task['id'])
+        self._add_titles([title_key(task) for task in tasks])
+
+    def _unindex_text(self, tasks):
+        for task in tasks:
+            for term in task_terms(task):
+                self._drop_posting(term, task['id'])
+        self._drop_titles([title_key(task) for task in tasks])
+
+    def _reindex_text(self, pairs):
+        old_titles, new_titles = [], []
+        for old, task in pairs:
+            task_id = task['id']
+            old_terms, terms = task_terms(old), task_terms(task)
+            for term in old_terms - terms:
+                self._drop_posting(term, task_id)
+            for term in terms - old_terms:
+                self._postings.setdefault(term, set()).add(task_id)
+            if old['title'] != task['title']:
+                old_titles.append(title_key(old))
+                new_titles.append(title_key(task))
+        self._drop_titles(old_titles)
+        self._add_titles(new_titles)
+
+    def _drop_posting(self, term, task_id):
+        postings = self._postings[term]
+        postings.discard(task_id)
+        if not postings:
+            del self._postings[term]
+
+    def _add_titles(self, keys):
+        self._titles.update(keys)
+
+    def _drop_titles(self, keys):
+        self._titles.difference_update(keys)
+
+    def __len__(self):
+        return len(self._tasks)
+
+    @property
+    def version(self):
+        return self._version
+
+    @contextmanager
+    def _writing(self):
+        # Writes are logged under the lock but waited on after it, so
+        # concurrent writers can share one WAL fsync.
+        with self._lock:
+            self._wal_ticket = 0
+            yield
+            ticket = self._wal_ticket
+        if ticket:
+            self._wal.wait(ticket)
+
+    def _next_version(self):
+        return self._version + 1
+
+    def _log(self, version, op, tasks):
+        # A write that matched nothing keeps the version, so listing
+        # ETags and caches stay valid and waiters are not woken.
+        if not tasks:
+            return
+        for task in tasks:
+            if len(self._changes) == self._changes.maxlen:
+                self._log_floor = self._changes[0][0]
+            self._changes.append((version, op, task['id']))
+        # After the entries, so a reader that sees this version finds
+        # every entry up to it in the log.
+        self._version = version
+        if self._wal is not None:
+            self._wal_ticket = self._wal.append(version, op, tasks)
+        self._notify()
+
+    def _notify(self):
+        with self._changed:
+            self._changed.notify_all()
+
+    def wait(self, version, timeout):
+        """Block until the store is past version or timeout expires."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._version > version, timeout)
+        return self._version
+
+    def changes(self, since):
+        """(version, op, id) entries newer than since, oldest first.
+
+        Returns None when since is older than the log reaches back or newer
+        than this store has ever been, and the caller must resync.
+        """
+        version = self._version
+        entries = list(self._changes)
+        # Entries land just before the version is published, so the
+        # newest entry may be ahead of the version read above.
+        if entries:
+            version = max(version, entries[-1][0])
+        if since < self._log_floor or since > version:
+            return None
+        return entries[bisect_right(entries, since, key=lambda entry: entry[0]):]
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def __contains__(self, task_id):
+        return task_id in self._tasks
+
+    def snapshot(self):
+        # list() over a dict view runs without releasing the GIL, so this
+        # is a consistent copy even while writers are active.
+        return list(self._tasks.values())
+
+    def _live_tasks(self):
+        return self.snapshot()
+
+    def checkpoint(self):
+        """Rewrite the WAL down to the live tasks; returns the version kept."""
+        with self._lock:
+            tasks, version, last_id = self._live_tasks(), self._version, self._next_id - 1
+        self._wal.compact(version, tasks, last_id)
+        return version
+
+    def get(self, task_id):
+        return self._tasks.get(task_id)
+
+    def count(self, done=None):
+        if done is None:
+            return len(self._tasks)
+        return len(self._by_done[done])
+
+    def stats(self):
+        """Task counts and title and description byte totals, in O(1)."""
+        # Under the lock, so the counters all come from the same version.
+        with self._lock:
+            return task_stats(len(self._tasks), len(self._by_done[True]), self._title_bytes, self._description_bytes)
+
+    def _done_ids(self, done):
+        return list(self._by_done[done])
+
+    def where(self, done):
+        with self._lock:
+            ids = self._done_ids(done)
+        tasks = []
+        for task_id in ids:
+            task = self._tasks.get(task_id)
+            if task is not None and task['done'] is done:
+                tasks.append(task)
+        return tasks
+
+    def search(self, query, limit):
+        """The first `limit` tasks, by id, containing every query term."""
+        postings = [self._postings.get(term) for term in set(tokenize(query))]
+        if not postings or None in postings:
+            return []
+        postings.sort(key=len)
+        # set() and &= run in C without releasing the GIL, like snapshot().
+        ids = set(postings[0])
+        for other in postings[1:]:
+            ids &= other
+        tasks = []
+        for task_id in nsmallest(limit, ids):
+            task = self.get(task_id)
+            if task is not None:
+                tasks.append(task)
+        return tasks
+
+    def suggest(self, prefix, limit):
+        """Up to `limit` tasks whose title starts with prefix, by title."""
+        prefix = prefix.lower()
+        with self._lock:
+            keys = self._titles.after((prefix,), limit)
+        tasks = []
+        for title, task_id in keys:
+            if not title.startswith(prefix):
+                break
+            task = self.get(task_id)
+            if task is not None:
+                tasks.append(task)
+        return tasks
+
+    def page(self, after, limit, done=None):
+        with self._lock:
+            ids = (self._ids if done is None else self._by_done[done]).after(after, limit)
+        tasks = [self._tasks.get(task_id) for task_id in ids]
+        return [task for task in tasks if task is not None and (done is None or task['done'] is done)]
+
+    def sorted_page(self, order, after, limit):
+        """Up to `limit` tasks in a SORT_ORDERS order.
+
+        Starts just past the sort_key() after, or at the beginning when
+        after is None. Costs a bisection plus the page, whatever the size
+        of the store.
+        """
+        if order == 'done,id':
+            return done_order_page(self, after, limit)
+        with self._lock:
+            if order == 'title':
+                keys = self._titles.after(after, limit)
+            else:
+                keys = self._titles.before(after, limit)
+        tasks = []
+        for title, task_id in keys:
+            task = self.get(task_id)
+            if task is not None:
+                tasks.append(task)
+        return tasks
+
+    def insert(self, fields):
+        return self.insert_many([fields])[0]
+
+    def insert_many(self, fields_list):
+        with self._writing():
+            ids = range(self._next_id, self._next_id + len(fields_list))
+            tasks = self._insert(ids, fields_list)
+            self._next_id = ids.stop
+        return tasks
+
+    def _insert(self, ids, fields_list):
+        """Create a task per fields with the given, ascending ids; under the lock."""
+        version = self._next_version()
+        tasks = []
+        for task_id, fields in zip(ids, fields_list):
+            tasks.append(Task.from_fields(task_id, fields, version))
+        # Indexed before they are published, so a task that fails to
+        # index leaves the store as it was.
+        self._index(tasks)
+        self._tasks.update((task['id'], task) for task in tasks)
+        self._ids.update(ids)
+        self._log(version, 'create', tasks)
+        return tasks
+
+    def update(self, task_id, changes, expected=None):
+        """Apply changes to one task; None if it does not exist.
+
+        With expected, a collection of versions, raises VersionConflict
+        unless the task is still at one of them.
+        """
+        with self._writing():
+            old = self._tasks.get(task_id)
+            if old is None:
+                return None
+            if expected is not None and old['version'] not in expected:
+                raise VersionConflict(old)
+            task = apply_changes(old, changes, self._next_version())
+            # Reindexed before it is published, as in insert_many().
+            self._reindex([(old, task)])
+            self._tasks[task_id] = task
+            self._log(task['version'], 'update', [task])
+        return task
+
+    def _select(self, task_ids, done):
+        if task_ids is not None:
+            return task_ids
+        return self._done_ids(done)
+
+    def update_many(self, changes, task_ids=None, done=None):
+        """Update the given ids, or every task whose done flag matches.
+
+        Returns {task_id: updated}, in selection order.
+        """
+        results = {}
+        pairs = []
+        with self._writing():
+            version = self._next_version()
+            for task_id in self._select(task_ids, done):
+                old = self._tasks.get(task_id)
+                if old is not None:
+                    pairs.append((old, apply_changes(old, changes, version)))
+                results[task_id] = old is not None
+            self._reindex(pairs)
+            self._tasks.update((task['id'], task) for old, task in pairs)
+            self._log(version, 'update', [task for old, task in pairs])
+        return results
+
+    def remove(self, task_id):
+        with self._writing():
+            task = self._tasks.pop(task_id, None)
+            if task is not None:
+                self._unindex([task])
+                self._ids.difference_update([task_id])
+                self._log(self._next_version(), 'delete', [task])
+            return task
+
+    def remove_many(self, task_ids=None, done=None):
+        results = {}
+        removed = []
+        with self._writing():
+            version = self._next_version()
+            for task_id in self._select(task_ids, done):
+                task = self._tasks.pop(task_id, None)
+                if task is not None:
+                    removed.append(task)
+                results[task_id] = task is not None
+            self._unindex(removed)
+            self._ids.difference_update([task['id'] for task in removed])
+            self._log(version, 'delete', removed)
+        return results
+
+
+class StringTable(object):
+    """Strings packed end to end in one UTF-8 buffer, addressed by row.
+
+    Overwriting a row appends the new text and leaves the old bytes
+    behind; the buffer is repacked once they are half of it.
+    """
+
+    def __init__(self, strings=()):
+        self._data = bytearray()
+        self._starts = array('q')
+        self._ends = array('q')
+        self._garbage = 0
+        for text in strings:
+            self.append(text)
+
+    def __len__(self):
+        return len(self._starts)
+
+    @classmethod
+    def from_buffers(cls, data, starts, ends):
+        """A table over existing buffers, e.g. memoryviews of a snapshot."""
+        table = cls()
+        table._data, table._starts, table._ends = data, starts, ends
+        return table
+
+    def buffers(self):
+        return self._data, self._starts, self._ends
+
+    def thaw(self):
+        """Copy read-only buffers into growable ones."""
+        if not isinstance(self._data, bytearray):
+            starts, ends = array('q'), array('q')
+            starts.frombytes(self._starts.cast('B'))
+            ends.frombytes(self._ends.cast('B'))
+            self._data, self._starts, self._ends = bytearray(self._data), starts, ends
+
+    def __getitem__(self, row):
+        return str(self._data[self._starts[row]:self._ends[row]], 'utf-8')
+
+    def size(self, row):
+        return self._ends[row] - self._starts[row]
+
+    def total_size(self):
+        """Bytes held by all rows, not counting overwritten text."""
+        return sum(self._ends) - sum(self._starts)
+
+    def append(self, text):
+        data = text.encode('utf-8')
+        self._starts.append(len(self._data))
+        self._data += data
+        self._ends.append(len(self._data))
+
+    def __setitem__(self, row, text):
+        # Encoded first, so text that cannot be stored leaves the row as it was.
+        data = text.encode('utf-8')
+        self._garbage += self._ends[row] - self._starts[row]
+        self._starts[row] = len(self._data)
+        self._data += data
+        self._ends[row] = len(self._data)
+        if self._garbage * 2 > len(self._data):
+            packed = self.take(range(len(self)))
+            self._data, self._starts, self._ends, self._garbage = packed._data, packed._starts, packed._ends, 0
+
+    def take(self, rows):
+        """A new table holding only the given rows, in that order."""
+        table = StringTable()
+        for row in rows:
+            table._starts.append(len(table._data))
+            table._data += self._data[self._starts[row]:self._ends[row]]
+            table._ends.append(len(table._data))
+        return table
+
+
+class ColumnarTaskStore(TaskStore):
+    """TaskStore laid out as columns, one row per task in id order.
+
+    _ids is an array('q') kept sorted, so a task's row is found by
+    bisection. _done is a bytearray of 0/1 flags in which DEAD marks a
+    removed row, so filtering by done is one C-level pass over it; the
+    done count and the title and description byte totals are kept as
+    running counters. Versions are an array('q') and titles and
+    descriptions live in StringTables. Task records are built only when
+    read. Removed rows stay until they make up half of the table, then
+    the columns are rebuilt; until then, paging skips them with find()
+    on the done column.
+
+    A task spans several columns, so unlike TaskStore, readers take the
+    lock too. Search postings, the title index and the change log work
+    as in TaskStore, except that postings and the title index are only
+    built on the first search, suggest or title-sorted page.
+
+    save() writes the columns as they are to a snapshot file, and load()
+    maps one back in: ids, versions and string offsets are read straight
+    from the mapping and only the done column is copied. The first write
+    copies the rest into growable buffers (_thaw).
+    """
+
+    def __init__(self, tasks=(), change_log_size=CHANGE_LOG_SIZE, wal=None):
+        last_id = version = 0
+        if wal is not None:
+            tasks, last_id, version = wal.replay(tasks)
+        tasks = sorted(tasks, key=lambda task: task['id'])
+        version = max([task.get('version', 0) for task in tasks] + [version])
+        self._setup(
+            array('q', [task['id'] for task in tasks]),
+            bytearray(task['done'] for task in tasks),
+            array('q', [task.get('version', 0) for task in tasks]),
+            StringTable(task['title'] for task in tasks),
+            StringTable(task['description'] for task in tasks),
+            last_id, version, change_log_size, wal
+        )
+
+    def _setup(self, ids, done, versions, titles, descriptions, last_id, version, change_log_size, wal):
+        self.epoch = new_epoch()
+        self._lock = threading.Lock()
+        self._wal = wal
+        self._postings = None
+        self._titles = None
+        self._ids = ids
+        self._done = done
+        self._versions = versions
+        self._title_text = titles
+        self._description_text = descriptions
+        self._removed = done.count(DEAD)
+        self._done_count = done.count(1)
+        self._title_bytes = titles.total_size() - sum(titles.size(row) for row in self._done_rows(DEAD))
+        self._description_bytes = descriptions.total_size() - sum(descriptions.size(row) for row in self._done_rows(DEAD))
+        self._frozen = not isinstance(ids, array)
+        self._next_id = max(ids[-1] if len(ids) else 0, last_id) + 1
+        self._version = version
+        self._changes = deque(maxlen=change_log_size)
+        self._log_floor = self._version
+        self._changed = threading.Condition()
+
+    @classmethod
+    def load(cls, path, change_log_size=CHANGE_LOG_SIZE, wal=None):
+        """Map a snapshot written by save(), then apply newer WAL records."""
+        with open(path, 'rb') as snapshot:
+            view = memoryview(mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ))
+        magic, rows, version, last_id, title_size, description_size = SNAPSHOT_HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError('%s is not a task snapshot' % path)
+        offset = SNAPSHOT_HEADER.size
+
+        def take(size):
+            nonlocal offset
+            offset += size
+            return view[offset - size:offset]
+
+        ids, versions = take(8 * rows).cast('q'), take(8 * rows).cast('q')
+        title_starts, title_ends = take(8 * rows).cast('q'), take(8 * rows).cast('q')
+        description_starts, description_ends = take(8 * rows).cast('q'), take(8 * rows).cast('q')
+        done = bytearray(take(rows))
+        titles = StringTable.from_buffers(take(title_size), title_starts, title_ends)
+        descriptions = StringTable.from_buffers(take(description_size), description_starts, description_ends)
+        store = cls.__new__(cls)
+        store._setup(ids, done, versions, titles, descriptions, last_id, version, change_log_size, wal)
+        if wal is not None:
+            store._replay(wal.records(version))
+        return store
+
+    def save(self, path):
+        """Write a snapshot to path atomically; returns its version.
+
+        Only buffer copies happen under the lock. Removed rows and stale
+        string bytes are written as they are.
+        """
+        with self._lock:
+            titles = [bytes(buffer) for buffer in self._title_text.buffers()]
+            descriptions = [bytes(buffer) for buffer in self._description_text.buffers()]
+            columns = [bytes(self._ids), bytes(self._versions), titles[1], titles[2],
+                       descriptions[1], descriptions[2], bytes(self._done), titles[0], descriptions[0]]
+            header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, len(self._ids), self._version, self._next_id - 1,
+                                          len(titles[0]), len(descriptions[0]))
+            version = self._version
+        with open(path + '.tmp', 'wb') as snapshot:
+            snapshot.write(header)
+            for column in columns:
+                snapshot.write(column)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(path + '.tmp', path)
+        return version
+
+    def _thaw(self):
+        if self._frozen:
+            ids, versions = array('q'), array('q')
+            ids.frombytes(self._ids.cast('B'))
+            versions.frombytes(self._versions.cast('B'))
+            self._ids, self._versions = ids, versions
+            self._title_text.thaw()
+            self._description_text.thaw()
+            self._frozen = False
+
+    def _replay(self, records):
+        """Apply WAL records directly, without logging them again."""
+        for record in records:
+            self._thaw()
+            version = record['version']
+            task_id = record['task']['id'] if 'task' in record else record['id']
+            row = self._row(task_id)
+            if record['op'] == 'checkpoint':
+                # A rewritten log: the live tasks follow as creates.
+                for row in list(self._live_rows()):
+                    self._count_text([self._task(row)], -1)
+                    self._drop(row)
+            elif record['op'] == 'create' and row is None:
+                task = Task.from_fields(task_id, record['task'], version)
+                self._append(task)
+                self._count_text([task])
+            elif row is not None and record['op'] == 'delete':
+                self._count_text([self._task(row)], -1)
+                self._drop(row)
+            elif row is not None:
+                old, task = self._task(row), Task.from_fields(task_id, record['task'], version)
+                self._write(row, old, task)
+                self._recount_text([(old, task)])
+            self._next_id = max(self._next_id, task_id + 1)
+            self._version = self._log_floor = max(self._version, version)
+
+    @contextmanager
+    def _writing(self):
+        with TaskStore._writing(self):
+            self._thaw()
+            yield
+
+    def _text_index(self):
+        """Build the postings and title index on first use."""
+        if self._postings is None:
+            with self._lock:
+                if self._postings is None:
+                    self._titles = SortedIndex()
+                    self._postings = {}
+                    TaskStore._index_text(self, [self._task(row) for row in self._live_rows()])
+
+    def _index_text(self, tasks):
+        self._count_text(tasks)
+        if self._postings is not None:
+            TaskStore._index_text(self, tasks)
+
+    def _unindex_text(self, tasks):
+        self._count_text(tasks, -1)
+        if self._postings is not None:
+            TaskStore._unindex_text(self, tasks)
+
+    def _reindex_text(self, pairs):
+        self._recount_text(pairs)
+        if self._postings is not None:
+            TaskStore._reindex_text(self, pairs)
+
+    def search(self, query, limit):
+        self._text_index()
+        return TaskStore.search(self, query, limit)
+
+    def suggest(self, prefix, limit):
+        self._text_index()
+        return TaskStore.suggest(self, prefix, limit)
+
+    def sorted_page(self, order, after, limit):
+        if order != 'done,id':
+            self._text_index()
+        return TaskStore.sorted_page(self, order, after, limit)
+
+    def _row(self, task_id):
+        row = bisect_left(self._ids, task_id)
+        if row < len(self._ids) and self._ids[row] == task_id and self._done[row] != DEAD:
+            return row
+        return None
+
+    def _task(self, row):
+        return Task(self._ids[row], self._title_text[row], self._description_text[row], self._done[row] == 1, self._versions[row])
+
+    def _live_rows(self, start=0):
+        if not self._removed:
+            return iter(range(start, len(self._ids)))
+        # find() skips a run of removed rows in C, however long it is.
+        return merge(self._done_rows(False, start), self._done_rows(True, start))
+
+    def _done_rows(self, done, start=0):
+        flag = int(done)
+        row = self._done.find(flag, start)
+        while row != -1:
+            yield row
+            row = self._done.find(flag, row + 1)
+
+    def __len__(self):
+        return len(self._ids) - self._removed
+
+    def count(self, done=None):
+        if done is None:
+            return len(self)
+        return self._done_count if done else len(self) - self._done_count
+
+    def stats(self):
+        with self._lock:
+            return task_stats(len(self), self._done_count, self._title_bytes, self._description_bytes)
+
+    def __contains__(self, task_id):
+        with self._lock:
+            return self._row(task_id) is not None
+
+    def snapshot(self):
+        with self._lock:
+            return self._live_tasks()
+
+    def _live_tasks(self):
+        return [self._task(row) for row in self._live_rows()]
+
+    def get(self, task_id):
+        with self._lock:
+            row = self._row(task_id)
+            return None if row is None else self._task(row)
+
+    def _done_ids(self, done):
+        return [self._ids[row] for row in self._done_rows(done)]
+
+    def where(self, done):
+        with self._lock:
+            return [self._task(row) for row in self._done_rows(done)]
+
+    def page(self, after, limit, done=None):
+        with self._lock:
+            start = bisect_right(self._ids, after)
+            rows = self._live_rows(start) if done is None else self._done_rows(done, start)
+            return [self._task(row) for row in islice(rows, limit)]
+
+    def insert_many(self, fields_list):
+        with self._writing():
+            version = self._next_version()
+            tasks = [Task.from_fields(task_id, fields, version) for task_id, fields in enumerate(fields_list, self._next_id)]
+            self._index_text(tasks)
+            for task in tasks:
+                self._append(task)
+            self._next_id += len(tasks)
+            self._log(version, 'create', tasks)
+        return tasks
+
+    def _append(self, task):
+        self._ids.append(task.id)
+        self._done.append(task.done)
+        self._versions.append(task.version)
+        self._title_text.append(task.title)
+        self._description_text.append(task.description)
+        self._done_count += task.done
+
+    def _write(self, row, old, task):
+        if task.title != old.title:
+            self._title_text[row] = task.title
+        if task.description != old.description:
+            self._description_text[row] = task.description
+        self._done[row] = task.done
+        self._done_count += task.done - old.done
+        self._versions[row] = task.version
+
+    def _drop(self, row):
+        self._done_count -= self._done[row] == 1
+        self._done[row] = DEAD
+        self._removed += 1
+
+    def update(self, task_id, changes, expected=None):
+        with self._writing():
+            row = self._row(task_id)
+            if row is None:
+                return None
+            old = self._task(row)
+            if expected is not None and old.version not in expected:
+                raise VersionConflict(old)
+            task = apply_changes(old, changes, self._next_version())
+            # Reindexing encodes the new text, so it fails before any
+            # column has changed.
+            self._reindex_text([(old, task)])
+            self._write(row, old, task)
+            self._log(task.version, 'update', [task])
+        return task
+
+    def update_many(self, changes, task_ids=None, done=None):
+        results = {}
+        rows, pairs = [], []
+        with self._writing():
+            version = self._next_version()
+            for task_id in self._select(task_ids, done):
+                row = self._row(task_id)
+                if row is not None:
+                    old = self._task(row)
+                    rows.append(row)
+                    pairs.append((old, apply_changes(old, changes, version)))
+                results[task_id] = row is not None
+            self._reindex_text(pairs)
+            for row, (old, task) in zip(rows, pairs):
+                self._write(row, old, task)
+            self._log(version, 'update', [task for old, task in pairs])
+        return results
+
+    def _compact(self):
+        if self._removed * 2 > len(self._ids):
+            rows = list(self._live_rows())
+            self._ids = array('q', [self._ids[row] for row in rows])
+            self._done = bytearray(self._done[row] for row in rows)
+            self._versions = array('q', [self._versions[row] for row in rows])
+            self._title_text = self._title_text.take(rows)
+            self._description_text = self._description_text.take(rows)
+            self._removed = 0
+
+    def remove(self, task_id):
+        with self._writing():
+            row = self._row(task_id)
+            if row is None:
+                return None
+            task = self._task(row)
+            self._drop(row)
+            self._unindex_text([task])
+            self._compact()
+            self._log(self._next_version(), 'delete', [task])
+            return task
+
+    def remove_many(self, task_ids=None, done=None):
+        results = {}
+        removed = []
+        with self._writing():
+            version = self._next_version()
+            for task_id in self._select(task_ids, done):
+                row = self._row(task_id)
+                if row is not None:
+                    removed.append(self._task(row))
+                    self._drop(row)
+                results[task_id] = row is not None
+            self._unindex_text(removed)
+            self._compact()
+            self._log(version, 'delete', removed)
+        return results
+
+
+class TaskShard(TaskStore):
+    """One shard of a ShardedTaskStore.
+
+    Its change log holds its own writes, stamped with versions drawn from
+    the owner's counter. _in_flight is the version of the write under
+    way: 0 while it is being drawn, None between writes.
+    """
+
+    def __init__(self, owner, tasks, change_log_size):
+        TaskStore.__init__(self, tasks, change_log_size)
+        self._owner = owner
+        self._in_flight = None
+
+    @contextmanager
+    def _writing(self):
+        try:
+            with TaskStore._writing(self):
+                try:
+                    yield
+                finally:
+                    self._in_flight = None
+        finally:
+            # Once the write is out of flight, so the owner's version has
+            # moved by the time its waiters look.
+            self._owner._wake()
+
+    def _next_version(self):
+        self._in_flight = 0
+        self._in_flight = next(self._owner._versions)
+        return self._in_flight
+
+    def _notify(self):
+        # Nobody waits on a shard; _writing() wakes the owner's waiters.
+        pass
+
+    def insert_ids(self, ids, fields_list):
+        with self._writing():
+            return self._insert(ids, fields_list)
+
+
+class ShardedTaskStore(TaskStore):
+    """Tasks split over TaskShards by id modulo the shard count.
+
+    Each shard has its own lock and change log, so writes to different
+    shards never wait for each other. Ids come from one counter, held
+    under _id_lock only to bump it, so they rise in creation order
+    whatever the shard; a batch goes to the shards its ids map to.
+    Listings, filters, search and suggest ask every shard and merge the
+    results by id (suggest by title).
+
+    Shards draw versions from one itertools.count without a shared lock.
+    version is the newest logged version capped below the oldest write
+    still in flight, so every version up to it is logged; changes()
+    merges the shard logs up to it and wait() wakes on it. Writers only
+    touch the shared condition while someone waits.
+    """
+
+    def __init__(self, tasks=(), shards=8, change_log_size=CHANGE_LOG_SIZE):
+        tasks = list(tasks)
+        self.epoch = new_epoch()
+        self._wal = None
+        self._id_lock = threading.Lock()
+        self._next_id = max([task['id'] for task in tasks], default=0) + 1
+        self._versions = count(max([task.get('version', 0) for task in tasks], default=0) + 1)
+        self._changed = threading.Condition()
+        self._waiting = 0
+        self._shards = [TaskShard(self, [task for task in tasks if task['id'] % shards == shard], change_log_size)
+                        for shard in range(shards)]
+
+    @property
+    def version(self):
+        while True:
+            # Logged versions first: a version drawn before the newest of
+            # them is then either logged too or still in flight.
+            logged = max(shard._version for shard in self._shards)
+            in_flight = [shard._in_flight for shard in self._shards if shard._in_flight is not None]
+            if 0 not in in_flight:
+                return min([logged] + [version - 1 for version in in_flight])
+            time.sleep(0)
+
+    def wait(self, version, timeout):
+        with self._changed:
+            self._waiting += 1
+            try:
+                self._changed.wait_for(lambda: self.version > version, timeout)
+            finally:
+                self._waiting -= 1
+        return self.version
+
+    def _wake(self):
+        if self._waiting:
+            with self._changed:
+                self._changed.notify_all()
+
+    def changes(self, since):
+        version = self.version
+        logs = [list(shard._changes) for shard in self._shards]
+        if since < max(shard._log_floor for shard in self._shards) or since > version:
+            return None
+        logs = [log[bisect_right(log, since, key=lambda entry: entry[0]):] for log in logs]
+        return [entry for entry in merge(*logs, key=lambda entry: entry[0]) if entry[0] <= version]
+
+    def _shard(self, task_id):
+        return self._shards[task_id % len(self._shards)]
+
+    def _by_shard(self, task_ids):
+        groups = {}
+        for task_id in task_ids:
+            groups.setdefault(task_id % len(self._shards), []).append(task_id)
+        return groups
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+    def count(self, done=None):
+        return sum(shard.count(done) for shard in self._shards)
+
+    def stats(self):
+        stats = [shard.stats() for shard in self._shards]
+        return dict((key, sum(shard[key] for shard in stats)) for key in stats[0])
+
+    def __contains__(self, task_id):
+        return task_id in self._shard(task_id)
+
+    def snapshot(self):
+        # Each shard is nearly in id order, so this sort is mostly merging.
+        tasks = []
+        for shard in self._shards:
+            tasks.extend(shard.snapshot())
+        tasks.sort(key=lambda task: task['id'])
+        return tasks
+
+    def get(self, task_id):
+        return self._shard(task_id).get(task_id)
+
+    def _merge(self, results, limit=None, key=lambda task: task['id'], reverse=False):
+        return list(islice(merge(*results, key=key, reverse=reverse), limit))
+
+    def where(self, done):
+        return self._merge(shard.where(done) for shard in self._shards)
+
+    def search(self, query, limit):
+        return self._merge((shard.search(query, limit) for shard in self._shards), limit)
+
+    def suggest(self, prefix, limit):
+        return self._merge((shard.suggest(prefix, limit) for shard in self._shards), limit, title_key)
+
+    def page(self, after, limit, done=None):
+        return self._merge((shard.page(after, limit, done) for shard in self._shards), limit)
+
+    def sorted_page(self, order, after, limit):
+        return self._merge((shard.sorted_page(order, after, limit) for shard in self._shards), limit,
+                           lambda task: sort_key(order, task), order == '-title')
+
+    def insert_many(self, fields_list):
+        # A batch can span shards, so its text is encoded up front: bad
+        # text must not leave the other shards' tasks behind.
+        for fields in fields_list:
+            text_bytes(Task.from_fields(0, fields, 0))
+        with self._id_lock:
+            start = self._next_id
+            self._next_id += len(fields_list)
+        tasks = []
+        for shard, ids in self._by_shard(range(start, start + len(fields_list))).items():
+            tasks.extend(self._shards[shard].insert_ids(ids, [fields_list[task_id - start] for task_id in ids]))
+        tasks.sort(key=lambda task: task['id'])
+        return tasks
+
+    def update(self, task_id, changes, expected=None):
+        return self._shard(task_id).update(task_id, changes, expected)
+
+    def update_many(self, changes, task_ids=None, done=None):
+        return self._fan_out(lambda shard, ids: shard.update_many(changes, ids, done), task_ids)
+
+    def remove(self, task_id):
+        return self._shard(task_id).remove(task_id)
+
+    def remove_many(self, task_ids=None, done=None):
+        return self._fan_out(lambda shard, ids: shard.remove_many(ids, done), task_ids)
+
+    def _fan_out(self, apply, task_ids):
+        """Run apply per shard; results in selection order, or by id for a filter."""
+        results = {}
+        if task_ids is None:
+            for shard in self._shards:
+                results.update(apply(shard, None))
+            return dict(sorted(results.items()))
+        for shard, ids in self._by_shard(task_ids).items():
+            results.update(apply(self._shards[shard], ids))
+        return dict((task_id, results[task_id]) for task_id in task_ids)
+
+
+class SharedTaskStore(object):
+    """TaskStore in a memory-mapped file shared by every worker process.
+
+    Open the same path (e.g. under /dev/shm) in each worker and they all
+    see one task table. Each task lives in a fixed-width row with its
+    title and description stored in place, so those are limited to
+    SHARED_TITLE_BYTES and SHARED_DESCRIPTION_BYTES of UTF-8 and live
+    tasks to the file's capacity; writes past either raise
+    StoreLimitExceeded. Rows freed by deletes are reused. The file is
+    sparse, so rows never used cost nothing.
+
+    The id index maps ids to rows: ids only grow, so it is appended to in
+    id order and found by bisection. A delete leaves a -1 row behind,
+    and a full index is compacted in place; it holds twice the capacity,
+    so that happens at most once per capacity inserts.
+
+    Writers hold a thread lock plus an flock on the file, and keep the
+    header's seq odd while they write. Readers take no lock: they copy
+    the bytes they need and retry unless seq was the same even value
+    before and after (a seqlock). Listings read SHARED_CHUNK_ROWS rows per
+    section, so each task is read whole. Counts and title and description
+    byte totals live in the header, but there are no other indexes:
+    filters, search, suggest and title-sorted pages scan rows.
+    """
+
+    def __init__(self, path, tasks=(), capacity=SHARED_CAPACITY, change_log_size=CHANGE_LOG_SIZE):
+        self._path = path
+        self._lock = threading.Lock()
+        self._lock_fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._lock_pid = os.getpid()
+        # Only the first process to open the file seeds it.
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            fresh = os.fstat(self._lock_fd).st_size == 0
+            if fresh:
+                os.ftruncate(self._lock_fd, shared_rows_offset(capacity, change_log_size) + capacity * SHARED_ROW.size)
+            self._map = mmap.mmap(self._lock_fd, 0)
+            self._header = memoryview(self._map)[8:8 + 8 * SHARED_COUNTERS].cast('q')
+            if fresh:
+                self._header[CAPACITY] = capacity
+                self._header[LOG_SIZE] = change_log_size
+                self._header[EPOCH] = int(new_epoch(), 16)
+                self._setup()
+                self._seed(list(tasks))
+                self._map[:8] = SHARED_MAGIC
+            elif self._map[:8] != SHARED_MAGIC:
+                raise ValueError('%s is not a shared task store' % path)
+            else:
+                self._setup()
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        self._changed = threading.Condition()
+        self._poller_pid = None
+
+    def _setup(self):
+        # Every process sharing the file shares its epoch.
+        self.epoch = '%08x' % self._header[EPOCH]
+        self._capacity = self._header[CAPACITY]
+        self._log_size = self._header[LOG_SIZE]
+        self._rows_offset = shared_rows_offset(self._capacity, self._log_size)
+        index = memoryview(self._map)[shared_index_offset(self._log_size):self._rows_offset].cast('q')
+        self._index_ids = index[:2 * self._capacity]
+        self._index_rows = index[2 * self._capacity:4 * self._capacity]
+        self._free = index[4 * self._capacity:]
+
+    def _seed(self, tasks):
+        tasks = sorted(tasks, key=lambda task: task['id'])
+        rows = [self._encode(Task.from_fields(task['id'], task, task.get('version', 0))) for task in tasks]
+        slots = self._allocate(len(rows))
+        for slot, row in zip(slots, rows):
+            SHARED_ROW.pack_into(self._map, self._row_offset(slot), *row)
+        self._add_to_index([row[0] for row in rows], slots)
+        self._header[NEXT_ID] = max([task['id'] for task in tasks], default=0) + 1
+        self._header[VERSION] = max([task.get('version', 0) for task in tasks], default=0)
+        self._header[LIVE] = len(tasks)
+        self._header[DONE_COUNT] = sum(1 for task in tasks if task['done'])
+        self._header[TITLE_BYTES] = sum(row[3] for row in rows)
+        self._header[DESCRIPTION_BYTES] = sum(row[4] for row in rows)
+
+    def _row_offset(self, slot):
+        return self._rows_offset + slot * SHARED_ROW.size
+
+    def _allocate(self, n):
+        """Rows for n new tasks - freed ones first - with room for them in the index."""
+        free, used = self._header[FREE_COUNT], self._header[ROWS_USED]
+        if n > free + self._capacity - used:
+            raise StoreLimitExceeded('shared store is full')
+        reused = min(n, free)
+        slots = self._free[free - reused:free].tolist() + list(range(used, used + n - reused))
+        self._header[FREE_COUNT] = free - reused
+        self._header[ROWS_USED] = used + n - reused
+        if self._header[INDEX_COUNT] + n > len(self._index_ids):
+            self._compact_index()
+        return slots
+
+    def _compact_index(self):
+        count = self._header[INDEX_COUNT]
+        live = [(task_id, slot) for task_id, slot in zip(self._index_ids[:count].tolist(), self._index_rows[:count].tolist())
+                if slot >= 0]
+        self._index_ids[:len(live)] = array('q', [task_id for task_id, slot in live])
+        self._index_rows[:len(live)] = array('q', [slot for task_id, slot in live])
+        self._header[INDEX_COUNT] = len(live)
+
+    def _add_to_index(self, ids, slots):
+        count = self._header[INDEX_COUNT]
+        self._index_ids[count:count + len(ids)] = array('q', ids)
+        self._index_rows[count:count + len(ids)] = array('q', slots)
+        self._header[INDEX_COUNT] = count + len(ids)
+
+    def _find(self, task_id):
+        """Index position of a live task_id, or None."""
+        count = self._header[INDEX_COUNT]
+        i = bisect_left(self._index_ids, task_id, 0, count)
+        if i < count and self._index_ids[i] == task_id and self._index_rows[i] >= 0:
+            return i
+        return None
+
+    def _fetch(self, task_id):
+        i = self._find(task_id)
+        if i is None:
+            return None
+        return SHARED_ROW.unpack_from(self._map, self._row_offset(self._index_rows[i]))
+
+    def _encode(self, task):
+        title = task['title'].encode('utf-8')
+        description = task['description'].encode('utf-8')
+        if len(title) > SHARED_TITLE_BYTES or len(description) > SHARED_DESCRIPTION_BYTES:
+            raise StoreLimitExceeded('title or description too long for the shared store')
+        state = ROW_DONE if task['done'] else ROW_OPEN
+        return task['id'], task['version'], state, len(title), len(description), title, description
+
+    @staticmethod
+    def _decode(row):
+        task_id, version, state, title_size, description_size, title, description = row
+        if state == ROW_EMPTY:
+            return None
+        return Task(task_id, title[:title_size].decode('utf-8'), description[:description_size].decode('utf-8'),
+                    state == ROW_DONE, version)
+
+    def _read(self, read):
+        """Run read() until no writer overlapped it (the seqlock read side)."""
+        while True:
+            seq = self._header[SEQ]
+            if not seq & 1:
+                result = read()
+                if self._header[SEQ] == seq:
+                    return result
+            time.sleep(0)
+
+    @contextmanager
+    def _writing(self):
+        with self._lock:
+            # flock is per open file description, which a fork shares, so
+            # each process locks through its own descriptor.
+            if self._lock_pid != os.getpid():
+                self._lock_fd = os.open(self._path, os.O_RDWR)
+                self._lock_pid = os.getpid()
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                if self._header[SEQ] & 1:
+                    # A writer died mid-write; let readers through again.
+                    self._header[SEQ] += 1
+                self._header[SEQ] += 1
+                try:
+                    yield
+                finally:
+                    self._header[SEQ] += 1
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        with self._changed:
+            self._changed.notify_all()
+
+    def _load(self, task_id):
+        # Only called by writers, which already exclude each other.
+        fields = self._fetch(task_id)
+        return None if fields is None else self._decode(fields)
+
+    def _scan(self, after=0, writing=False):
+        """Tasks with id > after, in id order, SHARED_CHUNK_ROWS index entries at a time.
+
+        Writers pass writing=True and read rows directly.
+        """
+        while True:
+            last, chunk = self._chunk(after) if writing else self._read(lambda: self._chunk(after))
+            if last is None:
+                return
+            for fields in chunk:
+                task = self._decode(fields)
+                if task is not None:
+                    yield task
+            after = last
+
+    def _chunk(self, after):
+        """(last id looked at, its live rows) for the index entries after after."""
+        count = self._header[INDEX_COUNT]
+        start = bisect_right(self._index_ids, after, 0, count)
+        end = min(start + SHARED_CHUNK_ROWS, count)
+        if start == end:
+            return None, []
+        return self._index_ids[end - 1], [SHARED_ROW.unpack_from(self._map, self._row_offset(slot))
+                                          for slot in self._index_rows[start:end].tolist() if slot >= 0]
+
+    def __len__(self):
+        return self._header[LIVE]
+
+    def count(self, done=None):
+        live, done_count = self._read(lambda: (self._header[LIVE], self._header[DONE_COUNT]))
+        if done is None:
+            return live
+        return done_count if done else live - done_count
+
+    def stats(self):
+        return task_stats(*self._read(lambda: (
+            self._header[LIVE], self._header[DONE_COUNT], self._header[TITLE_BYTES], self._header[DESCRIPTION_BYTES])))
+
+    @property
+    def version(self):
+        return self._header[VERSION]
+
+    def _poll(self):
+        seen = self.version
+        while True:
+            time.sleep(SHARED_POLL_SECONDS)
+            if self.version != seen:
+                seen = self.version
+                with self._changed:
+                    self._changed.notify_all()
+
+    def wait(self, version, timeout):
+        with self._changed:
+            # One poller per process picks up other processes' writes.
+            if self._poller_pid != os.getpid():
+                threading.Thread(target=self._poll, daemon=True).start()
+                self._poller_pid = os.getpid()
+            self._changed.wait_for(lambda: self.version > version, timeout)
+        return self.version
+
+    def _log(self, version, op, tasks):
+        count = self._header[LOG_COUNT]
+        log_offset = SHARED_HEADER_SIZE
+        for task in tasks:
+            offset = log_offset + count % self._log_size * SHARED_LOG_ENTRY.size
+            SHARED_LOG_ENTRY.pack_into(self._map, offset, version, OPS.index(op), task['id'])
+            count += 1
+        self._header[LOG_COUNT] = count
+
+    def changes(self, since):
+        log_end = SHARED_HEADER_SIZE + self._log_size * SHARED_LOG_ENTRY.size
+        version, count, ring = self._read(
+            lambda: (self._header[VERSION], self._header[LOG_COUNT], self._map[SHARED_HEADER_SIZE:log_end]))
+        if since > version:
+            return None
+        entries = [(entry_version, OPS[op], task_id) for entry_version, op, task_id in SHARED_LOG_ENTRY.iter_unpack(ring)]
+        if count > self._log_size:
+            start = count % self._log_size
+            entries = entries[start:] + entries[:start]
+            # Like RedisTaskStore, a full ring may have lost part of its
+            # oldest version's entries.
+            if since < entries[0][0]:
+                return None
+        else:
+            entries = entries[:count]
+        return entries[bisect_right(entries, since, key=lambda entry: entry[0]):]
+
+    def __iter__(self):
+        return self._scan()
+
+    def __contains__(self, task_id):
+        return self.get(task_id) is not None
+
+    def snapshot(self):
+        return list(self._scan())
+
+    def get(self, task_id):
+        fields = self._read(lambda: self._fetch(task_id))
+        return None if fields is None else self._decode(fields)
+
+    def where(self, done):
+        return [task for task in self._scan() if task.done is done]
+
+    def search(self, query, limit):
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        return list(islice((task for task in self._scan() if terms <= task_terms(task)), limit))
+
+    def suggest(self, prefix, limit):
+        prefix = prefix.lower()
+        return nsmallest(limit, (task for task in self._scan() if task.title.lower().startswith(prefix)), key=title_key)
+
+    def page(self, after, limit, done=None):
+        tasks = self._scan(after)
+        if done is not None:
+            tasks = (task for task in tasks if task.done is done)
+        return list(islice(tasks, limit))
+
+    def sorted_page(self, order, after, limit):
+        if order == 'done,id':
+            return done_order_page(self, after, limit)
+        if order == 'title':
+            return nsmallest(limit, (task for task in self._scan() if after is None or title_key(task) > after),
+                             key=title_key)
+        return nlargest(limit, (task for task in self._scan() if after is None or title_key(task) < after),
+                        key=title_key)
+
+    def insert(self, fields):
+        return self.insert_many([fields])[0]
+
+    def insert_many(self, fields_list):
+        with self._writing():
+            first_id = self._header[NEXT_ID]
+            version = self._header[VERSION] + 1
+            tasks = [Task.from_fields(task_id, fields, version) for task_id, fields in enumerate(fields_list, first_id)]
+            # Encode everything and find rows first, so a rejected batch
+            # writes nothing.
+            rows = [self._encode(task) for task in tasks]
+            slots = self._allocate(len(rows))
+            for slot, row in zip(slots, rows):
+                SHARED_ROW.pack_into(self._map, self._row_offset(slot), *row)
+            self._add_to_index([task.id for task in tasks], slots)
+            self._header[NEXT_ID] = first_id + len(tasks)
+            self._header[VERSION] = version
+            self._header[LIVE] += len(tasks)
+            self._header[DONE_COUNT] += sum(1 for task in tasks if task.done)
+            self._count_text(rows)
+            self._log(version, 'create', tasks)
+        return tasks
+
+    def update(self, task_id, changes, expected=None):
+        with self._writing():
+            old = self._load(task_id)
+            if old is None:
+                return None
+            if expected is not None and old.version not in expected:
+                raise VersionConflict(old)
+            task = self._write_updates(changes, [old])[0]
+        return task
+
+    def _select(self, task_ids, done):
+        if task_ids is not None:
+            return task_ids
+        return [task.id for task in self._scan(writing=True) if task.done is done]
+
+    def update_many(self, changes, task_ids=None, done=None):
+        results = {}
+        with self._writing():
+            old_tasks = []
+            for task_id in self._select(task_ids, done):
+                old = self._load(task_id)
+                if old is not None and not results.get(task_id):
+                    old_tasks.append(old)
+                results[task_id] = old is not None
+            self._write_updates(changes, old_tasks)
+        return results
+
+    def _write_updates(self, changes, old_tasks):
+        if not old_tasks:
+            return []
+        version = self._header[VERSION] + 1
+        tasks = [apply_changes(old, changes, version) for old in old_tasks]
+        rows = [self._encode(task) for task in tasks]
+        for row in rows:
+            SHARED_ROW.pack_into(self._map, self._row_offset(self._index_rows[self._find(row[0])]), *row)
+        self._header[VERSION] = version
+        self._header[DONE_COUNT] += sum(task.done - old.done for old, task in zip(old_tasks, tasks))
+        self._count_text([self._encode(old) for old in old_tasks], -1)
+        self._count_text(rows)
+        self._log(version, 'update', tasks)
+        return tasks
+
+    def remove(self, task_id):
+        with self._writing():
+            task = self._load(task_id)
+            if task is not None:
+                self._delete([task])
+            return task
+
+    def remove_many(self, task_ids=None, done=None):
+        results = {}
+        with self._writing():
+            removed = []
+            for task_id in self._select(task_ids, done):
+                task = self._load(task_id)
+                if task is not None and not results.get(task_id):
+                    removed.append(task)
+                results[task_id] = task is not None
+            self._delete(removed)
+        return results
+
+    def _delete(self, tasks):
+        if not tasks:
+            return
+        version = self._header[VERSION] + 1
+        free = self._header[FREE_COUNT]
+        for task in tasks:
+            i = self._find(task.id)
+            slot = self._index_rows[i]
+            self._map[self._row_offset(slot) + 16] = ROW_EMPTY
+            self._index_rows[i] = -1
+            self._free[free] = slot
+            free += 1
+        self._header[FREE_COUNT] = free
+        self._header[VERSION] = version
+        self._header[LIVE] -= len(tasks)
+        self._header[DONE_COUNT] -= sum(1 for task in tasks if task.done)
+        self._count_text([self._encode(task) for task in tasks], -1)
+        self._log(version, 'delete', tasks)
+
+    def _count_text(self, rows, sign=1):
+        self._header[TITLE_BYTES] += sign * sum(row[3] for row in rows)
+        self._header[DESCRIPTION_BYTES] += sign * sum(row[4] for row in rows)
+
+
+class RedisTaskStore(object):
+    """TaskStore backed by Redis, shared by every replica.
+
+    Each task is a hash under <prefix>:task:<id>, listing order comes from
+    the <prefix>:ids sorted set (scored by id) and ids are allocated with
+    INCR on <prefix>:next_id. <prefix>:done:0 and <prefix>:done:1 index
+    ids by done flag the same way, and <prefix>:term:<term> sets are the
+    search postings. <prefix>:titles holds "<lowercased title>\\0<id>"
+    members at score 0 for ZRANGEBYLEX prefix lookups. <prefix>:version is
+    the store-wide version, <prefix>:epoch its epoch, and <prefix>:changes
+    is the capped "<version>:<op>:<id>" change log. <prefix>:bytes holds
+    the title and description byte totals, HINCRBYed alongside the
+    indexes and summed on startup if missing. New versions are also
+    PUBLISHed on <prefix>:events; one listener thread per process turns
+    them into a condition that wait() blocks on.
+
+    Every write WATCHes <prefix>:version, reads the next version from it
+    and sets it in the same MULTI as the data and the change log, so a
+    version is never visible before its writes and the log is always in
+    version order; a writer that loses the race retries. Writes that
+    touch an existing task WATCH its key too.
+    """
+
+    def __init__(self, redis, tasks=(), prefix='context', change_log_size=CHANGE_LOG_SIZE):
+        self._redis = redis
+        self._prefix = prefix
+        self._change_log_size = change_log_size
+        self._ids_key = prefix + ':ids'
+        self._titles_key = prefix + ':titles'
+        self._next_id_key = prefix + ':next_id'
+        self._version_key = prefix + ':version'
+        self._changes_key = prefix + ':changes'
+        self._events_key = prefix + ':events'
+        self._bytes_key = prefix + ':bytes'
+        self._epoch_key = prefix + ':epoch'
+        self._changed = threading.Condition()
+        self._listener = None
+        self._seen = 0
+        tasks = list(tasks)
+        # Replicas share the epoch of whichever started first.
+        self._redis.set(self._epoch_key, new_epoch(), nx=True)
+        self.epoch = self._redis.get(self._epoch_key).decode('ascii')
+        # Only the first replica to start seeds the store.
+        if self._redis.set(self._next_id_key, max([t['id'] for t in tasks], default=0), nx=True):
+            pipe = self._redis.pipeline()
+            for task in tasks:
+                pipe.hset(self._task_key(task['id']), mapping=self._encode(task))
+                self._index(pipe, task)
+            pipe.execute()
+
+        # Data written before the byte totals were kept has no hash yet,
+        # so it is summed once. A write landing meanwhile moves the version
+        # and the sum is retried.
+        def backfill(pipe):
+            if pipe.exists(self._bytes_key):
+                return
+            sizes = [text_bytes(task) for task in self.snapshot()]
+            pipe.multi()
+            pipe.hset(self._bytes_key, mapping={'title': sum(title for title, description in sizes),
+                                               'description': sum(description for title, description in sizes)})
+
+        self._redis.transaction(backfill, self._version_key, self._bytes_key)
+
+    def _task_key(self, task_id):
+        return '%s:task:%d' % (self._prefix, task_id)
+
+    def _done_key(self, done):
+        return '%s:done:%d' % (self._prefix, done)
+
+    def _term_key(self, term):
+        return '%s:term:%s' % (self._prefix, term)
+
+    @staticmethod
+    def _title_member(task):
+        return '%s\0%d' % (task['title'].lower(), task['id'])
+
+    @staticmethod
+    def _encode(task):
+        return {
+            'id': task['id'],
+            'title': task['title'],
+            'description': task['description'],
+            'done': int(task['done']),
+            'version': task.get('version', 0)
+        }
+
+    @staticmethod
+    def _decode(raw):
+        return Task(
+            int(raw[b'id']),
+            raw[b'title'].decode('utf-8'),
+            raw[b'description'].decode('utf-8'),
+            raw[b'done'] == b'1',
+            int(raw[b'version'])
+        )
+
+    def _index(self, pipe, task):
+        pipe.zadd(self._ids_key, {task['id']: task['id']})
+        pipe.zadd(self._done_key(task['done']), {task['id']: task['id']})
+        for term in task_terms(task):
+            pipe.sadd(self._term_key(term), task['id'])
+        pipe.zadd(self._titles_key, {self._title_member(task): 0})
+        self._count_text(pipe, task)
+
+    def _unindex(self, pipe, task):
+        pipe.zrem(self._ids_key, task['id'])
+        pipe.zrem(self._done_key(task['done']), task['id'])
+        for term in task_terms(task):
+            pipe.srem(self._term_key(term), task['id'])
+        pipe.zrem(self._titles_key, self._title_member(task))
+        self._count_text(pipe, task, -1)
+
+    def _count_text(self, pipe, task, sign=1):
+        title, description = text_bytes(task)
+        pipe.hincrby(self._bytes_key, 'title', sign * title)
+        pipe.hincrby(self._bytes_key, 'description', sign * description)
+
+    def _fetch(self, ids):
+        pipe = self._redis.pipeline(transaction=False)
+        for task_id in ids:
+            pipe.hgetall(self._task_key(int(task_id)))
+        return [self._decode(raw) for raw in pipe.execute() if raw]
+
+    def _fetch_for_update(self, task_ids):
+        # WATCH is per connection, so reads of watched keys can still go
+        # through a separate, batched pipeline.
+        pipe = self._redis.pipeline(transaction=False)
+        for task_id in task_ids:
+            pipe.hgetall(self._task_key(task_id))
+        return [self._decode(raw) if raw else None for raw in pipe.execute()]
+
+    def __len__(self):
+        return self._redis.zcard(self._ids_key)
+
+    @property
+    def version(self):
+        return int(self._redis.get(self._version_key) or 0)
+
+    def _next_version(self, pipe):
+        # Read while WATCHing the version key; _log sets it in the MULTI.
+        return int(pipe.get(self._version_key) or 0) + 1
+
+    def _log(self, pipe, version, op, task_ids):
+        if task_ids:
+            pipe.set(self._version_key, version)
+            pipe.rpush(self._changes_key, *['%d:%s:%d' % (version, op, task_id) for task_id in task_ids])
+            pipe.ltrim(self._changes_key, -self._change_log_size, -1)
+            pipe.publish(self._events_key, version)
+
+    def _listen(self, pubsub):
+        for message in pubsub.listen():
+            if message['type'] == 'message':
+                with self._changed:
+                    self._seen = max(self._seen, int(message['data']))
+                    self._changed.notify_all()
+
+    def wait(self, version, timeout):
+        with self._changed:
+            if self._listener is None:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._events_key)
+                self._seen = self.version
+                self._listener = threading.Thread(target=self._listen, args=(pubsub,), daemon=True)
+                self._listener.start()
+            self._changed.wait_for(lambda: self._seen > version, timeout)
+            return self._seen
+
+    def changes(self, since):
+        pipe = self._redis.pipeline()
+        pipe.get(self._version_key)
+        pipe.lrange(self._changes_key, 0, -1)
+        version, raw = pipe.execute()
+        entries = []
+        for entry in raw:
+            entry_version, op, task_id = entry.decode().split(':')
+            entries.append((int(entry_version), op, int(task_id)))
+        # A full log may have lost part of its oldest version's entries.
+        if since > int(version or 0) or (len(entries) == self._change_log_size and since < entries[0][0]):
+            return None
+        return [entry for entry in entries if entry[0] > since]
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def __contains__(self, task_id):
+        return bool(self._redis.exists(self._task_key(task_id)))
+
+    def snapshot(self):
+        return self._fetch(self._redis.zrange(self._ids_key, 0, -1))
+
+    def get(self, task_id):
+        raw = self._redis.hgetall(self._task_key(task_id))
+        if not raw:
+            return None
+        return self._decode(raw)
+
+    def count(self, done=None):
+        return self._redis.zcard(self._ids_key if done is None else self._done_key(done))
+
+    def stats(self):
+        pipe = self._redis.pipeline()
+        pipe.zcard(self._ids_key)
+        pipe.zcard(self._done_key(True))
+        pipe.hmget(self._bytes_key, 'title', 'description')
+        total, done, (title_bytes, description_bytes) = pipe.execute()
+        return task_stats(total, done, int(title_bytes or 0), int(description_bytes or 0))
+
+    def where(self, done):
+        return self._fetch(self._redis.zrange(self._done_key(done), 0, -1))
+
+    def search(self, query, limit):
+        keys = [self._term_key(term) for term in set(tokenize(query))]
+        if not keys:
+            return []
+        return self._fetch(nsmallest(limit, map(int, self._redis.sinter(keys))))
+
+    def suggest(self, prefix, limit):
+        prefix = prefix.lower().encode('utf-8')
+        members = self._redis.zrangebylex(self._titles_key, b'[' + prefix, b'[' + prefix + b'\xff', start=0, num=limit)
+        return self._fetch(member.rsplit(b'\0', 1)[1] for member in members)
+
+    def page(self, after, limit, done=None):
+        key = self._ids_key if done is None else self._done_key(done)
+        return self._fetch(self._redis.zrangebyscore(key, '(%d' % after, '+inf', start=0, num=limit))
+
+    def sorted_page(self, order, after, limit):
+        # Titles come from the lex-ordered <prefix>:titles set, so tasks
+        # with equal titles are ordered by id as text rather than number.
+        if order == 'done,id':
+            return done_order_page(self, after, limit)
+        edge = None if after is None else b'(' + self._title_member({'title': after[0], 'id': after[1]}).encode('utf-8')
+        if order == 'title':
+            members = self._redis.zrangebylex(self._titles_key, edge or b'-', b'+', start=0, num=limit)
+        else:
+            members = self._redis.zrevrangebylex(self._titles_key, edge or b'+', b'-', start=0, num=limit)
+        return self._fetch(member.rsplit(b'\0', 1)[1] for member in members)
+
+    def insert(self, fields):
+        return self.insert_many([fields])[0]
+
+    def insert_many(self, fields_list):
+        fields_list = list(fields_list)
+        first_id = self._redis.incrby(self._next_id_key, len(fields_list)) - len(fields_list) + 1
+
+        def apply(pipe):
+            version = self._next_version(pipe)
+            tasks = [Task.from_fields(task_id, fields, version) for task_id, fields in enumerate(fields_list, first_id)]
+            pipe.multi()
+            for task in tasks:
+                pipe.hset(self._task_key(task['id']), mapping=self._encode(task))
+                self._index(pipe, task)
+            self._log(pipe, version, 'create', [task['id'] for task in tasks])
+            return tasks
+
+        return self._redis.transaction(apply, self._version_key, value_from_callable=True)
+
+    def update(self, task_id, changes, expected=None):
+        return self._update(changes, [task_id], expected)[0]
+
+    def _select(self, task_ids, done):
+        if task_ids is not None:
+            return task_ids
+        return [int(task_id) for task_id in self._redis.zrange(self._done_key(done), 0, -1)]
+
+    def update_many(self, changes, task_ids=None, done=None):
+        task_ids = self._select(task_ids, done)
+        tasks = self._update(changes, task_ids)
+        return dict((task_id, task is not None) for task_id, task in zip(task_ids, tasks))
+
+    def _update(self, changes, task_ids, expected=None):
+        if not task_ids:
+            return []
+
+        def apply(pipe):
+            old_tasks = self._fetch_for_update(task_ids)
+            for old in old_tasks:
+                if old is not None and expected is not None and old['version'] not in expected:
+                    raise VersionConflict(old)
+            version = self._next_version(pipe)
+            tasks = []
+            pipe.multi()
+            for old in old_tasks:
+                if old is None:
+                    tasks.append(None)
+                    continue
+                task = apply_changes(old, changes, version)
+                pipe.hset(self._task_key(task['id']), mapping=self._encode(task))
+                self._unindex(pipe, old)
+                self._index(pipe, task)
+                tasks.append(task)
+            self._log(pipe, version, 'update', [task['id'] for task in tasks if task is not None])
+            return tasks
+
+        keys = [self._task_key(task_id) for task_id in task_ids]
+        return self._redis.transaction(apply, self._version_key, *keys, value_from_callable=True)
+
+    def remove(self, task_id):
+        return self._remove([task_id])[0]
+
+    def remove_many(self, task_ids=None, done=None):
+        task_ids = self._select(task_ids, done)
+        tasks = self._remove(task_ids)
+        return dict((task_id, task is not None) for task_id, task in zip(task_ids, tasks))
+
+    def _remove(self, task_ids):
+        if not task_ids:
+            return []
+
+        def apply(pipe):
+            tasks = self._fetch_for_update(task_ids)
+            version = self._next_version(pipe)
+            pipe.multi()
+            for task in tasks:
+                if task is not None:
+                    pipe.delete(self._task_key(task['id']))
+                    self._unindex(pipe, task)
+            self._log(pipe, version, 'delete', [task['id'] for task in tasks if task is not None])
+            return tasks
+
+        keys = [self._task_key(task_id) for task_id in task_ids]
+        return self._redis.transaction(apply, self._version_key, *keys, value_from_callable=True)
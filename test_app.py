@@ -0,0 +1,313 @@
+import gzip
+import json
+import threading
+
+import pytest
+
+import app
+from store import TaskStore, ColumnarTaskStore, ShardedTaskStore, SharedTaskStore, RedisTaskStore
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+STORES = ['memory', 'columnar', 'sharded', 'shared',
+          pytest.param('redis', marks=pytest.mark.skipif(fakeredis is None, reason='needs fakeredis'))]
+
+
+@pytest.fixture(params=STORES)
+def store(request, tmp_path):
+    if request.param == 'memory':
+        store = TaskStore(app.seed_context)
+    elif request.param == 'columnar':
+        store = ColumnarTaskStore(app.seed_context)
+    elif request.param == 'sharded':
+        store = ShardedTaskStore(app.seed_context, 4)
+    elif request.param == 'shared':
+        store = SharedTaskStore(str(tmp_path / 'tasks'), app.seed_context, capacity=1024)
+    else:
+        store = RedisTaskStore(fakeredis.FakeRedis(), app.seed_context)
+    context, app.context = app.context, store
+    app.clear_listing_cache()
+    yield store
+    app.context = context
+
+
+@pytest.fixture
+def client(store):
+    return app.app.test_client()
+
+
+def titles(response):
+    return [task['title'] for task in response.get_json()['context']]
+
+
+def test_list_context(client):
+    response = client.get('/api2/get/context')
+    assert response.status_code == 200
+    assert titles(response) == ['Cento 6', 'Centos 7', 'Centos 8', 'Centos stream']
+    assert response.get_json()['context'][0]['uri'] == 'http://localhost/api2/get/context/1'
+
+
+def test_create_get_update_delete(client, store):
+    response = client.post('/api2/post/context', json={'title': 'Alma 9', 'description': 'RHEL 9 based'})
+    assert response.status_code == 201
+    uri = response.get_json()['task']['uri']
+    assert uri == 'http://localhost/api2/get/context/5'
+    assert client.get(uri).get_json()['task']['title'] == 'Alma 9'
+
+    response = client.put('/api2/put/context/5', json={'done': True})
+    assert response.get_json()['task']['done'] is True
+    assert store.get(5)['done'] is True
+
+    assert client.delete('/api2/delete/context/5').get_json() == {'result': True}
+    assert client.get(uri).status_code == 404
+    assert client.delete('/api2/delete/context/5').status_code == 404
+
+
+@pytest.mark.parametrize('body', [
+    {'title': 5},
+    {'title': 'Alma 9', 'description': 5},
+    {'description': 'no title'},
+])
+def test_create_rejects_bad_fields(client, store, body):
+    version = store.version
+    assert client.post('/api2/post/context', json=body).status_code == 400
+    assert client.post('/api2/post/context/batch', json=[body]).status_code == 400
+    assert store.version == version and len(store) == 4
+
+
+def test_update_rejects_bad_fields(client):
+    assert client.put('/api2/put/context/1', json={'done': 'yes'}).status_code == 400
+    assert client.put('/api2/put/context/1', json={'title': None}).status_code == 400
+    assert client.put('/api2/put/context/9', json={'done': True}).status_code == 404
+
+
+@pytest.mark.parametrize('text', ['\ud800', 'Cento \udfff'])
+def test_writes_reject_unencodable_text(client, store, text):
+    stats, version = store.stats(), store.version
+    assert client.post('/api2/post/context', json={'title': text}).status_code == 400
+    assert client.post('/api2/post/context/batch', json=[{'title': 'Alma 9', 'description': text}]).status_code == 400
+    assert client.put('/api2/put/context/1', json={'title': text, 'done': True}).status_code == 400
+    assert client.put('/api2/put/context/batch', json={'ids': [1], 'task': {'description': text}}).status_code == 400
+    assert store.stats() == stats and store.version == version
+    assert store.get(1)['title'] == 'Cento 6' and store.get(1)['done'] is False
+
+
+def test_paging_skips_removed_tasks(client):
+    client.delete('/api2/delete/context/2')
+    client.delete('/api2/delete/context/3')
+    url, seen = '/api2/get/context?limit=1', []
+    while url:
+        body = client.get(url).get_json()
+        seen.extend(task['title'] for task in body['context'])
+        url = body['next']
+    assert seen == ['Cento 6', 'Centos stream']
+
+
+def test_sorted_listing(client):
+    client.post('/api2/post/context', json={'title': 'alma 9'})
+    assert titles(client.get('/api2/get/context?sort=title')) == [
+        'alma 9', 'Cento 6', 'Centos 7', 'Centos 8', 'Centos stream']
+    assert titles(client.get('/api2/get/context?sort=-title&limit=2')) == ['Centos stream', 'Centos 8']
+    assert client.get('/api2/get/context?sort=id').status_code == 400
+
+
+def test_listing_etag(client):
+    response = client.get('/api2/get/context')
+    etag = response.headers['ETag'].strip('"')
+    assert client.get('/api2/get/context', headers={'If-None-Match': '"%s"' % etag}).status_code == 304
+    client.put('/api2/put/context/1', json={'done': True})
+    assert client.get('/api2/get/context', headers={'If-None-Match': '"%s"' % etag}).status_code == 200
+
+
+def test_batch_create_update_delete(client, store):
+    response = client.post('/api2/post/context/batch', json=[
+        {'title': 'Alma 8'}, {'title': 'Alma 9', 'description': 'RHEL 9 based'}])
+    assert response.status_code == 201
+    assert response.get_json()['uris'] == [
+        'http://localhost/api2/get/context/5', 'http://localhost/api2/get/context/6']
+    assert titles(client.get('/api2/search/context?q=alma')) == ['Alma 8', 'Alma 9']
+
+    response = client.put('/api2/put/context/batch', json={'ids': [5, 6, 9], 'task': {'done': True}})
+    assert response.get_json()['results'] == [
+        {'id': 5, 'result': True}, {'id': 6, 'result': True}, {'id': 9, 'result': False}]
+    assert titles(client.get('/api2/get/context?done=true')) == ['Alma 8', 'Alma 9']
+
+    response = client.delete('/api2/delete/context/batch', json={'filter': {'done': True}})
+    assert response.get_json()['results'] == [{'id': 5, 'result': True}, {'id': 6, 'result': True}]
+    assert len(store) == 4 and store.count(True) == 0
+
+
+def test_batch_matching_nothing_keeps_version(client, store):
+    version = store.version
+    response = client.delete('/api2/delete/context/batch', json={'ids': [9]})
+    assert response.get_json()['results'] == [{'id': 9, 'result': False}]
+    client.put('/api2/put/context/batch', json={'filter': {'done': True}, 'task': {'done': False}})
+    assert store.version == version
+    assert client.get('/api2/changes?since=%d' % version).get_json()['changes'] == []
+
+
+def test_search(client):
+    assert titles(client.get('/api2/search/context?q=centos rhel')) == ['Centos 7', 'Centos 8', 'Centos stream']
+    assert titles(client.get('/api2/search/context?q=centos zzz')) == []
+    assert titles(client.get('/api2/search/context?q=zzz yyy')) == []
+
+
+def test_stats(client):
+    client.post('/api2/post/context/batch', json=[{'title': 'Alma 9', 'description': 'ü'}])
+    client.put('/api2/put/context/1', json={'done': True})
+    client.delete('/api2/delete/context/2')
+    stats = client.get('/api2/stats/context').get_json()['stats']
+    assert stats == {'total': 4, 'done': 1, 'open': 3, 'title_bytes': 34, 'description_bytes': 45}
+
+
+def test_changes(client, store):
+    version = store.version
+    client.post('/api2/post/context', json={'title': 'Alma 9'})
+    client.put('/api2/put/context/5', json={'done': True})
+    client.delete('/api2/delete/context/1')
+    body = client.get('/api2/changes?since=%d&epoch=%s' % (version, store.epoch)).get_json()
+    assert body['version'] == store.version and body['epoch'] == store.epoch
+    assert [(change['op'], change['task']['uri']) for change in body['changes']] == [
+        ('create', 'http://localhost/api2/get/context/5'), ('delete', 'http://localhost/api2/get/context/1')]
+    assert client.get('/api2/changes?since=%d&epoch=0' % version).status_code == 410
+
+
+def test_if_match(client, store):
+    etag = client.get('/api2/get/context/1').headers['ETag']
+    assert client.put('/api2/put/context/1', json={'done': True}, headers={'If-Match': etag}).status_code == 200
+    assert client.put('/api2/put/context/1', json={'done': False}, headers={'If-Match': etag}).status_code == 412
+    # A tag for the same version from another epoch does not match.
+    etag = client.get('/api2/get/context/1').headers['ETag'].replace(store.epoch, '0')
+    assert client.put('/api2/put/context/1', json={'done': False}, headers={'If-Match': etag}).status_code == 412
+
+
+def test_concurrent_writes_log_in_version_order(store):
+    version = store.version
+
+    def write():
+        for n in range(20):
+            store.insert({'title': 'task %d' % n, 'description': '', 'done': False})
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    versions = [entry[0] for entry in store.changes(version)]
+    assert versions == sorted(set(versions)) and len(versions) == 80
+    assert versions[-1] == store.version
+
+
+def first_event(client, url, **kwargs):
+    response = client.get(url, buffered=False, **kwargs)
+    try:
+        return next(response.response).decode()
+    finally:
+        response.close()
+
+
+def test_stream_uris_follow_the_request_host(client, store):
+    version = store.version
+    client.post('/api2/post/context', json={'title': 'Alma 9'})
+    for host in ('a.example', 'b.example'):
+        event = first_event(client, '/api2/stream/context?since=%d&epoch=%s' % (version, store.epoch),
+                            base_url='http://%s' % host)
+        assert 'event: create' in event and '"http://%s/api2/get/context/5"' % host in event
+
+
+def test_export_streams_every_task_as_ndjson(client, monkeypatch):
+    monkeypatch.setattr(app, 'EXPORT_BATCH_SIZE', 3)
+    client.delete('/api2/delete/context/2')
+    client.post('/api2/post/context/batch', json=[{'title': 'Alma %d' % n} for n in range(4)])
+    response = client.get('/api2/export/context')
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line['title'] for line in lines] == [
+        'Cento 6', 'Centos 8', 'Centos stream', 'Alma 0', 'Alma 1', 'Alma 2', 'Alma 3']
+    assert lines[0] == {'uri': 'http://localhost/api2/get/context/1', 'title': 'Cento 6',
+                        'description': 'RHEL 6 based', 'done': False}
+
+    response = client.get('/api2/export/context?done=false&fields=title', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    body = gzip.decompress(response.get_data()).decode()
+    assert [json.loads(line) for line in body.splitlines()][:2] == [{'title': 'Cento 6'}, {'title': 'Centos 8'}]
+
+
+def test_fields_projection(client):
+    response = client.get('/api2/get/context?fields=title,done')
+    assert response.get_json()['context'][0] == {'title': 'Cento 6', 'done': False}
+    assert client.get('/api2/get/context/1?fields=uri').get_json()['task'] == {
+        'uri': 'http://localhost/api2/get/context/1'}
+    # Each projection is cached on its own.
+    assert client.get('/api2/get/context?fields=description').get_json()['context'][0] == {
+        'description': 'RHEL 6 based'}
+    assert client.get('/api2/get/context?fields=title,id').status_code == 400
+
+
+def test_suggest(client):
+    client.post('/api2/post/context', json={'title': 'centos 9'})
+    response = client.get('/api2/suggest/context?prefix=CENTOS')
+    assert response.get_json()['suggestions'] == [
+        {'uri': 'http://localhost/api2/get/context/2', 'title': 'Centos 7'},
+        {'uri': 'http://localhost/api2/get/context/3', 'title': 'Centos 8'},
+        {'uri': 'http://localhost/api2/get/context/5', 'title': 'centos 9'},
+        {'uri': 'http://localhost/api2/get/context/4', 'title': 'Centos stream'}]
+    client.put('/api2/put/context/3', json={'title': 'Rocky 8'})
+    suggestions = client.get('/api2/suggest/context?prefix=c&limit=2').get_json()['suggestions']
+    assert [task['title'] for task in suggestions] == ['Cento 6', 'Centos 7']
+    assert client.get('/api2/suggest/context?prefix=rocky').get_json()['suggestions'][0]['title'] == 'Rocky 8'
+    assert client.get('/api2/suggest/context?prefix=zz').get_json()['suggestions'] == []
+
+
+def test_stream_resumes_from_last_event_id(client, store, monkeypatch):
+    client.post('/api2/post/context', json={'title': 'Alma 9'})
+    last_id = '%s-%d' % (store.epoch, store.version)
+    client.delete('/api2/delete/context/1')
+    event = first_event(client, '/api2/stream/context', headers={'Last-Event-ID': last_id})
+    assert event == 'event: delete\ndata: {"uri": "http://localhost/api2/get/context/1"}\nid: %s-%d\n\n' % (
+        store.epoch, store.version)
+    # A tag from another epoch starts over with a resync.
+    event = first_event(client, '/api2/stream/context', headers={'Last-Event-ID': '0-1'})
+    assert event.startswith('event: resync\n') and '"version": %d' % store.version in event
+    monkeypatch.setattr(app, 'HEARTBEAT_SECONDS', 0.01)
+    assert first_event(client, '/api2/stream/context') == ': heartbeat\n\n'
+
+
+def test_listing_cache_serves_until_a_write(client, monkeypatch):
+    rendered = []
+    render_listing = app.render_listing
+    monkeypatch.setattr(app, 'render_listing', lambda *args: rendered.append(1) or render_listing(*args))
+    first = client.get('/api2/get/context?fields=title')
+    assert client.get('/api2/get/context?fields=title').get_data() == first.get_data()
+    assert len(rendered) == 1
+    client.post('/api2/post/context', json={'title': 'Alma 9'})
+    assert titles(client.get('/api2/get/context?fields=title'))[-1] == 'Alma 9'
+    assert len(rendered) == 2
+
+
+def test_listing_cache_evicts_least_recently_used(client, monkeypatch):
+    monkeypatch.setattr(app, 'LISTING_CACHE_BYTES', 300)
+    for fields in ('title', 'done', 'title'):
+        client.get('/api2/get/context?fields=%s' % fields)
+    client.get('/api2/get/context?fields=description')
+    cached = [key[2] for key in app.listing_cache]
+    assert cached == [b'fields=title', b'fields=description']
+    assert app.listing_cache_bytes == sum(len(entry[1]) for entry in app.listing_cache.values()) <= 300
+
+
+def test_namespaced_families_do_not_share_tasks(client, store, monkeypatch):
+    namespace = TaskStore(app.seed_context)
+    monkeypatch.setitem(app.namespaces, 'api3', namespace)
+    client.post('/api3/post/context', json={'title': 'Alma 9'})
+    client.delete('/api2/delete/context/1')
+    assert titles(client.get('/api3/get/context')) == ['Cento 6', 'Centos 7', 'Centos 8', 'Centos stream', 'Alma 9']
+    assert titles(client.get('/api2/get/context')) == ['Centos 7', 'Centos 8', 'Centos stream']
+    assert len(store) == 3 and len(namespace) == 5
+    # Families without a namespace of their own still share context.
+    assert titles(client.get('/api4/get/context')) == ['Centos 7', 'Centos 8', 'Centos stream']
+    body = client.get('/api3/changes?since=0&epoch=%s' % namespace.epoch).get_json()
+    assert [(change['op'], change['task']['uri']) for change in body['changes']] == [
+        ('create', 'http://localhost/api3/get/context/5')]
@@ -0,0 +1,225 @@
+import multiprocessing
+import random
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+
+import pytest
+
+import store
+from store import ColumnarTaskStore, ShardedTaskStore, SharedTaskStore, SortedIndex, StoreLimitExceeded, TaskStore
+from wal import WriteAheadLog
+
+
+@pytest.mark.parametrize('block', [1, 3, 1000])
+def test_sorted_index_matches_a_sorted_list(monkeypatch, block):
+    monkeypatch.setattr(store, 'INDEX_BLOCK', block)
+    rand = random.Random(block)
+    expected = sorted(rand.sample(range(300), 60))
+    index = SortedIndex(expected)
+    for step in range(300):
+        keys = rand.sample(range(400), rand.choice([1, 2, 40]))
+        if rand.random() < 0.5:
+            keys = [key for key in keys if key not in expected]
+            index.update(keys)
+            expected = sorted(expected + keys)
+        else:
+            index.difference_update(keys)
+            expected = [key for key in expected if key not in keys]
+        assert list(index) == expected and len(index) == len(expected)
+        for key in (None, rand.randrange(-1, 401)):
+            end = len(expected) if key is None else bisect_left(expected, key)
+            start = 0 if key is None else bisect_right(expected, key)
+            assert index.after(key, 5) == expected[start:start + 5]
+            assert index.before(key, 5) == expected[max(end - 5, 0):end][::-1]
+
+
+def test_pages_do_not_skip_tasks_during_deletes():
+    tasks = TaskStore({'id': i, 'title': 't%06d' % i, 'description': '', 'done': i % 2 == 0}
+                      for i in range(1, 60001))
+    deleting = threading.Thread(target=lambda: [tasks.remove(i) for i in range(1, 20000, 2)])
+    deleting.start()
+    while deleting.is_alive():
+        assert tasks.page(30000, 2)[0]['id'] == 30001
+        assert tasks.page(30000, 2, True)[0]['id'] == 30002
+        assert tasks.sorted_page('title', ('t030000', 30000), 2)[0]['id'] == 30001
+    deleting.join()
+    assert len(tasks) == 50000
+
+
+def test_columnar_store_matches_task_store():
+    rand = random.Random(17)
+    seed = [{'id': i, 'title': 'Task %d' % (i % 7), 'description': 'ü' * (i % 3), 'done': i % 2 == 0}
+            for i in range(1, 41)]
+    memory, columnar = TaskStore(seed), ColumnarTaskStore(seed)
+    for step in range(400):
+        ids = rand.sample(range(1, memory._next_id + 2), 3)
+        changes = {'title': 'task %d' % rand.randrange(5), 'done': rand.random() < 0.5}
+        batch = [{'title': 'New %d' % step, 'description': 'x'}] * rand.randrange(1, 4)
+        for each in (memory, columnar):
+            if step % 5 == 0:
+                each.insert_many(batch)
+            elif step % 5 == 1:
+                each.update(ids[0], changes)
+            elif step % 5 == 2:
+                each.update_many(changes, ids if step % 2 else None, done=step % 3 == 0)
+            elif step % 5 == 3:
+                each.remove(ids[0])
+            else:
+                each.remove_many(ids[:2])
+        assert [dict(task) for task in columnar.snapshot()] == [dict(task) for task in memory.snapshot()]
+        assert columnar.stats() == memory.stats() and columnar.version == memory.version
+    for each in (memory, columnar):
+        each.remove_many(done=True)
+    queries = [
+        lambda each: each.page(10, 5),
+        lambda each: each.page(0, 5, False),
+        lambda each: each.where(False),
+        lambda each: each.search('task', 5),
+        lambda each: each.suggest('new', 5),
+        lambda each: each.sorted_page('title', None, 5),
+        lambda each: each.sorted_page('-title', ('task 3', 50), 5),
+    ]
+    for query in queries:
+        assert [dict(task) for task in query(columnar)] == [dict(task) for task in query(memory)]
+
+
+def by_id(task):
+    return task['id']
+
+
+@pytest.mark.parametrize('fsync_interval', [0, 0.01, None])
+@pytest.mark.parametrize('cls', [TaskStore, ColumnarTaskStore])
+def test_wal_replay_restores_the_store(tmp_path, cls, fsync_interval):
+    path = str(tmp_path / 'tasks.wal')
+    seed = [{'id': 1, 'title': 'Cento 6', 'description': 'RHEL 6 based', 'done': False}]
+    tasks = cls(seed, wal=WriteAheadLog(path, fsync_interval))
+    tasks.insert_many([{'title': 't%d' % i, 'description': 'ü'} for i in range(5)])
+    tasks.update(2, {'done': True, 'title': 'two'})
+    tasks.update_many({'description': 'batch'}, [3, 4])
+    tasks.remove_many([5, 6])
+    tasks._wal.close()
+    # A crash mid-write leaves a torn last line, which replay cuts off.
+    with open(path, 'ab') as log:
+        log.write(b'{"version": 99, "op": "cre')
+    replayed = cls(seed, wal=WriteAheadLog(path, fsync_interval))
+    assert [dict(task) for task in replayed.snapshot()] == [dict(task) for task in tasks.snapshot()]
+    assert replayed.version == tasks.version and replayed.stats() == tasks.stats()
+    # Ids of deleted tasks are not handed out again.
+    assert replayed.insert({'title': 'after'})['id'] == 7
+    replayed._wal.close()
+    wal = WriteAheadLog(path)
+    assert [task['id'] for task in cls(seed, wal=wal).snapshot()] == [1, 2, 3, 4, 7]
+    wal.close()
+
+
+@pytest.mark.parametrize('cls', [TaskStore, ColumnarTaskStore])
+def test_checkpoint_keeps_writes_made_while_it_runs(tmp_path, cls):
+    path = str(tmp_path / 'tasks.wal')
+    tasks = cls(wal=WriteAheadLog(path))
+    tasks.insert_many([{'title': 't%d' % i, 'description': '', 'done': False} for i in range(5000)])
+    writing = threading.Thread(target=lambda: [
+        tasks.insert({'title': 'w%d' % i, 'description': '', 'done': i % 2 == 0}) for i in range(2000)])
+    writing.start()
+    while writing.is_alive():
+        tasks.checkpoint()
+        tasks.remove(tasks.page(0, 1)[0]['id'])
+    writing.join()
+    tasks.checkpoint()
+    tasks.update(5001, {'done': True})
+    tasks._wal.close()
+    replayed = cls(wal=WriteAheadLog(path))
+    assert sorted(map(dict, replayed.snapshot()), key=by_id) == sorted(map(dict, tasks.snapshot()), key=by_id)
+    assert replayed.version == tasks.version
+
+
+@pytest.fixture
+def switch_often():
+    # Threads switch often, so writes interleave mid-write.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_sharded_writes_keep_ids_rising_and_the_change_log_complete(switch_often):
+    tasks = ShardedTaskStore(shards=4, change_log_size=10000)
+    batches = []
+
+    def write(n):
+        for i in range(200):
+            batches.append([task['id'] for task in tasks.insert_many([{'title': 'w%d' % n}] * (i % 3 + 1))])
+            tasks.update(batches[-1][0], {'done': True})
+
+    writers = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for writer in writers:
+        writer.start()
+    seen = []
+    while any(writer.is_alive() for writer in writers):
+        seen.append(tasks.changes(0))
+    for writer in writers:
+        writer.join()
+    # Each batch got the next ids in one run, and no id twice.
+    assert all(batch == list(range(batch[0], batch[0] + len(batch))) for batch in batches)
+    assert sorted(task_id for batch in batches for task_id in batch) == list(range(1, len(tasks) + 1))
+    changes = tasks.changes(0)
+    assert [entry[0] for entry in changes] == sorted(entry[0] for entry in changes)
+    assert changes[-1][0] == tasks.version and len(changes) == len(tasks) + len(batches)
+    # Entries never show up behind ones already handed out.
+    assert all(entries == changes[:len(entries)] for entries in seen)
+
+
+def test_shared_capacity_limits_live_tasks_not_ids(tmp_path):
+    tasks = SharedTaskStore(str(tmp_path / 'tasks'), capacity=4)
+    for n in range(50):
+        created = tasks.insert_many([{'title': 't%d' % n}, {'title': 'u%d' % n}])
+        tasks.remove(created[0]['id'])
+        if len(tasks) == 3:
+            tasks.remove(tasks.page(0, 1)[0]['id'])
+    assert [task['title'] for task in tasks] == ['u48', 'u49']
+    assert tasks.get(100)['title'] == 'u49' and tasks.get(99) is None
+    tasks.insert_many([{'title': 'v'}, {'title': 'w'}])
+    with pytest.raises(StoreLimitExceeded):
+        tasks.insert({'title': 'one too many'})
+    other = SharedTaskStore(str(tmp_path / 'tasks'))
+    assert [task['id'] for task in other] == [98, 100, 101, 102] and len(other) == 4
+
+
+def test_snapshot_and_wal_tail_round_trip(tmp_path):
+    snapshot, path = str(tmp_path / 'tasks.snap'), str(tmp_path / 'tasks.wal')
+    tasks = ColumnarTaskStore(wal=WriteAheadLog(path))
+    tasks.insert_many([{'title': 't%d' % i, 'description': 'ü' * i, 'done': i % 2 == 0} for i in range(50)])
+    tasks.remove_many([10, 11, 50])
+    tasks.update(3, {'title': 'renamed'})
+    saved = tasks.save(snapshot)
+    assert saved == tasks.version
+    # Only the records the snapshot lacks stay in the log.
+    tasks.update(4, {'done': True})
+    tasks.remove(5)
+    tasks._wal.compact(saved)
+    tasks.insert({'title': 'last'})
+    tasks._wal.close()
+    wal = WriteAheadLog(path)
+    assert [record['op'] for record in wal.records()] == ['update', 'delete', 'create']
+
+    at_save = ColumnarTaskStore.load(snapshot)
+    assert at_save.version == saved and len(at_save) == 47 and at_save.get(3)['title'] == 'renamed'
+    loaded = ColumnarTaskStore.load(snapshot, wal=wal)
+    assert [dict(task) for task in loaded.snapshot()] == [dict(task) for task in tasks.snapshot()]
+    assert loaded.version == tasks.version and loaded.stats() == tasks.stats()
+    assert loaded.insert({'title': 'next'})['id'] == 52
+    wal.close()
+
+
+def test_shared_store_sees_writes_from_other_processes(tmp_path):
+    path = str(tmp_path / 'tasks')
+    tasks = SharedTaskStore(path, [{'id': 1, 'title': 'Cento 6', 'description': '', 'done': False}])
+    version = tasks.version
+    child = multiprocessing.get_context('fork').Process(
+        target=lambda: SharedTaskStore(path).insert({'title': 'from a child'}))
+    child.start()
+    # The parent's poller wakes it for the child's write.
+    assert tasks.wait(version, 5) == version + 1
+    child.join()
+    assert child.exitcode == 0
+    assert tasks.get(2)['title'] == 'from a child' and tasks.changes(version) == [(version + 1, 'create', 2)]
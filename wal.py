@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+
+# Tasks encoded per write when compact() rewrites the log.
+COMPACT_BATCH = 1000
+
+def newer_than(version):
+    """A filter for the records a snapshot at version does not hold yet."""
+    rewritten = False
+
+    def newer(record):
+        # The creates after a checkpoint keep their own, possibly older
+        # versions, but the checkpoint drops everything before it: once
+        # one is newer than the snapshot, keep the rest.
+        nonlocal rewritten
+        if record['op'] == 'checkpoint':
+            rewritten = record['version'] > version
+        return rewritten or record['version'] > version
+    return newer
+
+
+class WriteAheadLog(object):
+    """Append-only NDJSON log of task mutations, with group commit.
+
+    Each line is {"version", "op", "task"} for a create or update, or
+    {"version", "op", "id"} for a delete. A {"version", "op": "checkpoint",
+    "id"} line starts a compacted log: it replaces everything before it,
+    the live tasks follow as creates, and id is the last allocated id.
+
+    append() is called under the store lock and only queues the records.
+    A flusher thread serializes everything queued, writes it in one go and
+    fsyncs once for the whole group.
+
+    fsync_interval picks the durability policy:
+      0     - wait() blocks until the caller's records are fsynced;
+              concurrent writers share each fsync.
+      n > 0 - fsync at most every n seconds and never block writers;
+              a crash can lose the last n seconds.
+      None  - write without fsync and leave it to the OS.
+
+    replay() or records() must run once, before the first append; the
+    stores call one of them on startup. compact() drops what a snapshot
+    already holds, or rewrites the log down to the live tasks.
+    """
+
+    def __init__(self, path, fsync_interval=0):
+        self._path = path
+        self._fsync_interval = fsync_interval
+        self._cond = threading.Condition()
+        self._pending = []
+        self._appended = 0
+        self._durable = 0
+        self._closed = False
+        self._file_lock = threading.Lock()
+        self._file = open(path, 'ab')
+        self._flusher = threading.Thread(target=self._flush_forever, daemon=True)
+        self._flusher.start()
+
+    def replay(self, tasks):
+        """Fold the log over the seed tasks.
+
+        Returns (tasks, last_id, version): the surviving tasks, the highest
+        id ever allocated and the last logged version. A torn last line
+        from a crash mid-write is cut off.
+        """
+        tasks = dict((task['id'], dict(task)) for task in tasks)
+        last_id = max(tasks, default=0)
+        version = 0
+        for record in self.records():
+            # The creates after a checkpoint keep their own, older versions.
+            version = max(version, record['version'])
+            if record['op'] == 'checkpoint':
+                tasks = {}
+                last_id = max(last_id, record['id'])
+            elif record['op'] == 'delete':
+                tasks.pop(record['id'], None)
+                last_id = max(last_id, record['id'])
+            else:
+                task = dict(record['task'], version=record['version'])
+                tasks[task['id']] = task
+                last_id = max(last_id, task['id'])
+        return list(tasks.values()), last_id, version
+
+    def records(self, since=None):
+        """Yield the logged records in order, then cut off a torn last line.
+
+        With since, only the records a snapshot at that version lacks.
+        """
+        good = 0
+        newer = newer_than(since) if since is not None else None
+        with open(self._path, 'rb') as log:
+            for line in log:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                good += len(line)
+                if newer is None or newer(record):
+                    yield record
+        self._file.truncate(good)
+
+    def compact(self, version, tasks=None, last_id=0):
+        """Drop the records at or below version, once a snapshot holds them.
+
+        With tasks - the live tasks as of version - the log itself becomes
+        the snapshot: a checkpoint record for version and last_id, then the
+        tasks as creates.
+
+        The flusher, and so every writer waiting on it, is only held up
+        while the records appended during the rewrite are copied and the
+        files swapped.
+        """
+        newer = newer_than(version)
+        with open(self._path + '.tmp', 'wb') as compacted:
+            if tasks is not None:
+                compacted.write(b'{"version": %d, "op": "checkpoint", "id": %d}\n' % (version, last_id))
+                for start in range(0, len(tasks), COMPACT_BATCH):
+                    batch = tasks[start:start + COMPACT_BATCH]
+                    compacted.write(''.join(self._encode(task['version'], 'create', [task]) for task in batch).encode('utf-8'))
+            with open(self._path, 'rb') as log:
+                copied = self._copy_newer(log, compacted, newer)
+            compacted.flush()
+            os.fsync(compacted.fileno())
+            with self._file_lock:
+                with open(self._path, 'rb') as log:
+                    log.seek(copied)
+                    self._copy_newer(log, compacted, newer)
+                compacted.flush()
+                os.fsync(compacted.fileno())
+                os.replace(self._path + '.tmp', self._path)
+                self._file.close()
+                self._file = open(self._path, 'ab')
+
+    def _copy_newer(self, log, compacted, newer):
+        """Copy the whole lines newer() keeps; returns the offset reached."""
+        offset = log.tell()
+        for line in log:
+            # Outside the file lock the flusher may be mid-line.
+            if not line.endswith(b'\n'):
+                break
+            offset += len(line)
+            if newer(json.loads(line)):
+                compacted.write(line)
+        return offset
+
+    def append(self, version, op, tasks):
+        """Queue records for tasks; returns a ticket to pass to wait()."""
+        with self._cond:
+            self._pending.append((version, op, tasks))
+            self._appended += 1
+            self._cond.notify_all()
+            return self._appended
+
+    def wait(self, ticket):
+        if self._fsync_interval != 0:
+            return
+        with self._cond:
+            self._cond.wait_for(lambda: self._durable >= ticket)
+
+    def _encode(self, version, op, tasks):
+        if op == 'delete':
+            return ''.join('{"version": %d, "op": "delete", "id": %d}\n' % (version, task['id']) for task in tasks)
+        return ''.join(json.dumps({'version': version, 'op': op, 'task': {
+            'id': task['id'],
+            'title': task['title'],
+            'description': task['description'],
+            'done': task['done']
+        }}) + '\n' for task in tasks)
+
+    def _flush_forever(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, []
+                ticket = self._appended
+            with self._file_lock:
+                self._file.write(''.join(self._encode(*entry) for entry in batch).encode('utf-8'))
+                self._file.flush()
+                if self._fsync_interval is not None:
+                    os.fsync(self._file.fileno())
+            with self._cond:
+                self._durable = ticket
+                self._cond.notify_all()
+                if self._fsync_interval:
+                    self._cond.wait_for(lambda: self._closed, self._fsync_interval)
+
+    def close(self):
+        """Flush whatever is queued and stop the flusher."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        self._file.close()